@@ -29,20 +29,46 @@
 from __future__ import annotations
 
 import abc
+import contextlib
 import inspect
+import types
 import typing as t
 from dataclasses import dataclass
 
 from analytix.errors import InvalidAmountOfResults, MissingSortOptions
+from analytix.vocabulary import VOCABULARY
 
 if t.TYPE_CHECKING:
+    from analytix.caching import CacheStats
     from analytix.features import Dimensions, Filters, Metrics, SortOptions
+    from analytix.queries import Query
+    from analytix.reports import Report
+    from analytix.tokens import Tokens
+
+
+class _WriteOnce:
+    __slots__ = ()
+
+    _noun = "object"
+
+    def __setattr__(self, name: str, value: t.Any) -> None:
+        # These objects are shared between queries, so attributes can be
+        # set once (during initialisation) but never reassigned.
+        if hasattr(self, name):
+            raise AttributeError(f"cannot reassign {name!r} on a {self._noun}")
+
+        super().__setattr__(name, value)
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"cannot delete {name!r} on a {self._noun}")
 
 
 @dataclass()
-class ReportType(metaclass=abc.ABCMeta):
+class ReportType(_WriteOnce, metaclass=abc.ABCMeta):
     __slots__ = ("name", "dimensions", "filters", "metrics", "sort_options")
 
+    _noun = "report type"
+
     name: str
     dimensions: Dimensions
     filters: Filters
@@ -89,82 +115,312 @@ class DetailedReportType(ReportType, metaclass=abc.ABCMeta):
             raise MissingSortOptions()
 
 
-class FeatureType(metaclass=abc.ABCMeta):
-    __slots__ = ("values",)
+class FeatureType(_WriteOnce, metaclass=abc.ABCMeta):
+    __slots__ = ("values", "mask")
+
+    _noun = "feature type"
 
     def __init__(self, *args: str) -> None:
-        self.values = set(args)
+        self.values = frozenset(args)
+        self.mask = VOCABULARY.mask(self.values)
 
     def __repr__(self) -> str:
-        return f"{self.__class__.__name__}(values={self.values})"
+        return f"{self.__class__.__name__}(values={set(self.values)})"
 
     @abc.abstractmethod
     def validate(self, inputs: t.Collection[str]) -> None:
         raise NotImplementedError
 
 
-class SegmentedFeatureType(metaclass=abc.ABCMeta):
-    __slots__ = ("values",)
+class SegmentedFeatureType(_WriteOnce, metaclass=abc.ABCMeta):
+    __slots__ = ("values", "every", "mask")
+
+    _noun = "feature type"
 
     def __init__(self, *args: SetType) -> None:
-        self.values = set(args)
+        self.values = frozenset(args)
+        self.every = frozenset().union(*(s.values for s in self.values))
+        self.mask = VOCABULARY.mask(self.every)
 
     def __repr__(self) -> str:
-        return f"{self.__class__.__name__}(values={self.values})"
+        return f"{self.__class__.__name__}(values={set(self.values)})"
 
-    @property
-    def every(self) -> set[str]:
-        every = set()
+    @abc.abstractmethod
+    def validate(self, inputs: t.Collection[str]) -> None:
+        raise NotImplementedError
 
-        for set_type in self.values:
-            every |= set_type.values
 
-        return every
+class MappingFeatureType(_WriteOnce, metaclass=abc.ABCMeta):
+    __slots__ = ("values", "every", "every_key", "locked", "mask")
+
+    _noun = "feature type"
+
+    def __init__(self, *args: SetType) -> None:
+        self.values = frozenset(args)
+        self.every = frozenset().union(*(s.values for s in self.values))
+        self.every_key = frozenset().union(*(s.expd_keys for s in self.values))
+        self.locked: t.Mapping[str, str] = types.MappingProxyType(
+            dict(v.split("==") for v in self.every if "==" in v)
+        )
+        self.mask = VOCABULARY.mask(self.every_key)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(values={set(self.values)})"
 
     @abc.abstractmethod
-    def validate(self, inputs: t.Collection[str]) -> None:
+    def validate(self, inputs: dict[str, str]) -> None:
         raise NotImplementedError
 
 
-class MappingFeatureType(metaclass=abc.ABCMeta):
-    __slots__ = ("values",)
+class SetType(_WriteOnce, metaclass=abc.ABCMeta):
+    __slots__ = ("values", "expd_keys", "mask", "key_mask")
 
-    def __init__(self, *args: SetType) -> None:
-        self.values = set(args)
+    _noun = "set type"
+
+    def __init__(self, *args: str) -> None:
+        self.values = frozenset(args)
+        self.expd_keys = frozenset(
+            v[: v.index("=")] if "==" in v else v for v in self.values
+        )
+        self.mask = VOCABULARY.mask(self.values)
+        self.key_mask = VOCABULARY.mask(self.expd_keys)
 
     def __repr__(self) -> str:
-        return f"{self.__class__.__name__}(values={self.values})"
+        return f"{self.__class__.__name__}(values={set(self.values)})"
+
+    @abc.abstractmethod
+    def validate_dimensions(self, inputs: int) -> None:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def validate_filters(self, keys: int) -> None:
+        raise NotImplementedError
+
+
+class ReportCache(metaclass=abc.ABCMeta):
+    """The base class for all report caches. Caches are passed to
+    clients on creation, and are consulted before any request is made to
+    the YouTube Analytics API.
+
+    Caches must be safe to use from multiple threads. The asynchronous
+    methods call their synchronous counterparts by default, so only need
+    to be overridden if the cache does blocking I/O.
+
+    .. versionadded:: 3.6.0
+    """
+
+    __slots__ = ()
 
     @property
-    def every(self) -> set[str]:
-        every = set()
+    @abc.abstractmethod
+    def stats(self) -> CacheStats:
+        """The cache's usage statistics."""
+
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get(self, query: Query) -> Report | None:
+        """Get the cached report for a query.
 
-        for set_type in self.values:
-            every |= set_type.values
+        Args:
+            query:
+                The query to get the report for.
 
-        return every
+        Returns:
+            The cached report, or ``None`` if there is no valid cached
+            report for the query.
+        """
+
+        raise NotImplementedError
 
     @abc.abstractmethod
-    def validate(self, inputs: dict[str, str]) -> None:
+    def set(self, query: Query, report: Report) -> None:
+        """Cache a report.
+
+        Args:
+            query:
+                The query used to retrieve the report.
+            report:
+                The report to cache.
+        """
+
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def invalidate(self, query: Query) -> None:
+        """Remove the cached report for a query, if there is one.
+
+        Args:
+            query:
+                The query to remove the report for.
+        """
 
-class SetType(metaclass=abc.ABCMeta):
-    __slots__ = ("values", "expd_keys")
+        raise NotImplementedError
 
-    def __init__(self, *args: str) -> None:
-        self.values = set(args)
-        self.expd_keys = {v[: v.index("=")] if "==" in v else v for v in self.values}
+    @abc.abstractmethod
+    def clear(self) -> None:
+        """Remove all cached reports."""
 
-    def __repr__(self) -> str:
-        return f"{self.__class__.__name__}(values={self.values})"
+        raise NotImplementedError
+
+    async def aget(self, query: Query) -> Report | None:
+        """Asynchronously get the cached report for a query.
+
+        Args:
+            query:
+                The query to get the report for.
+
+        Returns:
+            The cached report, or ``None`` if there is no valid cached
+            report for the query.
+        """
+
+        return self.get(query)
+
+    async def aset(self, query: Query, report: Report) -> None:
+        """Asynchronously cache a report.
+
+        Args:
+            query:
+                The query used to retrieve the report.
+            report:
+                The report to cache.
+        """
+
+        self.set(query, report)
+
+
+class TokenStore(metaclass=abc.ABCMeta):
+    """The base class for all token stores. Token stores persist a
+    client's tokens, and allow clients in different threads or processes
+    to share them.
+
+    The asynchronous methods call their synchronous counterparts by
+    default, so only need to be overridden if the store does blocking
+    I/O.
+
+    .. versionadded:: 3.6.0
+    """
+
+    __slots__ = ()
+
+    @abc.abstractmethod
+    def load(self) -> Tokens | None:
+        """Load the stored tokens.
+
+        Returns:
+            The stored tokens, or ``None`` if there are none or they
+            could not be loaded.
+        """
+
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def save(self, tokens: Tokens) -> None:
+        """Store a set of tokens, replacing any existing ones.
+
+        Args:
+            tokens:
+                The tokens to store.
+        """
+
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def lock(self) -> t.ContextManager[None]:
+        """Get a context manager which holds an exclusive lock on the
+        store. Clients hold this while refreshing tokens, so others can
+        wait for the new tokens instead of refreshing them again.
+
+        Returns:
+            The context manager.
+        """
+
+        raise NotImplementedError
+
+    async def aload(self) -> Tokens | None:
+        """Asynchronously load the stored tokens.
+
+        Returns:
+            The stored tokens, or ``None`` if there are none or they
+            could not be loaded.
+        """
+
+        return self.load()
+
+    async def asave(self, tokens: Tokens) -> None:
+        """Asynchronously store a set of tokens, replacing any existing
+        ones.
+
+        Args:
+            tokens:
+                The tokens to store.
+        """
+
+        self.save(tokens)
+
+    @contextlib.asynccontextmanager
+    async def alock(self) -> t.AsyncIterator[None]:
+        """Get an asynchronous context manager which holds an exclusive
+        lock on the store.
+
+        Returns:
+            The context manager.
+        """
+
+        with self.lock():
+            yield
+
+
+class JSONCodec(metaclass=abc.ABCMeta):
+    """The base class for all JSON codecs. The codec in use is
+    detected automatically, but can be changed using
+    :func:`analytix.codecs.set_codec`.
+
+    .. versionadded:: 3.6.0
+    """
+
+    __slots__ = ()
+
+    name: str
+    """The name of the codec."""
 
     @abc.abstractmethod
-    def validate_dimensions(self, inputs: set[str]) -> None:
+    def loads(self, data: str | bytes) -> t.Any:
+        """Decode a JSON document.
+
+        Args:
+            data:
+                The document to decode.
+
+        Returns:
+            The decoded object.
+
+        Raises:
+            ValueError:
+                The document is not valid JSON.
+        """
+
         raise NotImplementedError
 
     @abc.abstractmethod
-    def validate_filters(self, keys: set[str]) -> None:
+    def dumps(self, obj: t.Any, *, indent: int | None = None) -> bytes:
+        """Encode an object as a UTF-8 JSON document.
+
+        Args:
+            obj:
+                The object to encode.
+
+        Keyword Args:
+            indent:
+                The number of spaces to indent nested structures by.
+                Defaults to ``None``. If this is ``None``, the document
+                is encoded as compactly as possible.
+
+        Returns:
+            The encoded document.
+        """
+
         raise NotImplementedError
 
 
@@ -176,7 +432,7 @@ class DynamicReportWriter(metaclass=abc.ABCMeta):
         path: str,
         *,
         data: dict[t.Any, t.Any],
-        indent: int = 4,
+        indent: int | None = 4,
         delimiter: str = ",",
         columns: list[t.Any] = [],
     ) -> None:
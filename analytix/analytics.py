@@ -28,20 +28,32 @@
 
 from __future__ import annotations
 
+import contextlib
 import datetime as dt
+import functools
+import itertools
 import logging
 import os
 import pathlib
+import threading
+import time
 import typing as t
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import httpx
 
 import analytix
-from analytix import errors, oauth, ux
-from analytix.queries import Query
+from analytix import codecs, errors, oauth, updates, ux
+from analytix.abc import DetailedReportType, ReportCache, TokenStore
+from analytix.hooks import HookGroup, Hooks, RequestEvent, Stopwatch
+from analytix.limits import Quota, RateLimiter
+from analytix.queries import Query, validate_many
 from analytix.reports import Report
+from analytix.retries import RetryPolicy
 from analytix.secrets import Secrets
-from analytix.tokens import Tokens
+from analytix.streaming import ReportStream
+from analytix.tokens import FileTokenStore, Tokens
+from analytix.types import QuerySpecT
 from analytix.webserver import RequestHandler, Server
 
 _log = logging.getLogger(__name__)
@@ -55,6 +67,62 @@ class Analytics:
             The project secrets from the Google Developers Console.
 
     Keyword Args:
+        refresh_margin:
+            The number of seconds before the access token expires that
+            it should be refreshed. Defaults to ``60``.
+
+            .. versionadded:: 3.6.0
+        cache:
+            The cache to store retrieved reports in. Defaults to
+            ``None``. If this is ``None``, reports are not cached.
+
+            .. versionadded:: 3.6.0
+        retry_policy:
+            How failed requests should be retried. Defaults to ``None``.
+            If this is ``None``, a :obj:`RetryPolicy` with default
+            settings is used.
+
+            .. versionadded:: 3.6.0
+        rate_limiter:
+            The rate limiter to pass requests to the API through.
+            Defaults to ``None``. If this is ``None``, requests are not
+            rate limited. Use :obj:`RateLimiter.shared` to share a
+            limiter between clients.
+
+            .. versionadded:: 3.6.0
+        quota:
+            The quota to count requests to the API against. Defaults to
+            ``None``. If this is ``None``, requests are not counted. Use
+            :obj:`Quota.for_project` to share a quota between clients.
+
+            .. versionadded:: 3.6.0
+        token_store:
+            Where to store tokens. Defaults to ``None``. If this is
+            ``None``, tokens are stored in a file at the path passed to
+            :obj:`authorise`, which can safely be shared between
+            processes.
+
+            .. versionadded:: 3.6.0
+        auth_timeout:
+            The number of seconds to wait for authorisation to complete
+            when using loopback IP address authorisation. Defaults to
+            ``300``. If this is ``None``, the client waits indefinitely.
+
+            .. versionadded:: 3.6.0
+        session:
+            An existing HTTP client to send requests with. Defaults to
+            ``None``. If this is ``None``, a new one is created using
+            any additional keyword arguments. Sessions passed in are not
+            closed by :obj:`close_session`, so they can be shared
+            between clients.
+
+            .. versionadded:: 3.6.0
+        hooks:
+            Hooks to call at each stage of retrieving a report, or a
+            collection of them. Defaults to ``None``. Multiple sets of
+            hooks are called in the order given.
+
+            .. versionadded:: 3.6.0
         **kwargs:
             Additional parameters to be passed to the
             :obj:`httpx.Client` constructor.
@@ -62,24 +130,101 @@ class Analytics:
     Attributes:
         secrets:
             A :obj:`Secrets` object representing your project secrets.
+        refresh_margin:
+            The number of seconds before the access token expires that
+            it should be refreshed.
+
+            .. versionadded:: 3.6.0
+        cache:
+            The cache retrieved reports are stored in, if any.
+
+            .. versionadded:: 3.6.0
+        retry_policy:
+            How failed requests are retried.
+
+            .. versionadded:: 3.6.0
+        rate_limiter:
+            The rate limiter requests to the API pass through, if any.
+
+            .. versionadded:: 3.6.0
+        quota:
+            The quota requests to the API are counted against, if any.
+
+            .. versionadded:: 3.6.0
+        token_store:
+            The store tokens are kept in, if not the default.
+
+            .. versionadded:: 3.6.0
+        auth_timeout:
+            The number of seconds to wait for authorisation to complete.
+
+            .. versionadded:: 3.6.0
+        hooks:
+            The hooks called at each stage of retrieving a report.
+
+            .. versionadded:: 3.6.0
     """
 
     __slots__ = (
         "secrets",
+        "refresh_margin",
+        "cache",
+        "retry_policy",
+        "rate_limiter",
+        "quota",
+        "token_store",
+        "auth_timeout",
+        "hooks",
         "_legacy_auth",
         "_session",
+        "_owns_session",
         "_tokens",
         "_token_path",
+        "_file_store",
         "_checked_for_update",
+        "_token_lock",
+        "_update_thread",
     )
 
-    def __init__(self, secrets: Secrets, **kwargs: t.Any) -> None:
+    def __init__(
+        self,
+        secrets: Secrets,
+        *,
+        refresh_margin: float = 60.0,
+        cache: ReportCache | None = None,
+        retry_policy: RetryPolicy | None = None,
+        rate_limiter: RateLimiter | None = None,
+        quota: Quota | None = None,
+        token_store: TokenStore | None = None,
+        auth_timeout: float | None = 300.0,
+        session: httpx.Client | None = None,
+        hooks: Hooks | t.Iterable[Hooks] | None = None,
+        **kwargs: t.Any,
+    ) -> None:
+        if quota is not None and quota.project_id != secrets.project_id:
+            raise ValueError(
+                f"quota belongs to project {quota.project_id}, "
+                f"not {secrets.project_id}"
+            )
+
         self.secrets = secrets
+        self.refresh_margin = refresh_margin
+        self.cache = cache
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.rate_limiter = rate_limiter
+        self.quota = quota
+        self.token_store = token_store
+        self.auth_timeout = auth_timeout
+        self.hooks = HookGroup.combine(hooks)
         self._legacy_auth = False
-        self._session = httpx.Client(**kwargs)
+        self._session = session if session is not None else httpx.Client(**kwargs)
+        self._owns_session = session is None
         self._tokens: Tokens | None = None
-        self._token_path = pathlib.Path()
+        self._token_path = pathlib.Path("tokens.json")
+        self._file_store: FileTokenStore | None = None
         self._checked_for_update = False
+        self._token_lock = threading.Lock()
+        self._update_thread: threading.Thread | None = None
 
     def __str__(self) -> str:
         return self.secrets.project_id
@@ -145,10 +290,15 @@ class Analytics:
         self._legacy_auth = value
 
     def close_session(self) -> None:
-        """Close the currently open session."""
+        """Close the currently open session.
+
+        .. versionchanged:: 3.6.0
+            Sessions passed to the client are left open.
+        """
 
-        self._session.close()
-        _log.info("Session closed")
+        if self._owns_session:
+            self._session.close()
+            _log.info("Session closed")
 
     def check_for_updates(self) -> str | None:
         """Checks for newer versions of analytix.
@@ -167,20 +317,51 @@ class Analytics:
             _log.debug("Failed to get version information")
             return None
 
-        latest = r.json()["info"]["version"]
-        if analytix.__version__ != latest:
-            _log.warning(
-                f"You do not have the latest stable version of analytix (v{latest})"
-            )
+        latest = codecs.loads(r.content)["info"]["version"]
+        updates.warn_if_outdated(latest)
 
         self._checked_for_update = True
         return t.cast(str, latest)
 
+    def _start_update_check(self) -> None:
+        self._checked_for_update = True
+
+        if updates.enabled():
+            self._update_thread = threading.Thread(
+                target=self._check_in_background,
+                name="analytix-update-check",
+                daemon=True,
+            )
+            self._update_thread.start()
+
+    def _check_in_background(self) -> None:
+        latest = updates.read_cached()
+        if latest is not None:
+            updates.warn_if_outdated(latest)
+            return
+
+        try:
+            latest = self.check_for_updates()
+        except Exception as exc:
+            # This should never stop anyone from using analytix.
+            _log.debug("Failed to check for updates: %s", exc)
+            return
+
+        if latest is not None:
+            updates.write_cached(latest)
+
     def _try_load_tokens(self, path: pathlib.Path) -> Tokens | None:
-        if not path.is_file():
-            return None
+        return self._get_token_store(path).load()
+
+    def _get_token_store(self, path: pathlib.Path) -> TokenStore:
+        if self.token_store is not None:
+            return self.token_store
 
-        return Tokens.from_file(path)
+        # Reuse the store so its cached tokens are too.
+        if self._file_store is None or self._file_store.path != path:
+            self._file_store = FileTokenStore(path)
+
+        return self._file_store
 
     def _mcp(self, url: str) -> str:
         return input(
@@ -193,14 +374,10 @@ class Analytics:
         ws = Server((redirect_uri[7:], port), RequestHandler)
 
         try:
-            ws.handle_request()
-        except KeyboardInterrupt as exc:
-            raise exc
+            return ws.wait_for_code(timeout=self.auth_timeout)
         finally:
             ws.server_close()
 
-        return ws.code
-
     def _retrieve_tokens(self, redirect_uris: list[str], port: int) -> Tokens:
         if self.legacy_auth:
             rd_addr = redirect_uris[0]
@@ -213,16 +390,25 @@ class Analytics:
 
         data, headers = oauth.access_data_and_headers(code, self.secrets, rd_addr)
 
-        r = self._session.post(self.secrets.token_uri, data=data, headers=headers)
+        r = self.retry_policy.send(
+            lambda: self._session.post(
+                self.secrets.token_uri, data=data, headers=headers
+            )
+        )
         if r.is_error:
-            raise errors.AuthenticationError(**r.json())
+            raise errors.AuthenticationError(**codecs.loads(r.content))
 
-        return Tokens.from_data(r.json())
+        return Tokens.from_data(codecs.loads(r.content))
 
     def needs_refresh(self) -> bool:
         """Check whether any existing token needs refreshing. If the
         client is not currently authorised, this will return ``False``.
 
+        .. versionchanged:: 3.6.0
+            This is now determined locally using the token's expiry
+            time and the client's refresh margin. The token is only
+            checked with Google if its expiry time is not known.
+
         Returns:
             Whether the access token needs to be refreshed.
         """
@@ -230,9 +416,24 @@ class Analytics:
         if not self._tokens:
             return False
 
-        _log.debug("Checking if token needs to be refreshed...")
+        if self._tokens.expires_at is None:
+            return not self._check_token()
+
+        return self._tokens.is_expired(margin=self.refresh_margin)
+
+    def _check_token(self) -> bool:
+        assert self._tokens is not None
+
+        _log.debug("Checking token with Google...")
         r = self._session.get(analytix.OAUTH_CHECK_URL + self._tokens.access_token)
-        return r.is_error
+        if r.is_error:
+            return False
+
+        expires_in = codecs.loads(r.content).get("expires_in")
+        if expires_in is not None:
+            self._tokens.expires_at = time.time() + int(expires_in)
+
+        return True
 
     def refresh_access_token(self, *, port: int = 8080) -> None:
         """Refresh the access token.
@@ -251,19 +452,49 @@ class Analytics:
             _log.warning("There are no tokens to refresh")
             return
 
-        _log.info("Refreshing access token...")
-        data, headers = oauth.refresh_data_and_headers(
-            self._tokens.refresh_token, self.secrets
-        )
-
-        r = self._session.post(self.secrets.token_uri, data=data, headers=headers)
-        if not r.is_error:
-            self._tokens.update(r.json())
-        else:
-            _log.info("Your refresh token has expired; you will need to reauthorise")
-            self._tokens = self._retrieve_tokens(self.secrets.redirect_uris, port)
+        store = self._get_token_store(self._token_path)
+
+        # Other processes sharing the store wait here while one of them
+        # refreshes, and then use the tokens it stored.
+        with store.lock():
+            stored = store.load()
+            if (
+                stored is not None
+                and stored.access_token != self._tokens.access_token
+                and not stored.is_expired(margin=self.refresh_margin)
+            ):
+                _log.info("Access token was refreshed by another client")
+                self._tokens = stored
+                return
+
+            _log.info("Refreshing access token...")
+            data, headers = oauth.refresh_data_and_headers(
+                self._tokens.refresh_token, self.secrets
+            )
 
-        self._tokens.write(self._token_path)
+            event = RequestEvent.for_query(None)
+            watch = Stopwatch(event.timings)
+            r = self.retry_policy.send(
+                lambda: self._session.post(
+                    self.secrets.token_uri, data=data, headers=headers
+                ),
+                on_retry=self.hooks.retry_callback(event),
+            )
+            watch.lap("refresh")
+            event.attempt = None
+            event.status_code = r.status_code
+            event.size = len(r.content)
+            self.hooks.on_refresh(event)
+
+            if not r.is_error:
+                self._tokens.update(codecs.loads(r.content))
+            else:
+                _log.info(
+                    "Your refresh token has expired; you will need to reauthorise"
+                )
+                self._tokens = self._retrieve_tokens(self.secrets.redirect_uris, port)
+
+            store.save(self._tokens)
 
     def authorise(  # nosec B107
         self,
@@ -312,9 +543,19 @@ class Analytics:
             self._tokens = self._try_load_tokens(token_path)
 
         if not self._tokens:
-            _log.info("Unable to load tokens; you will need to authorise")
-            self._tokens = self._retrieve_tokens(self.secrets.redirect_uris, port)
-            self._tokens.write(token_path)
+            store = self._get_token_store(token_path)
+
+            # Make sure only one process sharing the store authorises.
+            with store.lock():
+                if not force:
+                    self._tokens = store.load()
+
+                if not self._tokens:
+                    _log.info("Unable to load tokens; you will need to authorise")
+                    self._tokens = self._retrieve_tokens(
+                        self.secrets.redirect_uris, port
+                    )
+                    store.save(self._tokens)
 
         _log.info("Authorisation complete!")
         return self._tokens
@@ -338,6 +579,8 @@ class Analytics:
         skip_refresh_check: bool = False,
         token_path: pathlib.Path | str = ".",
         port: int = 8080,
+        shard_by: str | None = None,
+        max_workers: int = 10,
     ) -> Report:
         """Retrieves a report from the YouTube Analytics API.
 
@@ -398,7 +641,8 @@ class Analytics:
                 Defaults to ``False``.
             skip_update_check:
                 Whether to skip checking for updates. Defaults to
-                ``False``.
+                ``False``. Updates are checked in the background, at
+                most once a day.
             skip_refresh_token:
                 Whether to skip token refreshing. Defaults to ``False``.
             token_path:
@@ -416,13 +660,140 @@ class Analytics:
                 manual copy/paste authorisation.
 
                 .. versionadded:: 3.4.0
+            shard_by:
+                The unit of time to split the request into; either
+                "day", "week", or "month". Defaults to ``None``. If
+                this is ``None``, the report is retrieved in a single
+                request. Otherwise, each window is retrieved separately
+                and the results are stitched back together into a
+                single report. The report must have either the "day"
+                or "month" dimension. Reports with the "day" dimension
+                can be split by any unit, but reports with the "month"
+                dimension can only be split by "month". Sharded reports
+                cannot have sort options, a maximum number of results,
+                or a start index.
+
+                .. versionadded:: 3.6.0
+            max_workers:
+                The maximum number of worker threads used to retrieve
+                shards in parallel. Defaults to ``10``. This is
+                ignored if ``shard_by`` is ``None``.
+
+                .. versionadded:: 3.6.0
 
         Returns:
             An instance for working with retrieved data.
         """
 
         if not skip_update_check and not self._checked_for_update:
-            self.check_for_updates()
+            self._start_update_check()
+
+        timings: dict[str, float] = {}
+        watch = Stopwatch(timings)
+        query = Query(
+            dimensions,
+            filters,
+            metrics,
+            sort_options,
+            max_results,
+            start_date,
+            end_date,
+            currency,
+            start_index,
+            include_historical_data,
+        )
+
+        if not skip_validation:
+            query.validate()
+            watch.lap("validate")
+        else:
+            _log.warning(
+                "Skipping validation -- invalid requests will count toward your quota"
+            )
+
+        shards = query.shard(shard_by) if shard_by else None
+        if shards is not None and max_workers < 1:
+            raise ValueError("the maximum number of workers should be positive")
+
+        watch.skip()
+        self._prepare_tokens(force_authorisation, skip_refresh_check, token_path, port)
+        watch.lap("auth")
+
+        if shards is None:
+            return self._fetch(query, port, timings=timings)
+
+        fetch = functools.partial(self._fetch, timings=timings)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            reports = executor.map(fetch, shards, itertools.repeat(port))
+            return Report.concat(list(reports))
+
+    def retrieve_pages(
+        self,
+        *,
+        dimensions: t.Collection[str] | None = None,
+        filters: dict[str, str] | None = None,
+        metrics: t.Collection[str] | None = None,
+        sort_options: t.Collection[str] | None = None,
+        max_results: int = 0,
+        start_date: dt.date | None = None,
+        end_date: dt.date | None = None,
+        currency: str = "USD",
+        start_index: int = 1,
+        include_historical_data: bool = False,
+        row_limit: int = 0,
+        skip_validation: bool = False,
+        force_authorisation: bool = False,
+        skip_update_check: bool = False,
+        skip_refresh_check: bool = False,
+        token_path: pathlib.Path | str = ".",
+        port: int = 8080,
+    ) -> t.Iterator[Report]:
+        """Retrieves a report from the YouTube Analytics API one page at
+        a time. This is useful for report types which cap the number of
+        results that can be retrieved in a single request, such as top
+        videos reports.
+
+        Pages are retrieved lazily as you iterate::
+
+            for page in client.retrieve_pages(...):
+                ...
+
+        The pages can be stitched back together using
+        :meth:`Report.concat`::
+
+            report = Report.concat(client.retrieve_pages(...))
+
+        This takes all the same arguments as :meth:`retrieve`, with the
+        exception of ``max_results``, which is used as the page size,
+        and ``row_limit``.
+
+        Keyword Args:
+            max_results:
+                The number of rows to retrieve per page. Defaults to
+                ``0``. If this is ``0``, the maximum number of results
+                supported by the report type will be used. If the report
+                type does not limit the number of results, all rows will
+                be retrieved in a single page.
+            row_limit:
+                The maximum number of rows to retrieve across all pages.
+                Defaults to ``0``. If this is ``0``, pages will be
+                retrieved until the API returns a page with fewer rows
+                than the page size.
+
+        Returns:
+            An iterator of reports, each containing a single page of
+            data.
+
+        .. versionadded:: 3.6.0
+        """
+
+        if row_limit < 0:
+            raise errors.InvalidRequest(
+                "the row limit should be non-negative (0 for unlimited rows)"
+            )
+
+        if not skip_update_check and not self._checked_for_update:
+            self._start_update_check()
 
         query = Query(
             dimensions,
@@ -437,6 +808,11 @@ class Analytics:
             include_historical_data,
         )
 
+        if not query.max_results:
+            query.set_report_type()
+            if isinstance(query.rtype, DetailedReportType):
+                query.max_results = query.rtype.max_results
+
         if not skip_validation:
             query.validate()
         else:
@@ -444,26 +820,452 @@ class Analytics:
                 "Skipping validation -- invalid requests will count toward your quota"
             )
 
-        if not self.authorised or force_authorisation:
-            self.authorise(token_path=token_path, force=force_authorisation, port=port)
+        self._prepare_tokens(force_authorisation, skip_refresh_check, token_path, port)
+
+        page_size = query.max_results
+        fetched = 0
+
+        while True:
+            if row_limit:
+                remaining = row_limit - fetched
+                query.max_results = (
+                    min(page_size, remaining) if page_size else remaining
+                )
+
+            report = self._fetch(query, port)
+            yield report
+
+            rows = report.shape[0]
+            fetched += rows
+            _log.info("Retrieved %d row(s) so far", fetched)
+
+            if (
+                not page_size
+                or rows < query.max_results
+                or (row_limit and fetched >= row_limit)
+            ):
+                return
+
+            query.start_index += rows
+
+    @contextlib.contextmanager
+    def retrieve_stream(
+        self,
+        *,
+        dimensions: t.Collection[str] | None = None,
+        filters: dict[str, str] | None = None,
+        metrics: t.Collection[str] | None = None,
+        sort_options: t.Collection[str] | None = None,
+        max_results: int = 0,
+        start_date: dt.date | None = None,
+        end_date: dt.date | None = None,
+        currency: str = "USD",
+        start_index: int = 1,
+        include_historical_data: bool = False,
+        skip_validation: bool = False,
+        force_authorisation: bool = False,
+        skip_update_check: bool = False,
+        skip_refresh_check: bool = False,
+        token_path: pathlib.Path | str = ".",
+        port: int = 8080,
+    ) -> t.Iterator[ReportStream]:
+        """Retrieves a report from the YouTube Analytics API, parsing
+        its rows as the response is read. This keeps memory usage low
+        for large reports, as the full set of rows is never held in
+        memory at once.
+
+        This is used as a context manager, which closes the response
+        when exited::
+
+            with client.retrieve_stream(...) as stream:
+                print(stream.columns)
+                for row in stream:
+                    ...
+
+        This takes all the same arguments as :meth:`retrieve`, with the
+        exception of ``shard_by`` and ``max_workers``. Streamed reports
+        are never cached.
+
+        Returns:
+            A stream of the report's rows. The column headers are
+            available as soon as the stream is returned.
+
+        .. versionadded:: 3.6.0
+        """
+
+        if not skip_update_check and not self._checked_for_update:
+            self._start_update_check()
+
+        query = Query(
+            dimensions,
+            filters,
+            metrics,
+            sort_options,
+            max_results,
+            start_date,
+            end_date,
+            currency,
+            start_index,
+            include_historical_data,
+        )
+
+        if not skip_validation:
+            query.validate()
+        else:
+            _log.warning(
+                "Skipping validation -- invalid requests will count toward your quota"
+            )
+
+        self._prepare_tokens(force_authorisation, skip_refresh_check, token_path, port)
+
+        if not query.rtype:
+            query.set_report_type()
+
+        assert query.rtype is not None
+        resp = self._open_stream(query, port)
+
+        try:
+            yield ReportStream(resp.iter_text(), query.rtype)
+        finally:
+            resp.close()
+
+    def retrieve_many(
+        self,
+        queries: t.Iterable[QuerySpecT],
+        *,
+        max_workers: int = 10,
+        skip_validation: bool = False,
+        force_authorisation: bool = False,
+        skip_update_check: bool = False,
+        skip_refresh_check: bool = False,
+        token_path: pathlib.Path | str = ".",
+        port: int = 8080,
+    ) -> list[Report | Exception]:
+        """Retrieves multiple reports from the YouTube Analytics API in
+        parallel.
+
+        This is the ordered version of :meth:`retrieve_as_completed`;
+        see that method for more information.
+
+        Returns:
+            A list of results in the same order as the given queries.
+            Each result is either an instance for working with retrieved
+            data, or the exception that was raised while validating or
+            retrieving that query.
+
+        .. versionadded:: 3.6.0
+        """
+
+        results = self.retrieve_as_completed(
+            queries,
+            max_workers=max_workers,
+            skip_validation=skip_validation,
+            force_authorisation=force_authorisation,
+            skip_update_check=skip_update_check,
+            skip_refresh_check=skip_refresh_check,
+            token_path=token_path,
+            port=port,
+        )
+        return [result for _, result in sorted(results, key=lambda r: r[0])]
+
+    def retrieve_as_completed(
+        self,
+        queries: t.Iterable[QuerySpecT],
+        *,
+        max_workers: int = 10,
+        skip_validation: bool = False,
+        force_authorisation: bool = False,
+        skip_update_check: bool = False,
+        skip_refresh_check: bool = False,
+        token_path: pathlib.Path | str = ".",
+        port: int = 8080,
+    ) -> t.Iterator[tuple[int, Report | Exception]]:
+        """Retrieves multiple reports from the YouTube Analytics API in
+        parallel, yielding each one as soon as it is available.
+
+        Every query is validated, and the client is authorised (and its
+        access token refreshed if needed) once for the whole batch
+        before this method returns. The requests themselves are sent by
+        a pool of worker threads which all share this client's
+        connection pool.
+
+        Args:
+            queries:
+                The queries to make. Each query should be a mapping of
+                the keyword arguments you would otherwise pass to
+                :meth:`retrieve` to define the report (``dimensions``,
+                ``filters``, ``metrics``, ``sort_options``,
+                ``max_results``, ``start_date``, ``end_date``,
+                ``currency``, ``start_index``, and
+                ``include_historical_data``).
+
+        Keyword Args:
+            max_workers:
+                The maximum number of worker threads, and therefore the
+                maximum number of requests that can be in flight at any
+                one time. Defaults to ``10``.
+            skip_validation:
+                Whether to skip the validation process. Defaults to
+                ``False``.
+            force_authorisation:
+                Whether to force the (re)authorisation of the client.
+                Defaults to ``False``.
+            skip_update_check:
+                Whether to skip checking for updates. Defaults to
+                ``False``. Updates are checked in the background, at
+                most once a day.
+            skip_refresh_check:
+                Whether to skip token refreshing. Defaults to ``False``.
+            token_path:
+                The path to the token file or the directory the token
+                file is or should be stored in. If this is not provided,
+                this defaults to the current directory, and if a
+                directory is passed, the file is given the name
+                "tokens.json".
+            port:
+                The port to use for the authorisation webserver when
+                using loopback IP address authorisation. Defaults to
+                8080. This is ignored if analytix is configured to use
+                manual copy/paste authorisation.
+
+        Returns:
+            An iterator of ``(index, result)`` tuples in the order in
+            which they complete, where ``index`` is the position of the
+            query in ``queries``. Each result is either an instance for
+            working with retrieved data, or the exception that was
+            raised while validating or retrieving that query.
+
+        .. versionadded:: 3.6.0
+        """
+
+        if max_workers < 1:
+            raise ValueError("the maximum number of workers should be positive")
+
+        if not skip_update_check and not self._checked_for_update:
+            self._start_update_check()
+
+        built: list[Query | Exception]
+        if skip_validation:
+            _log.warning(
+                "Skipping validation -- invalid requests will count toward your quota"
+            )
+            built = []
+            for spec in queries:
+                try:
+                    built.append(Query(**spec))
+                except TypeError as exc:
+                    built.append(exc)
+        else:
+            built = validate_many(queries)
+
+        failed: dict[int, Exception] = {}
+        pending: dict[int, Query] = {}
+
+        for i, item in enumerate(built):
+            if isinstance(item, Exception):
+                failed[i] = item
+            else:
+                pending[i] = item
+
+        total = len(failed) + len(pending)
+        _log.info("Retrieving %d of %d report(s)...", len(pending), total)
+        if pending:
+            self._prepare_tokens(
+                force_authorisation, skip_refresh_check, token_path, port
+            )
+
+        return self._fetch_as_completed(failed, pending, max_workers, port)
+
+    def _fetch_as_completed(
+        self,
+        failed: dict[int, Exception],
+        pending: dict[int, Query],
+        workers: int,
+        port: int,
+    ) -> t.Iterator[tuple[int, Report | Exception]]:
+        yield from failed.items()
+
+        if not pending:
+            return
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(self._fetch, q, port): i for i, q in pending.items()
+            }
+
+            try:
+                for future in as_completed(futures):
+                    exc = future.exception()
+                    if exc is not None and not isinstance(exc, Exception):
+                        # Don't swallow interrupts.
+                        raise exc
+
+                    yield futures[future], exc or future.result()
+            finally:
+                # If the caller stops iterating early, don't bother
+                # sending requests nobody is waiting for.
+                for future in futures:
+                    future.cancel()
+
+    def _prepare_tokens(
+        self,
+        force_authorisation: bool,
+        skip_refresh_check: bool,
+        token_path: pathlib.Path | str,
+        port: int,
+    ) -> None:
+        # Worker threads may be retrieving reports concurrently, so only
+        # one of them should ever be (re)authorising at a time.
+        with self._token_lock:
+            if not self.authorised or force_authorisation:
+                self.authorise(
+                    token_path=token_path, force=force_authorisation, port=port
+                )
+
+            if (not skip_refresh_check) and self.needs_refresh():
+                self.refresh_access_token(port=port)
+
+    def _get(
+        self, url: str, headers: dict[str, str], *, stream: bool = False
+    ) -> httpx.Response:
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+
+        if self.quota is not None:
+            self.quota.consume()
+
+        if not stream:
+            return self._session.get(url, headers=headers)
+
+        request = self._session.build_request("GET", url, headers=headers)
+        resp = self._session.send(request, stream=True)
+
+        if resp.is_error:
+            # Error bodies are small, and need to be read to decide
+            # whether to retry.
+            resp.read()
+
+        return resp
+
+    def _refresh_rejected_token(self, token: str, port: int) -> bool:
+        with self._token_lock:
+            assert self._tokens is not None
+
+            if self._tokens.access_token != token:
+                # Another thread has already refreshed it.
+                return True
+
+            if self._check_token():
+                # The token is fine, so refreshing won't help.
+                return False
 
-        if (not skip_refresh_check) and self.needs_refresh():
             self.refresh_access_token(port=port)
+            return True
+
+    def _fetch(
+        self,
+        query: Query,
+        port: int,
+        *,
+        retry: bool = True,
+        timings: dict[str, float] | None = None,
+    ) -> Report:
+        event = RequestEvent.for_query(query, timings)
+        watch = Stopwatch(event.timings)
+
+        if not query.rtype:
+            query.set_report_type()
+
+        assert query.rtype is not None
+        if self.cache is not None:
+            cached = self.cache.get(query)
+            watch.lap("cache")
+
+            if cached is not None:
+                _log.info("Retrieved report of shape %s from cache", cached.shape)
+                event.report = cached
+                event.from_cache = True
+                self.hooks.on_report_built(event)
+                return cached
 
         assert self._tokens is not None
-        headers = {"Authorization": f"Bearer {self._tokens.access_token}"}
-        resp = self._session.get(query.url, headers=headers)
-        data = resp.json()
-        _log.debug(f"Data retrieved: {data}")
+        token = self._tokens.access_token
+        headers = {"Authorization": f"Bearer {token}"}
+        self.hooks.before_request(event)
+        watch.skip()
+        resp = self.retry_policy.send(
+            lambda: self._get(query.url, headers),
+            on_retry=self.hooks.retry_callback(event),
+        )
+        watch.lap("http")
+        event.attempt = None
+        event.status_code = resp.status_code
+        event.size = len(resp.content)
+        self.hooks.after_response(event)
+
+        if resp.status_code == 401 and retry:
+            _log.info("Access token was rejected")
+            if self._refresh_rejected_token(token, port):
+                return self._fetch(query, port, retry=False, timings=timings)
+
+        watch.skip()
+        data = codecs.loads(resp.content)
+        watch.lap("decode")
 
         if next(iter(data)) == "error":
             error = data["error"]
             raise errors.APIError(error["code"], error["message"])
 
-        if not query.rtype:
-            query.set_report_type()
+        # Only summarise the payload -- formatting the rows themselves
+        # would cost more than the request for large reports.
+        _log.debug(
+            "Retrieved %d row(s) (%d bytes) in %.2f seconds",
+            len(data.get("rows", ())),
+            event.size,
+            event.timings["http"],
+        )
 
-        assert query.rtype is not None
+        watch.skip()
         report = Report(data, query.rtype)
-        _log.info(f"Created report of shape {report.shape}!")
+        watch.lap("build")
+        _log.info("Created report of shape %s!", report.shape)
+
+        if self.cache is not None:
+            self.cache.set(query, report)
+
+        event.report = report
+        self.hooks.on_report_built(event)
         return report
+
+    def _open_stream(
+        self,
+        query: Query,
+        port: int,
+        *,
+        retry: bool = True,
+        timings: dict[str, float] | None = None,
+    ) -> httpx.Response:
+        event = RequestEvent.for_query(query, timings)
+        watch = Stopwatch(event.timings)
+
+        assert self._tokens is not None
+        token = self._tokens.access_token
+        headers = {"Authorization": f"Bearer {token}"}
+        self.hooks.before_request(event)
+        watch.skip()
+        resp = self.retry_policy.send(
+            lambda: self._get(query.url, headers, stream=True),
+            on_retry=self.hooks.retry_callback(event),
+        )
+        watch.lap("http")
+        event.attempt = None
+        event.status_code = resp.status_code
+        self.hooks.after_response(event)
+
+        if resp.status_code == 401 and retry:
+            _log.info("Access token was rejected")
+            if self._refresh_rejected_token(token, port):
+                resp.close()
+                return self._open_stream(query, port, retry=False, timings=timings)
+
+        return resp
@@ -28,21 +28,30 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import datetime as dt
 import logging
 import os
 import pathlib
+import time
 import typing as t
 
 import httpx
 
 import analytix
-from analytix import errors, oauth, ux
-from analytix.queries import Query
+from analytix import codecs, errors, oauth, updates, ux
+from analytix.abc import DetailedReportType, ReportCache, TokenStore
+from analytix.hooks import HookGroup, Hooks, RequestEvent, Stopwatch
+from analytix.limits import Quota, RateLimiter
+from analytix.queries import Query, validate_many
 from analytix.reports import Report
+from analytix.retries import RetryPolicy
 from analytix.secrets import Secrets
-from analytix.tokens import Tokens
-from analytix.webserver import RequestHandler, Server
+from analytix.streaming import AsyncReportStream
+from analytix.tokens import FileTokenStore, Tokens
+from analytix.types import QuerySpecT
+from analytix.webserver import AsyncServer
 
 _log = logging.getLogger(__name__)
 
@@ -56,31 +65,193 @@ class AsyncAnalytics:
             The project secrets from the Google Developers Console.
 
     Keyword Args:
+        refresh_margin:
+            The number of seconds before the access token expires that
+            it should be refreshed. Defaults to ``60``.
+
+            .. versionadded:: 3.6.0
+        cache:
+            The cache to store retrieved reports in. Defaults to
+            ``None``. If this is ``None``, reports are not cached.
+
+            .. versionadded:: 3.6.0
+        retry_policy:
+            How failed requests should be retried. Defaults to ``None``.
+            If this is ``None``, a :obj:`RetryPolicy` with default
+            settings is used.
+
+            .. versionadded:: 3.6.0
+        rate_limiter:
+            The rate limiter to pass requests to the API through.
+            Defaults to ``None``. If this is ``None``, requests are not
+            rate limited. Use :obj:`RateLimiter.shared` to share a
+            limiter between clients.
+
+            .. versionadded:: 3.6.0
+        quota:
+            The quota to count requests to the API against. Defaults to
+            ``None``. If this is ``None``, requests are not counted. Use
+            :obj:`Quota.for_project` to share a quota between clients.
+
+            .. versionadded:: 3.6.0
+        auto_refresh:
+            Whether to refresh the access token in the background
+            shortly before it expires, so retrievals never need to wait
+            for it to be refreshed. Defaults to ``False``. The
+            background task is started when the client is authorised,
+            and stopped when the session is closed.
+
+            .. versionadded:: 3.6.0
+        token_store:
+            Where to store tokens. Defaults to ``None``. If this is
+            ``None``, tokens are stored in a file at the path passed to
+            :obj:`authorise`, which can safely be shared between
+            processes.
+
+            .. versionadded:: 3.6.0
+        auth_timeout:
+            The number of seconds to wait for authorisation to complete
+            when using loopback IP address authorisation. Defaults to
+            ``300``. If this is ``None``, the client waits indefinitely.
+
+            .. versionadded:: 3.6.0
+        session:
+            An existing HTTP client to send requests with. Defaults to
+            ``None``. If this is ``None``, a new one is created using
+            any additional keyword arguments. Sessions passed in are not
+            closed by :obj:`close_session`, so they can be shared
+            between clients.
+
+            .. versionadded:: 3.6.0
+        hooks:
+            Hooks to call at each stage of retrieving a report, or a
+            collection of them. Defaults to ``None``. Multiple sets of
+            hooks are called in the order given.
+
+            .. versionadded:: 3.6.0
         **kwargs:
             Additional parameters to be passed to the
-            :obj:`httpx.Client` constructor.
+            :obj:`httpx.AsyncClient` constructor.
 
     Attributes:
         secrets:
             A :obj:`Secrets` object representing your project secrets.
+        refresh_margin:
+            The number of seconds before the access token expires that
+            it should be refreshed.
+
+            .. versionadded:: 3.6.0
+        cache:
+            The cache retrieved reports are stored in, if any.
+
+            .. versionadded:: 3.6.0
+        retry_policy:
+            How failed requests are retried.
+
+            .. versionadded:: 3.6.0
+        rate_limiter:
+            The rate limiter requests to the API pass through, if any.
+
+            .. versionadded:: 3.6.0
+        quota:
+            The quota requests to the API are counted against, if any.
+
+            .. versionadded:: 3.6.0
+        auto_refresh:
+            Whether the access token is refreshed in the background.
+
+            .. versionadded:: 3.6.0
+        token_store:
+            The store tokens are kept in, if not the default.
+
+            .. versionadded:: 3.6.0
+        auth_timeout:
+            The number of seconds to wait for authorisation to complete.
+
+            .. versionadded:: 3.6.0
+        hooks:
+            The hooks called at each stage of retrieving a report.
+
+            .. versionadded:: 3.6.0
     """
 
     __slots__ = (
         "secrets",
+        "refresh_margin",
+        "cache",
+        "retry_policy",
+        "rate_limiter",
+        "quota",
+        "auto_refresh",
+        "token_store",
+        "auth_timeout",
+        "hooks",
         "_legacy_auth",
         "_session",
+        "_owns_session",
         "_tokens",
         "_token_path",
+        "_file_store",
         "_checked_for_update",
+        "_inflight",
+        "_waiters",
+        "_coalesced_requests",
+        "_token_lock",
+        "_refreshing",
+        "_refreshing_can_reauthorise",
+        "_refresh_task",
+        "_update_task",
     )
 
-    def __init__(self, secrets: Secrets, **kwargs: t.Any) -> None:
+    def __init__(
+        self,
+        secrets: Secrets,
+        *,
+        refresh_margin: float = 60.0,
+        cache: ReportCache | None = None,
+        retry_policy: RetryPolicy | None = None,
+        rate_limiter: RateLimiter | None = None,
+        quota: Quota | None = None,
+        auto_refresh: bool = False,
+        token_store: TokenStore | None = None,
+        auth_timeout: float | None = 300.0,
+        session: httpx.AsyncClient | None = None,
+        hooks: Hooks | t.Iterable[Hooks] | None = None,
+        **kwargs: t.Any,
+    ) -> None:
+        if quota is not None and quota.project_id != secrets.project_id:
+            raise ValueError(
+                f"quota belongs to project {quota.project_id}, "
+                f"not {secrets.project_id}"
+            )
+
         self.secrets = secrets
+        self.refresh_margin = refresh_margin
+        self.cache = cache
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.rate_limiter = rate_limiter
+        self.quota = quota
+        self.auto_refresh = auto_refresh
+        self.token_store = token_store
+        self.auth_timeout = auth_timeout
+        self.hooks = HookGroup.combine(hooks)
         self._legacy_auth = False
-        self._session = httpx.AsyncClient(**kwargs)
+        self._session = session if session is not None else httpx.AsyncClient(**kwargs)
+        self._owns_session = session is None
         self._tokens: Tokens | None = None
-        self._token_path = pathlib.Path()
+        self._token_path = pathlib.Path("tokens.json")
+        self._file_store: FileTokenStore | None = None
         self._checked_for_update = False
+        self._inflight: dict[str, asyncio.Task[Report]] = {}
+        self._waiters: dict[str, int] = {}
+        self._coalesced_requests = 0
+        # Locks can't be created outside of an event loop on some
+        # Python versions, so this is created when first needed.
+        self._token_lock: asyncio.Lock | None = None
+        self._refreshing: asyncio.Future[None] | None = None
+        self._refreshing_can_reauthorise = True
+        self._refresh_task: asyncio.Task[None] | None = None
+        self._update_task: asyncio.Task[None] | None = None
 
     def __str__(self) -> str:
         return self.secrets.project_id
@@ -110,6 +281,17 @@ class AsyncAnalytics:
 
         return self._tokens is not None
 
+    @property
+    def coalesced_requests(self) -> int:
+        """The number of retrievals which did not make their own request
+        because an identical request was already in flight. This
+        property is read-only.
+
+        .. versionadded:: 3.6.0
+        """
+
+        return self._coalesced_requests
+
     @property
     def legacy_auth(self) -> bool:
         """Whether to use manual copy/paste authorisation.
@@ -146,10 +328,27 @@ class AsyncAnalytics:
         self._legacy_auth = value
 
     async def close_session(self) -> None:
-        """Close the currently open session."""
+        """Close the currently open session.
 
-        await self._session.aclose()
-        _log.info("Session closed")
+        .. versionchanged:: 3.6.0
+            This now also stops any background tasks that are running.
+            Sessions passed to the client are left open.
+        """
+
+        for task in (self._refresh_task, self._update_task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+
+        self._refresh_task = None
+        self._update_task = None
+
+        if self._owns_session:
+            await self._session.aclose()
+            _log.info("Session closed")
 
     async def check_for_updates(self) -> str | None:
         """Checks for newer versions of analytix.
@@ -168,20 +367,46 @@ class AsyncAnalytics:
             _log.debug("Failed to get version information")
             return None
 
-        latest = r.json()["info"]["version"]
-        if analytix.__version__ != latest:
-            _log.warning(
-                f"You do not have the latest stable version of analytix (v{latest})"
-            )
+        latest = codecs.loads(r.content)["info"]["version"]
+        updates.warn_if_outdated(latest)
 
         self._checked_for_update = True
         return t.cast(str, latest)
 
+    def _start_update_check(self) -> None:
+        self._checked_for_update = True
+
+        if updates.enabled():
+            self._update_task = asyncio.ensure_future(self._check_in_background())
+
+    async def _check_in_background(self) -> None:
+        latest = updates.read_cached()
+        if latest is not None:
+            updates.warn_if_outdated(latest)
+            return
+
+        try:
+            latest = await self.check_for_updates()
+        except Exception as exc:
+            # This should never stop anyone from using analytix.
+            _log.debug("Failed to check for updates: %s", exc)
+            return
+
+        if latest is not None:
+            updates.write_cached(latest)
+
     async def _try_load_tokens(self, path: pathlib.Path) -> Tokens | None:
-        if not path.is_file():
-            return None
+        return await self._get_token_store(path).aload()
+
+    def _get_token_store(self, path: pathlib.Path) -> TokenStore:
+        if self.token_store is not None:
+            return self.token_store
 
-        return await Tokens.afrom_file(path)
+        # Reuse the store so its cached tokens are too.
+        if self._file_store is None or self._file_store.path != path:
+            self._file_store = FileTokenStore(path)
+
+        return self._file_store
 
     def _mcp(self, url: str) -> str:
         return input(
@@ -189,18 +414,10 @@ class AsyncAnalytics:
             "Enter code > "
         )
 
-    def _ws(self, url: str, redirect_uri: str, port: int) -> str:
+    async def _ws(self, url: str, redirect_uri: str, port: int) -> str:
         print(f"You need to authorise analytix; to do so, visit this URL: {url}")
-        ws = Server((redirect_uri[7:], port), RequestHandler)
-
-        try:
-            ws.handle_request()
-        except KeyboardInterrupt as exc:
-            raise exc
-        finally:
-            ws.server_close()
-
-        return ws.code
+        ws = AsyncServer(redirect_uri[7:], port)
+        return await ws.wait_for_code(timeout=self.auth_timeout)
 
     async def _retrieve_tokens(self, redirect_uris: list[str], port: int) -> Tokens:
         if self.legacy_auth:
@@ -210,20 +427,29 @@ class AsyncAnalytics:
             rd_addr = f"{ru}:{port}"
 
         url, _ = oauth.auth_url_and_state(self.secrets, rd_addr)
-        code = self._mcp(url) if self.legacy_auth else self._ws(url, ru, port)
+        code = self._mcp(url) if self.legacy_auth else await self._ws(url, ru, port)
 
         data, headers = oauth.access_data_and_headers(code, self.secrets, rd_addr)
 
-        r = await self._session.post(self.secrets.token_uri, data=data, headers=headers)
+        r = await self.retry_policy.asend(
+            lambda: self._session.post(
+                self.secrets.token_uri, data=data, headers=headers
+            )
+        )
         if r.is_error:
-            raise errors.AuthenticationError(**r.json())
+            raise errors.AuthenticationError(**codecs.loads(r.content))
 
-        return Tokens.from_data(r.json())
+        return Tokens.from_data(codecs.loads(r.content))
 
     async def needs_refresh(self) -> bool:
         """Check whether any existing token needs refreshing. If the
         client is not currently authorised, this will return ``False``.
 
+        .. versionchanged:: 3.6.0
+            This is now determined locally using the token's expiry
+            time and the client's refresh margin. The token is only
+            checked with Google if its expiry time is not known.
+
         Returns:
             Whether the access token needs to be refreshed.
         """
@@ -231,15 +457,34 @@ class AsyncAnalytics:
         if not self._tokens:
             return False
 
-        _log.debug("Checking if token needs to be refreshed...")
+        if self._tokens.expires_at is None:
+            return not await self._check_token()
+
+        return self._tokens.is_expired(margin=self.refresh_margin)
+
+    async def _check_token(self) -> bool:
+        assert self._tokens is not None
+
+        _log.debug("Checking token with Google...")
         r = await self._session.get(
             analytix.OAUTH_CHECK_URL + self._tokens.access_token
         )
-        return r.is_error
+        if r.is_error:
+            return False
+
+        expires_in = codecs.loads(r.content).get("expires_in")
+        if expires_in is not None:
+            self._tokens.expires_at = time.time() + int(expires_in)
+
+        return True
 
     async def refresh_access_token(self, *, port: int = 8080) -> None:
         """Refresh the access token.
 
+        .. versionchanged:: 3.6.0
+            If a refresh is already in progress, this now waits for it
+            to finish instead of starting another.
+
         Keyword args:
             port:
                 The port to use for the authorisation webserver when
@@ -254,19 +499,80 @@ class AsyncAnalytics:
             _log.warning("There are no tokens to refresh")
             return
 
-        _log.info("Refreshing access token...")
-        data, headers = oauth.refresh_data_and_headers(
-            self._tokens.refresh_token, self.secrets
-        )
+        await self._shared_refresh(port)
 
-        r = await self._session.post(self.secrets.token_uri, data=data, headers=headers)
-        if not r.is_error:
-            self._tokens.update(r.json())
+    async def _shared_refresh(self, port: int, *, reauthorise: bool = True) -> None:
+        if self._refreshing is None or self._refreshing.done():
+            self._refreshing = asyncio.ensure_future(
+                self._refresh(port, reauthorise=reauthorise)
+            )
+            # Stop the event loop complaining if every caller is
+            # cancelled before the refresh fails.
+            self._refreshing.add_done_callback(lambda f: f.cancelled() or f.exception())
+            self._refreshing_can_reauthorise = reauthorise
         else:
-            _log.info("Your refresh token has expired; you will need to reauthorise")
-            self._tokens = await self._retrieve_tokens(self.secrets.redirect_uris, port)
+            _log.debug("Waiting for in-progress refresh...")
+
+        try:
+            await asyncio.shield(self._refreshing)
+        except errors.AuthenticationError:
+            if not reauthorise or self._refreshing_can_reauthorise:
+                raise
+
+            # The refresh being waited on couldn't reauthorise, but
+            # this one can.
+            await self._shared_refresh(port)
 
-        await self._tokens.awrite(self._token_path)
+    async def _refresh(self, port: int, *, reauthorise: bool = True) -> None:
+        assert self._tokens is not None
+
+        store = self._get_token_store(self._token_path)
+
+        # Other processes sharing the store wait here while one of them
+        # refreshes, and then use the tokens it stored.
+        async with store.alock():
+            stored = await store.aload()
+            if (
+                stored is not None
+                and stored.access_token != self._tokens.access_token
+                and not stored.is_expired(margin=self.refresh_margin)
+            ):
+                _log.info("Access token was refreshed by another client")
+                self._tokens = stored
+                return
+
+            _log.info("Refreshing access token...")
+            data, headers = oauth.refresh_data_and_headers(
+                self._tokens.refresh_token, self.secrets
+            )
+
+            event = RequestEvent.for_query(None)
+            watch = Stopwatch(event.timings)
+            r = await self.retry_policy.asend(
+                lambda: self._session.post(
+                    self.secrets.token_uri, data=data, headers=headers
+                ),
+                on_retry=self.hooks.retry_callback(event),
+            )
+            watch.lap("refresh")
+            event.attempt = None
+            event.status_code = r.status_code
+            event.size = len(r.content)
+            self.hooks.on_refresh(event)
+
+            if not r.is_error:
+                self._tokens.update(codecs.loads(r.content))
+            elif not reauthorise:
+                raise errors.AuthenticationError(**codecs.loads(r.content))
+            else:
+                _log.info(
+                    "Your refresh token has expired; you will need to reauthorise"
+                )
+                self._tokens = await self._retrieve_tokens(
+                    self.secrets.redirect_uris, port
+                )
+
+            await store.asave(self._tokens)
 
     async def authorise(  # nosec B107
         self,
@@ -315,11 +621,27 @@ class AsyncAnalytics:
             self._tokens = await self._try_load_tokens(token_path)
 
         if not self._tokens:
-            _log.info("Unable to load tokens; you will need to authorise")
-            self._tokens = await self._retrieve_tokens(self.secrets.redirect_uris, port)
-            await self._tokens.awrite(token_path)
+            store = self._get_token_store(token_path)
+
+            # Make sure only one process sharing the store authorises.
+            async with store.alock():
+                if not force:
+                    self._tokens = await store.aload()
+
+                if not self._tokens:
+                    _log.info("Unable to load tokens; you will need to authorise")
+                    self._tokens = await self._retrieve_tokens(
+                        self.secrets.redirect_uris, port
+                    )
+                    await store.asave(self._tokens)
 
         _log.info("Authorisation complete!")
+
+        if self.auto_refresh and (
+            self._refresh_task is None or self._refresh_task.done()
+        ):
+            self._refresh_task = asyncio.ensure_future(self._auto_refresh(port))
+
         return self._tokens
 
     async def retrieve(
@@ -341,6 +663,8 @@ class AsyncAnalytics:
         skip_refresh_check: bool = False,
         token_path: pathlib.Path | str = ".",
         port: int = 8080,
+        shard_by: str | None = None,
+        max_concurrency: int = 10,
     ) -> Report:
         """Retrieves a report from the YouTube Analytics API.
 
@@ -401,7 +725,8 @@ class AsyncAnalytics:
                 Defaults to ``False``.
             skip_update_check:
                 Whether to skip checking for updates. Defaults to
-                ``False``.
+                ``False``. Updates are checked in the background, at
+                most once a day.
             skip_refresh_token:
                 Whether to skip token refreshing. Defaults to ``False``.
             token_path:
@@ -419,14 +744,36 @@ class AsyncAnalytics:
                 manual copy/paste authorisation.
 
                 .. versionadded:: 3.4.0
+            shard_by:
+                The unit of time to split the request into; either
+                "day", "week", or "month". Defaults to ``None``. If
+                this is ``None``, the report is retrieved in a single
+                request. Otherwise, each window is retrieved separately
+                and the results are stitched back together into a
+                single report. The report must have either the "day"
+                or "month" dimension. Reports with the "day" dimension
+                can be split by any unit, but reports with the "month"
+                dimension can only be split by "month". Sharded reports
+                cannot have sort options, a maximum number of results,
+                or a start index.
+
+                .. versionadded:: 3.6.0
+            max_concurrency:
+                The maximum number of shards that can be retrieved
+                concurrently. Defaults to ``10``. This is
+                ignored if ``shard_by`` is ``None``.
+
+                .. versionadded:: 3.6.0
 
         Returns:
             An instance for working with retrieved data.
         """
 
         if not skip_update_check and not self._checked_for_update:
-            await self.check_for_updates()
+            self._start_update_check()
 
+        timings: dict[str, float] = {}
+        watch = Stopwatch(timings)
         query = Query(
             dimensions,
             filters,
@@ -442,33 +789,611 @@ class AsyncAnalytics:
 
         if not skip_validation:
             query.validate()
+            watch.lap("validate")
         else:
             _log.warning(
                 "Skipping validation -- invalid requests will count toward your quota"
             )
 
-        if not self.authorised or force_authorisation:
-            await self.authorise(
-                token_path=token_path, force=force_authorisation, port=port
+        shards = query.shard(shard_by) if shard_by else None
+        if shards is not None and max_concurrency < 1:
+            raise ValueError("the maximum concurrency should be positive")
+
+        watch.skip()
+        await self._prepare_tokens(
+            force_authorisation, skip_refresh_check, token_path, port
+        )
+        watch.lap("auth")
+
+        if shards is None:
+            return await self._fetch(query, port, timings=timings)
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+        reports = await asyncio.gather(
+            *(
+                self._fetch_limited(shard, semaphore, port, timings=timings)
+                for shard in shards
+            )
+        )
+        return Report.concat(reports)
+
+    async def retrieve_pages(
+        self,
+        *,
+        dimensions: t.Collection[str] | None = None,
+        filters: dict[str, str] | None = None,
+        metrics: t.Collection[str] | None = None,
+        sort_options: t.Collection[str] | None = None,
+        max_results: int = 0,
+        start_date: dt.date | None = None,
+        end_date: dt.date | None = None,
+        currency: str = "USD",
+        start_index: int = 1,
+        include_historical_data: bool = False,
+        row_limit: int = 0,
+        skip_validation: bool = False,
+        force_authorisation: bool = False,
+        skip_update_check: bool = False,
+        skip_refresh_check: bool = False,
+        token_path: pathlib.Path | str = ".",
+        port: int = 8080,
+    ) -> t.AsyncIterator[Report]:
+        """Retrieves a report from the YouTube Analytics API one page at
+        a time. This is useful for report types which cap the number of
+        results that can be retrieved in a single request, such as top
+        videos reports.
+
+        Pages are retrieved lazily as you iterate::
+
+            async for page in client.retrieve_pages(...):
+                ...
+
+        The pages can be stitched back together using
+        :meth:`Report.concat`::
+
+            pages = [page async for page in client.retrieve_pages(...)]
+            report = Report.concat(pages)
+
+        This takes all the same arguments as :meth:`retrieve`, with the
+        exception of ``max_results``, which is used as the page size,
+        and ``row_limit``.
+
+        Keyword Args:
+            max_results:
+                The number of rows to retrieve per page. Defaults to
+                ``0``. If this is ``0``, the maximum number of results
+                supported by the report type will be used. If the report
+                type does not limit the number of results, all rows will
+                be retrieved in a single page.
+            row_limit:
+                The maximum number of rows to retrieve across all pages.
+                Defaults to ``0``. If this is ``0``, pages will be
+                retrieved until the API returns a page with fewer rows
+                than the page size.
+
+        Returns:
+            An iterator of reports, each containing a single page of
+            data.
+
+        .. versionadded:: 3.6.0
+        """
+
+        if row_limit < 0:
+            raise errors.InvalidRequest(
+                "the row limit should be non-negative (0 for unlimited rows)"
             )
 
-        if (not skip_refresh_check) and await self.needs_refresh():
+        if not skip_update_check and not self._checked_for_update:
+            self._start_update_check()
+
+        query = Query(
+            dimensions,
+            filters,
+            metrics,
+            sort_options,
+            max_results,
+            start_date,
+            end_date,
+            currency,
+            start_index,
+            include_historical_data,
+        )
+
+        if not query.max_results:
+            query.set_report_type()
+            if isinstance(query.rtype, DetailedReportType):
+                query.max_results = query.rtype.max_results
+
+        if not skip_validation:
+            query.validate()
+        else:
+            _log.warning(
+                "Skipping validation -- invalid requests will count toward your quota"
+            )
+
+        await self._prepare_tokens(
+            force_authorisation, skip_refresh_check, token_path, port
+        )
+
+        page_size = query.max_results
+        fetched = 0
+
+        while True:
+            if row_limit:
+                remaining = row_limit - fetched
+                query.max_results = (
+                    min(page_size, remaining) if page_size else remaining
+                )
+
+            report = await self._fetch(query, port)
+            yield report
+
+            rows = report.shape[0]
+            fetched += rows
+            _log.info("Retrieved %d row(s) so far", fetched)
+
+            if (
+                not page_size
+                or rows < query.max_results
+                or (row_limit and fetched >= row_limit)
+            ):
+                return
+
+            query.start_index += rows
+
+    @contextlib.asynccontextmanager
+    async def retrieve_stream(
+        self,
+        *,
+        dimensions: t.Collection[str] | None = None,
+        filters: dict[str, str] | None = None,
+        metrics: t.Collection[str] | None = None,
+        sort_options: t.Collection[str] | None = None,
+        max_results: int = 0,
+        start_date: dt.date | None = None,
+        end_date: dt.date | None = None,
+        currency: str = "USD",
+        start_index: int = 1,
+        include_historical_data: bool = False,
+        skip_validation: bool = False,
+        force_authorisation: bool = False,
+        skip_update_check: bool = False,
+        skip_refresh_check: bool = False,
+        token_path: pathlib.Path | str = ".",
+        port: int = 8080,
+    ) -> t.AsyncIterator[AsyncReportStream]:
+        """Retrieves a report from the YouTube Analytics API, parsing
+        its rows as the response is read. This keeps memory usage low
+        for large reports, as the full set of rows is never held in
+        memory at once.
+
+        This is used as an asynchronous context manager, which closes
+        the response when exited::
+
+            async with client.retrieve_stream(...) as stream:
+                print(stream.columns)
+                async for row in stream:
+                    ...
+
+        This takes all the same arguments as :meth:`retrieve`, with the
+        exception of ``shard_by`` and ``max_concurrency``. Streamed
+        reports are never cached.
+
+        Returns:
+            A stream of the report's rows. The column headers are
+            available as soon as the stream is returned.
+
+        .. versionadded:: 3.6.0
+        """
+
+        if not skip_update_check and not self._checked_for_update:
+            self._start_update_check()
+
+        query = Query(
+            dimensions,
+            filters,
+            metrics,
+            sort_options,
+            max_results,
+            start_date,
+            end_date,
+            currency,
+            start_index,
+            include_historical_data,
+        )
+
+        if not skip_validation:
+            query.validate()
+        else:
+            _log.warning(
+                "Skipping validation -- invalid requests will count toward your quota"
+            )
+
+        await self._prepare_tokens(
+            force_authorisation, skip_refresh_check, token_path, port
+        )
+
+        if not query.rtype:
+            query.set_report_type()
+
+        assert query.rtype is not None
+        resp = await self._open_stream(query, port)
+
+        try:
+            stream = AsyncReportStream(resp.aiter_text(), query.rtype)
+            await stream._start()
+            yield stream
+        finally:
+            await resp.aclose()
+
+    async def retrieve_many(
+        self,
+        queries: t.Iterable[QuerySpecT],
+        *,
+        max_concurrency: int = 10,
+        skip_validation: bool = False,
+        force_authorisation: bool = False,
+        skip_update_check: bool = False,
+        skip_refresh_check: bool = False,
+        token_path: pathlib.Path | str = ".",
+        port: int = 8080,
+    ) -> list[Report | Exception]:
+        """Retrieves multiple reports from the YouTube Analytics API
+        concurrently.
+
+        Every query is validated before any requests are made, and the
+        client is authorised (and its access token refreshed if needed)
+        once for the whole batch.
+
+        Args:
+            queries:
+                The queries to make. Each query should be a mapping of
+                the keyword arguments you would otherwise pass to
+                :meth:`retrieve` to define the report (``dimensions``,
+                ``filters``, ``metrics``, ``sort_options``,
+                ``max_results``, ``start_date``, ``end_date``,
+                ``currency``, ``start_index``, and
+                ``include_historical_data``).
+
+        Keyword Args:
+            max_concurrency:
+                The maximum number of requests that can be in flight at
+                any one time. Defaults to ``10``.
+            skip_validation:
+                Whether to skip the validation process. Defaults to
+                ``False``.
+            force_authorisation:
+                Whether to force the (re)authorisation of the client.
+                Defaults to ``False``.
+            skip_update_check:
+                Whether to skip checking for updates. Defaults to
+                ``False``. Updates are checked in the background, at
+                most once a day.
+            skip_refresh_check:
+                Whether to skip token refreshing. Defaults to ``False``.
+            token_path:
+                The path to the token file or the directory the token
+                file is or should be stored in. If this is not provided,
+                this defaults to the current directory, and if a
+                directory is passed, the file is given the name
+                "tokens.json".
+            port:
+                The port to use for the authorisation webserver when
+                using loopback IP address authorisation. Defaults to
+                8080. This is ignored if analytix is configured to use
+                manual copy/paste authorisation.
+
+        Returns:
+            A list of results in the same order as the given queries.
+            Each result is either an instance for working with retrieved
+            data, or the exception that was raised while validating or
+            retrieving that query.
+
+        .. versionadded:: 3.6.0
+        """
+
+        if max_concurrency < 1:
+            raise ValueError("the maximum concurrency should be positive")
+
+        if not skip_update_check and not self._checked_for_update:
+            self._start_update_check()
+
+        built: list[Query | Exception]
+        if skip_validation:
+            _log.warning(
+                "Skipping validation -- invalid requests will count toward your quota"
+            )
+            built = []
+            for spec in queries:
+                try:
+                    built.append(Query(**spec))
+                except TypeError as exc:
+                    built.append(exc)
+        else:
+            built = validate_many(queries)
+
+        results: list[Report | Exception | None] = []
+        pending: dict[int, Query] = {}
+
+        for i, item in enumerate(built):
+            if isinstance(item, Exception):
+                results.append(item)
+            else:
+                results.append(None)
+                pending[i] = item
+
+        _log.info("Retrieving %d of %d report(s)...", len(pending), len(results))
+        if not pending:
+            return t.cast(t.List[t.Union[Report, Exception]], results)
+
+        await self._prepare_tokens(
+            force_authorisation, skip_refresh_check, token_path, port
+        )
+        semaphore = asyncio.Semaphore(max_concurrency)
+        fetched = await asyncio.gather(
+            *(
+                self._fetch_limited(query, semaphore, port)
+                for query in pending.values()
+            ),
+            return_exceptions=True,
+        )
+
+        for i, result in zip(pending.keys(), fetched):
+            if not isinstance(result, (Report, Exception)):
+                # Don't swallow cancellations or interrupts.
+                raise result
+
+            results[i] = result
+
+        return t.cast(t.List[t.Union[Report, Exception]], results)
+
+    async def _prepare_tokens(
+        self,
+        force_authorisation: bool,
+        skip_refresh_check: bool,
+        token_path: pathlib.Path | str,
+        port: int,
+    ) -> None:
+        # Only one task should ever be (re)authorising at a time. Any
+        # others wait here, and then find the tokens are fine.
+        async with self._get_token_lock():
+            if not self.authorised or force_authorisation:
+                await self.authorise(
+                    token_path=token_path, force=force_authorisation, port=port
+                )
+
+            if (not skip_refresh_check) and await self.needs_refresh():
+                await self.refresh_access_token(port=port)
+
+    def _get_token_lock(self) -> asyncio.Lock:
+        if self._token_lock is None:
+            self._token_lock = asyncio.Lock()
+        return self._token_lock
+
+    async def _auto_refresh(self, port: int) -> None:
+        while self._tokens is not None:
+            if self._tokens.expires_at is None:
+                await self._check_token()
+
+            expires_at = self._tokens.expires_at
+            if expires_at is None:
+                _log.warning("Token expiry is unknown; stopping background refresh")
+                return
+
+            # Refresh a margin's width before the hot path would, so
+            # retrievals don't have to wait for it.
+            delay = expires_at - 2 * self.refresh_margin - time.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            try:
+                async with self._get_token_lock():
+                    if not self._tokens.is_expired(margin=2 * self.refresh_margin):
+                        continue
+
+                    # Nobody is waiting on this, so it can't reauthorise
+                    # if the refresh token has expired. The next
+                    # retrieval will do that instead.
+                    await self._shared_refresh(port, reauthorise=False)
+            except Exception as exc:
+                _log.error("Background token refresh failed; stopping: %s", exc)
+                return
+
+            # If the margin is as long as the token's lifetime, the new
+            # token is already due for refreshing, so wait a while
+            # before doing so rather than refreshing constantly.
+            assert self._tokens is not None
+            lifetime = (self._tokens.expires_at or 0) - time.time()
+            await asyncio.sleep(max(min(self.refresh_margin, lifetime / 2), 1))
+
+    async def _fetch_limited(
+        self,
+        query: Query,
+        semaphore: asyncio.Semaphore,
+        port: int,
+        *,
+        timings: dict[str, float] | None = None,
+    ) -> Report:
+        async with semaphore:
+            return await self._fetch(query, port, timings=timings)
+
+    async def _get(
+        self, url: str, headers: dict[str, str], *, stream: bool = False
+    ) -> httpx.Response:
+        if self.rate_limiter is not None:
+            await self.rate_limiter.aacquire()
+
+        if self.quota is not None:
+            await self.quota.aconsume()
+
+        if not stream:
+            return await self._session.get(url, headers=headers)
+
+        request = self._session.build_request("GET", url, headers=headers)
+        resp = await self._session.send(request, stream=True)
+
+        if resp.is_error:
+            # Error bodies are small, and need to be read to decide
+            # whether to retry.
+            await resp.aread()
+
+        return resp
+
+    async def _refresh_rejected_token(self, token: str, port: int) -> bool:
+        async with self._get_token_lock():
+            assert self._tokens is not None
+
+            if self._tokens.access_token != token:
+                # Another task has already refreshed it.
+                return True
+
+            if await self._check_token():
+                # The token is fine, so refreshing won't help.
+                return False
+
             await self.refresh_access_token(port=port)
+            return True
+
+    async def _fetch(
+        self, query: Query, port: int, *, timings: dict[str, float] | None = None
+    ) -> Report:
+        event = RequestEvent.for_query(query, timings)
+
+        if not query.rtype:
+            query.set_report_type()
+
+        assert query.rtype is not None
+        if self.cache is not None:
+            watch = Stopwatch(event.timings)
+            cached = await self.cache.aget(query)
+            watch.lap("cache")
+
+            if cached is not None:
+                _log.info("Retrieved report of shape %s from cache", cached.shape)
+                event.report = cached
+                event.from_cache = True
+                self.hooks.on_report_built(event)
+                return cached
+
+        key = query.key
+        task = self._inflight.get(key)
+        if task is None:
+            # The request runs as its own task so that cancelling the
+            # caller which started it doesn't cancel it for everybody
+            # else waiting on the same report.
+            task = asyncio.ensure_future(self._build(query, port, event))
+            self._inflight[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda _: self._forget(key, task))
+        else:
+            _log.debug("Waiting for identical in-flight request...")
+            self._coalesced_requests += 1
+
+        self._waiters[key] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done():
+                self._waiters[key] -= 1
+                if not self._waiters[key]:
+                    # Nobody is waiting for this report anymore.
+                    self._forget(key, task)
+                    task.cancel()
+            raise
+
+    async def _build(self, query: Query, port: int, event: RequestEvent) -> Report:
+        report = await self._request(query, port, event)
+
+        if self.cache is not None:
+            await self.cache.aset(query, report)
+
+        event.report = report
+        self.hooks.on_report_built(event)
+        return report
+
+    def _forget(self, key: str, task: asyncio.Task[Report]) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+            del self._waiters[key]
 
+    async def _request(
+        self, query: Query, port: int, event: RequestEvent, *, retry: bool = True
+    ) -> Report:
+        assert query.rtype is not None
         assert self._tokens is not None
-        headers = {"Authorization": f"Bearer {self._tokens.access_token}"}
-        resp = await self._session.get(query.url, headers=headers)
-        data = resp.json()
-        _log.debug(f"Data retrieved: {data}")
+        token = self._tokens.access_token
+        headers = {"Authorization": f"Bearer {token}"}
+        self.hooks.before_request(event)
+        watch = Stopwatch(event.timings)
+        resp = await self.retry_policy.asend(
+            lambda: self._get(query.url, headers),
+            on_retry=self.hooks.retry_callback(event),
+        )
+        watch.lap("http")
+        event.attempt = None
+        event.status_code = resp.status_code
+        event.size = len(resp.content)
+        self.hooks.after_response(event)
+
+        if resp.status_code == 401 and retry:
+            _log.info("Access token was rejected")
+            if await self._refresh_rejected_token(token, port):
+                return await self._request(query, port, event, retry=False)
+
+        watch.skip()
+        data = codecs.loads(resp.content)
+        watch.lap("decode")
 
         if next(iter(data)) == "error":
             error = data["error"]
             raise errors.APIError(error["code"], error["message"])
 
-        if not query.rtype:
-            query.set_report_type()
+        # Only summarise the payload -- formatting the rows themselves
+        # would cost more than the request for large reports.
+        _log.debug(
+            "Retrieved %d row(s) (%d bytes) in %.2f seconds",
+            len(data.get("rows", ())),
+            event.size,
+            event.timings["http"],
+        )
 
-        assert query.rtype is not None
+        watch.skip()
         report = Report(data, query.rtype)
-        _log.info(f"Created report of shape {report.shape}!")
+        watch.lap("build")
+        _log.info("Created report of shape %s!", report.shape)
         return report
+
+    async def _open_stream(
+        self,
+        query: Query,
+        port: int,
+        *,
+        retry: bool = True,
+        timings: dict[str, float] | None = None,
+    ) -> httpx.Response:
+        event = RequestEvent.for_query(query, timings)
+        watch = Stopwatch(event.timings)
+
+        assert self._tokens is not None
+        token = self._tokens.access_token
+        headers = {"Authorization": f"Bearer {token}"}
+        self.hooks.before_request(event)
+        watch.skip()
+        resp = await self.retry_policy.asend(
+            lambda: self._get(query.url, headers, stream=True),
+            on_retry=self.hooks.retry_callback(event),
+        )
+        watch.lap("http")
+        event.attempt = None
+        event.status_code = resp.status_code
+        self.hooks.after_response(event)
+
+        if resp.status_code == 401 and retry:
+            _log.info("Access token was rejected")
+            if await self._refresh_rejected_token(token, port):
+                await resp.aclose()
+                return await self._open_stream(
+                    query, port, retry=False, timings=timings
+                )
+
+        return resp
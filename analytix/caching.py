@@ -0,0 +1,571 @@
+# Copyright (c) 2021-present, Ethan Henderson
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from __future__ import annotations
+
+import datetime as dt
+import gzip
+import hashlib
+import logging
+import math
+import os
+import pathlib
+import re
+import tempfile
+import threading
+import time
+import typing as t
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import aiofiles
+
+from analytix import codecs
+from analytix.abc import ReportCache
+from analytix.reports import Report
+
+if t.TYPE_CHECKING:
+    from analytix.queries import Query
+
+_log = logging.getLogger(__name__)
+
+_NAMESPACE_PATTERN = re.compile(r"[\w.-]+")
+# Rough sizes of a column header and a single value as compact JSON,
+# used to estimate how much memory a report takes up.
+_HEADER_SIZE = 72
+_CELL_SIZE = 8
+
+
+def valid_namespace(namespace: str) -> bool:
+    """Whether a name can be used as a namespace. Namespaces are used
+    as file and directory names, so can only contain letters, numbers,
+    underscores, hyphens, and full stops, and cannot be "." or "..".
+
+    Args:
+        namespace:
+            The name to check.
+
+    Returns:
+        Whether the name can be used as a namespace.
+
+    .. versionadded:: 3.6.0
+    """
+
+    if not _NAMESPACE_PATTERN.fullmatch(namespace):
+        return False
+
+    return namespace not in {".", ".."}
+
+
+def _estimate_size(report: Report) -> int:
+    rows, columns = report.shape
+    return columns * (_HEADER_SIZE + rows * _CELL_SIZE)
+
+
+@dataclass()
+class CacheStats:
+    """A dataclass representing a cache's usage statistics.
+
+    Args:
+        hits:
+            The number of lookups which returned a cached report.
+        misses:
+            The number of lookups which did not return a cached report,
+            including those for expired reports.
+        evictions:
+            The number of reports which were removed to make space for
+            others.
+
+    .. versionadded:: 3.6.0
+    """
+
+    __slots__ = ("hits", "misses", "evictions")
+
+    hits: int
+    misses: int
+    evictions: int
+
+    @property
+    def hit_rate(self) -> float:
+        """The proportion of lookups which returned a cached report."""
+
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def reset(self) -> None:
+        """Reset all statistics to zero."""
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+class DiskCache(ReportCache):
+    """A persistent cache which stores report data on disk.
+
+    Entries are stored as compressed JSON files, one per query, and the
+    least recently used entries are removed once the cache grows beyond
+    its maximum size.
+
+    Reports are only ever shared between caches with the same
+    namespace, so each channel (or set of tokens) should have its own.
+    Caches with different namespaces can safely share a directory.
+
+    Data for dates within the API's data lag window can still change,
+    so reports which include those dates only remain valid for a short
+    time. Reports covering only earlier dates never expire.
+
+    Args:
+        path:
+            The directory to store cached reports in. Defaults to
+            ".analytix_cache" in the current directory. This is created
+            if it does not exist.
+
+    Keyword Args:
+        namespace:
+            The name of the channel or account this cache stores
+            reports for. This can only contain letters, numbers,
+            underscores, hyphens, and full stops.
+        max_size:
+            The maximum size of the cache in bytes. Defaults to 256 MiB.
+        recent_ttl:
+            The number of seconds reports including recent dates remain
+            valid for. Defaults to ``3600``.
+        data_lag:
+            The number of days it takes for the API's data to settle.
+            Defaults to ``3``.
+
+    Attributes:
+        path:
+            The directory cached reports are stored in. This is a
+            subdirectory of the given path, named after the namespace.
+        namespace:
+            The name of the channel or account this cache stores
+            reports for.
+        max_size:
+            The maximum size of the cache in bytes.
+        recent_ttl:
+            The number of seconds reports including recent dates remain
+            valid for.
+        data_lag:
+            The number of days it takes for the API's data to settle.
+
+    .. versionadded:: 3.6.0
+    """
+
+    __slots__ = (
+        "path",
+        "namespace",
+        "max_size",
+        "recent_ttl",
+        "data_lag",
+        "_stats",
+        "_size",
+        "_lock",
+    )
+
+    def __init__(
+        self,
+        path: pathlib.Path | str = ".analytix_cache",
+        *,
+        namespace: str,
+        max_size: int = 256 * 1024**2,
+        recent_ttl: float = 3600.0,
+        data_lag: int = 3,
+    ) -> None:
+        if not valid_namespace(namespace):
+            raise ValueError(f"invalid cache namespace {namespace!r}")
+
+        if not isinstance(path, pathlib.Path):
+            path = pathlib.Path(path)
+
+        path /= namespace
+        path.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.namespace = namespace
+        self.max_size = max_size
+        self.recent_ttl = recent_ttl
+        self.data_lag = data_lag
+        self._stats = CacheStats(0, 0, 0)
+        # The total size of all entries, tracked as they are written
+        # and removed so the directory only needs scanning to evict.
+        self._size: int | None = None
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(path={str(self.path)!r}, "
+            f"namespace={self.namespace!r})"
+        )
+
+    @property
+    def stats(self) -> CacheStats:
+        return self._stats
+
+    def _record(self, stat: str) -> None:
+        with self._lock:
+            setattr(self._stats, stat, getattr(self._stats, stat) + 1)
+
+    def _entry_path(self, query: Query) -> pathlib.Path:
+        digest = hashlib.sha256(query.key.encode("utf-8")).hexdigest()
+        return self.path / f"{digest}.json.gz"
+
+    def _expires_at(self, query: Query) -> float | None:
+        settled = dt.date.today() - dt.timedelta(days=self.data_lag)
+        if query._end_date < settled:
+            return None
+
+        return time.time() + self.recent_ttl
+
+    def _encode(self, query: Query, report: Report) -> bytes:
+        entry = {"expires_at": self._expires_at(query), "data": report.data}
+        return gzip.compress(codecs.dumps(entry))
+
+    def _decode(self, query: Query, path: pathlib.Path, raw: bytes) -> Report | None:
+        try:
+            entry = codecs.loads(gzip.decompress(raw))
+        except (OSError, ValueError):
+            _log.warning(f"Removing corrupt cache entry {path.name}")
+            self._remove(path)
+            self._record("misses")
+            return None
+
+        expires_at = entry["expires_at"]
+        if expires_at is not None and time.time() >= expires_at:
+            _log.debug(f"Cache entry {path.name} has expired")
+            self._remove(path)
+            self._record("misses")
+            return None
+
+        # Touch the file to mark it as recently used.
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # It was evicted while it was being read.
+            self._record("misses")
+            return None
+
+        self._record("hits")
+
+        if not query.rtype:
+            query.set_report_type()
+
+        assert query.rtype is not None
+        return Report(entry["data"], query.rtype)
+
+    def _write(self, path: pathlib.Path, raw: bytes) -> None:
+        # Write to a temporary file first so no other reader can ever
+        # see a partially written entry.
+        fd, tmp = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(raw)
+            replaced = self._file_size(path)
+            os.replace(tmp, path)
+        except BaseException:
+            self._remove(pathlib.Path(tmp))
+            raise
+
+        self._grow(len(raw) - replaced)
+
+    async def _awrite(self, path: pathlib.Path, raw: bytes) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        os.close(fd)
+
+        try:
+            async with aiofiles.open(tmp, "wb") as f:
+                await f.write(raw)
+            replaced = self._file_size(path)
+            os.replace(tmp, path)
+        except BaseException:
+            self._remove(pathlib.Path(tmp))
+            raise
+
+        self._grow(len(raw) - replaced)
+
+    @staticmethod
+    def _file_size(path: pathlib.Path) -> int:
+        try:
+            return path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def _grow(self, delta: int) -> None:
+        with self._lock:
+            if self._size is None:
+                # The first write scans the directory to find out how
+                # much is already cached.
+                total = sum(size for _, size, _ in self._scan())
+            else:
+                total = self._size + delta
+
+            self._size = total
+            if total <= self.max_size:
+                return
+
+        self._evict()
+
+    def _remove(self, path: pathlib.Path) -> None:
+        size = self._file_size(path)
+
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            # Another thread or process got there first.
+            return
+
+        if path.suffix == ".gz":
+            with self._lock:
+                if self._size is not None:
+                    self._size = max(self._size - size, 0)
+
+    def _scan(self) -> list[tuple[float, int, pathlib.Path]]:
+        entries = []
+
+        for path in self.path.glob("*.json.gz"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        return entries
+
+    def _evict(self) -> None:
+        # Other processes may be writing to the same directory, so the
+        # running total is only a hint; rescan to evict accurately.
+        entries = self._scan()
+        total = sum(size for _, size, _ in entries)
+
+        if total > self.max_size:
+            for _, size, path in sorted(entries):
+                self._remove(path)
+                self._record("evictions")
+                total -= size
+                _log.debug(f"Evicted cache entry {path.name}")
+
+                if total <= self.max_size:
+                    break
+
+        with self._lock:
+            self._size = total
+
+    def get(self, query: Query) -> Report | None:
+        path = self._entry_path(query)
+
+        try:
+            raw = path.read_bytes()
+        except FileNotFoundError:
+            self._record("misses")
+            return None
+
+        return self._decode(query, path, raw)
+
+    def set(self, query: Query, report: Report) -> None:
+        self._write(self._entry_path(query), self._encode(query, report))
+
+    def invalidate(self, query: Query) -> None:
+        self._remove(self._entry_path(query))
+
+    def clear(self) -> None:
+        for path in self.path.glob("*.json.gz"):
+            self._remove(path)
+
+    async def aget(self, query: Query) -> Report | None:
+        path = self._entry_path(query)
+
+        try:
+            async with aiofiles.open(path, "rb") as f:
+                raw = await f.read()
+        except FileNotFoundError:
+            self._record("misses")
+            return None
+
+        return self._decode(query, path, raw)
+
+    async def aset(self, query: Query, report: Report) -> None:
+        await self._awrite(self._entry_path(query), self._encode(query, report))
+
+
+class MemoryCache(ReportCache):
+    """An in-process cache which keeps reports in memory.
+
+    Reports are returned exactly as they were cached, so subsequent
+    lookups skip the network, decoding, and report creation entirely.
+    The least recently used reports are evicted once either the number
+    of entries or their approximate total size exceeds its limit.
+
+    Keyword Args:
+        max_entries:
+            The maximum number of reports to cache. Defaults to
+            ``128``.
+        max_size:
+            The maximum approximate size of all cached reports in
+            bytes. Defaults to 64 MiB. Reports are measured by an
+            estimate of the size of their data as compact JSON, based
+            on their number of rows and columns.
+        ttl:
+            The number of seconds reports remain valid for by default.
+            Defaults to ``300``. If this is ``None``, reports do not
+            expire.
+
+    Attributes:
+        max_entries:
+            The maximum number of reports to cache.
+        max_size:
+            The maximum approximate size of all cached reports in
+            bytes.
+        ttl:
+            The number of seconds reports remain valid for by default.
+
+    .. versionadded:: 3.6.0
+    """
+
+    __slots__ = (
+        "max_entries",
+        "max_size",
+        "ttl",
+        "_stats",
+        "_entries",
+        "_size",
+        "_lock",
+    )
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 128,
+        max_size: int = 64 * 1024**2,
+        ttl: float | None = 300.0,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.ttl = ttl
+        self._stats = CacheStats(0, 0, 0)
+        self._entries: OrderedDict[str, tuple[Report, int, float | None]]
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(entries={len(self._entries)}, "
+            f"size={self._size})"
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def stats(self) -> CacheStats:
+        return self._stats
+
+    @property
+    def size(self) -> int:
+        """The approximate size of all cached reports in bytes."""
+
+        return self._size
+
+    def _discard(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._size -= size
+
+    def get(self, query: Query) -> Report | None:
+        key = query.key
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats.misses += 1
+                return None
+
+            report, _, expires_at = entry
+            if expires_at is not None and time.monotonic() >= expires_at:
+                self._discard(key)
+                self._stats.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            return report
+
+    def set(self, query: Query, report: Report, *, ttl: float | None = None) -> None:
+        """Cache a report.
+
+        Args:
+            query:
+                The query used to retrieve the report.
+            report:
+                The report to cache.
+
+        Keyword Args:
+            ttl:
+                The number of seconds this report remains valid for.
+                Defaults to ``None``. If this is ``None``, the cache's
+                default is used. Pass ``math.inf`` to cache this report
+                indefinitely.
+        """
+
+        if ttl is None:
+            ttl = self.ttl
+
+        key = query.key
+        size = _estimate_size(report)
+
+        expires_at: float | None = None
+        if ttl is not None and ttl != math.inf:
+            expires_at = time.monotonic() + ttl
+
+        with self._lock:
+            # Any older report for this query is stale now, even if the
+            # new one is too large to replace it.
+            if key in self._entries:
+                self._discard(key)
+
+            if size > self.max_size:
+                _log.debug(f"Report is too large to cache ({size:,} bytes)")
+                return
+
+            self._entries[key] = (report, size, expires_at)
+            self._size += size
+
+            while len(self._entries) > self.max_entries or self._size > self.max_size:
+                self._discard(next(iter(self._entries)))
+                self._stats.evictions += 1
+
+    def invalidate(self, query: Query) -> None:
+        with self._lock:
+            if query.key in self._entries:
+                self._discard(query.key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
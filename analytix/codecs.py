@@ -0,0 +1,269 @@
+# Copyright (c) 2021-present, Ethan Henderson
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from __future__ import annotations
+
+import importlib
+import json
+import logging
+import typing as t
+
+import analytix
+from analytix.abc import JSONCodec
+
+_log = logging.getLogger(__name__)
+
+_codec: JSONCodec | None = None
+
+
+class StdlibCodec(JSONCodec):
+    """A JSON codec which uses the standard library's :mod:`json`
+    module. This is always available, and is used if none of the faster
+    codecs are.
+
+    .. versionadded:: 3.6.0
+    """
+
+    __slots__ = ()
+
+    name = "json"
+
+    def loads(self, data: str | bytes) -> t.Any:
+        return json.loads(data)
+
+    def dumps(self, obj: t.Any, *, indent: int | None = None) -> bytes:
+        separators = (",", ":") if indent is None else None
+        return json.dumps(obj, indent=indent, separators=separators).encode("utf-8")
+
+
+class OrjsonCodec(JSONCodec):
+    """A JSON codec which uses
+    `orjson <https://github.com/ijl/orjson>`_.
+
+    orjson only supports indenting by two spaces, so documents with any
+    other indent are encoded using the standard library instead.
+
+    .. versionadded:: 3.6.0
+    """
+
+    __slots__ = ("_orjson",)
+
+    name = "orjson"
+
+    def __init__(self) -> None:
+        self._orjson = importlib.import_module("orjson")
+
+    def loads(self, data: str | bytes) -> t.Any:
+        return self._orjson.loads(data)
+
+    def dumps(self, obj: t.Any, *, indent: int | None = None) -> bytes:
+        if indent not in (None, 2):
+            return StdlibCodec().dumps(obj, indent=indent)
+
+        option = self._orjson.OPT_INDENT_2 if indent else 0
+        data: bytes = self._orjson.dumps(obj, option=option)
+        return data
+
+
+class MsgspecCodec(JSONCodec):
+    """A JSON codec which uses
+    `msgspec <https://jcristharif.com/msgspec>`_.
+
+    .. versionadded:: 3.6.0
+    """
+
+    __slots__ = ("_msgspec", "_encoder", "_decoder")
+
+    name = "msgspec"
+
+    def __init__(self) -> None:
+        self._msgspec = importlib.import_module("msgspec")
+        self._encoder = self._msgspec.json.Encoder()
+        self._decoder = self._msgspec.json.Decoder()
+
+    def loads(self, data: str | bytes) -> t.Any:
+        try:
+            return self._decoder.decode(data)
+        except self._msgspec.DecodeError as exc:
+            # msgspec's errors don't derive from ValueError like those
+            # of every other codec.
+            raise ValueError(f"{exc}") from exc
+
+    def dumps(self, obj: t.Any, *, indent: int | None = None) -> bytes:
+        data: bytes = self._encoder.encode(obj)
+
+        if indent is None:
+            return data
+
+        formatted: bytes = self._msgspec.json.format(data, indent=indent)
+        return formatted
+
+
+class UjsonCodec(JSONCodec):
+    """A JSON codec which uses
+    `ujson <https://github.com/ultrajson/ultrajson>`_.
+
+    .. versionadded:: 3.6.0
+    """
+
+    __slots__ = ("_ujson",)
+
+    name = "ujson"
+
+    def __init__(self) -> None:
+        self._ujson = importlib.import_module("ujson")
+
+    def loads(self, data: str | bytes) -> t.Any:
+        return self._ujson.loads(data)
+
+    def dumps(self, obj: t.Any, *, indent: int | None = None) -> bytes:
+        text: str = self._ujson.dumps(
+            obj, indent=indent or 0, ensure_ascii=False, escape_forward_slashes=False
+        )
+        return text.encode("utf-8")
+
+
+# In order of preference.
+CODECS: dict[str, type[JSONCodec]] = {
+    "orjson": OrjsonCodec,
+    "msgspec": MsgspecCodec,
+    "ujson": UjsonCodec,
+    "json": StdlibCodec,
+}
+
+
+def detect() -> JSONCodec:
+    """Detect the fastest JSON codec that can be used.
+
+    Returns:
+        The fastest available codec. This is the standard library codec
+        if no faster ones are installed.
+
+    .. versionadded:: 3.6.0
+    """
+
+    for name, cls in CODECS.items():
+        if name != "json" and analytix.can_use(name):
+            try:
+                return cls()
+            except ImportError:
+                _log.debug(f"Could not import {name}, skipping")
+
+    return StdlibCodec()
+
+
+def get_codec() -> JSONCodec:
+    """Get the JSON codec in use, detecting it if necessary.
+
+    Returns:
+        The codec in use.
+
+    .. versionadded:: 3.6.0
+    """
+
+    global _codec
+
+    if _codec is None:
+        _codec = detect()
+        _log.debug(f"Using the {_codec.name} JSON codec")
+
+    return _codec
+
+
+def set_codec(codec: JSONCodec | str | None) -> None:
+    """Set the JSON codec to use.
+
+    Args:
+        codec:
+            The codec to use, or the name of one of the built-in codecs:
+            "orjson", "msgspec", "ujson", or "json". If this is
+            ``None``, the codec is detected again the next time it is
+            needed.
+
+    Raises:
+        ValueError:
+            The name does not belong to a built-in codec.
+        ImportError:
+            The codec's package is not installed.
+
+    .. versionadded:: 3.6.0
+    """
+
+    global _codec
+
+    if isinstance(codec, str):
+        try:
+            codec = CODECS[codec]()
+        except KeyError:
+            raise ValueError(
+                f"expected codec to be one of {', '.join(CODECS)}, got {codec!r}"
+            ) from None
+
+    _codec = codec
+
+
+def loads(data: str | bytes) -> t.Any:
+    """Decode a JSON document using the codec in use.
+
+    Args:
+        data:
+            The document to decode.
+
+    Returns:
+        The decoded object.
+
+    Raises:
+        ValueError:
+            The document is not valid JSON.
+
+    .. versionadded:: 3.6.0
+    """
+
+    return get_codec().loads(data)
+
+
+def dumps(obj: t.Any, *, indent: int | None = None) -> bytes:
+    """Encode an object as a UTF-8 JSON document using the codec in use.
+
+    Args:
+        obj:
+            The object to encode.
+
+    Keyword Args:
+        indent:
+            The number of spaces to indent nested structures by.
+            Defaults to ``None``. If this is ``None``, the document is
+            encoded as compactly as possible.
+
+    Returns:
+        The encoded document.
+
+    .. versionadded:: 3.6.0
+    """
+
+    return get_codec().dumps(obj, indent=indent)
@@ -28,6 +28,8 @@
 
 from __future__ import annotations
 
+import typing as t
+
 
 class AnalytixError(Exception):
     """The base exception class for analytix."""
@@ -85,10 +87,45 @@ class DataFrameConversionError(AnalytixError):
     fails."""
 
 
+class ConcatenationError(AnalytixError):
+    """Exception thrown when reports cannot be concatenated.
+
+    .. versionadded:: 3.6.0
+    """
+
+
+class QuotaExceeded(AnalytixError):
+    """Exception thrown when a request would exceed a project's daily
+    request budget.
+
+    Args:
+        project_id:
+            The ID of the project.
+        budget:
+            The project's daily budget.
+
+    .. versionadded:: 3.6.0
+    """
+
+    def __init__(self, project_id: str, budget: int) -> None:
+        super().__init__(
+            f"daily budget of {budget} request(s) for project {project_id} "
+            "has been used up"
+        )
+
+
 class InvalidRequest(AnalytixError):
     """Exception thrown when a request to be made to the YouTube
     Analytics API is not valid."""
 
+    def __copy__(self) -> InvalidRequest:
+        # The default copy calls `__init__` with the formatted message,
+        # which subclasses don't accept, so copy the state over instead.
+        new = self.__class__.__new__(self.__class__)
+        new.__dict__.update(self.__dict__)
+        new.args = self.args
+        return new
+
 
 class MissingMetrics(InvalidRequest):
     """Exception thrown when no metrics are provided. Inherits from
@@ -225,7 +262,7 @@ class InvalidSetOfDimensions(InvalidRequest):
             The full set of possible dimensions in this context.
     """
 
-    def __init__(self, expd: str, recv: int, values: set[str]) -> None:
+    def __init__(self, expd: str, recv: int, values: t.AbstractSet[str]) -> None:
         vals = ", ".join(values)
         super().__init__(f"expected {expd} dimension(s) from {vals!r}, got {recv}")
 
@@ -272,7 +309,7 @@ class InvalidSetOfFilters(InvalidRequest):
             The full set of possible filters in this context.
     """
 
-    def __init__(self, expd: str, recv: int, values: set[str]) -> None:
+    def __init__(self, expd: str, recv: int, values: t.AbstractSet[str]) -> None:
         vals = ", ".join(values)
         super().__init__(f"expected {expd} filter(s) from {vals!r}, got {recv}")
 
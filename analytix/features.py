@@ -30,11 +30,14 @@ from __future__ import annotations
 
 import typing as t
 
-from analytix import abc, data, errors
+from analytix import abc, data, errors, vocabulary
+from analytix.vocabulary import VOCABULARY, popcount
 
 
 class CompareMixin:
-    values: set[str]
+    __slots__ = ()
+
+    values: frozenset[str]
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, self.__class__):
@@ -49,11 +52,13 @@ class CompareMixin:
         return self.values != other.values
 
     def __hash__(self) -> int:
-        return hash(self.__class__.__name__)
+        return hash((self.__class__.__name__, self.values))
 
 
 class NestedCompareMixin:
-    values: set[abc.SetType]
+    __slots__ = ()
+
+    values: frozenset[abc.SetType]
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, self.__class__):
@@ -68,43 +73,62 @@ class NestedCompareMixin:
         return self.values != other.values
 
     def __hash__(self) -> int:
-        return hash(self.__class__.__name__)
+        return hash((self.__class__.__name__, self.values))
 
 
 class Metrics(abc.FeatureType, CompareMixin):
+    __slots__ = ()
+
     def validate(self, inputs: t.Collection[str]) -> None:
         if not len(inputs):
             raise errors.MissingMetrics()
 
-        if not isinstance(inputs, set):
-            inputs = set(inputs)
+        mask, unknown = VOCABULARY.encode(inputs)
 
-        diff = inputs - data.ALL_METRICS
-        if diff:
-            raise errors.InvalidMetrics(diff)
+        invalid = mask & ~vocabulary.ALL_METRICS
+        if unknown or invalid:
+            raise errors.InvalidMetrics(unknown | VOCABULARY.decode(invalid))
 
-        diff = inputs - self.values
-        if diff:
-            raise errors.UnsupportedMetrics(diff)
+        unsupported = mask & ~self.mask
+        if unsupported:
+            raise errors.UnsupportedMetrics(VOCABULARY.decode(unsupported))
 
 
 class SortOptions(abc.FeatureType, CompareMixin):
+    __slots__ = ("descending_only",)
+
     def __init__(self, *args: str, descending_only: bool = False) -> None:
         super().__init__(*args)
         self.descending_only = descending_only
 
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, self.__class__):
+            return NotImplemented
+
+        return (
+            self.values == other.values
+            and self.descending_only == other.descending_only
+        )
+
+    def __ne__(self, other: object) -> bool:
+        if not isinstance(other, self.__class__):
+            return NotImplemented
+
+        return not self == other
+
+    def __hash__(self) -> int:
+        return hash((self.__class__.__name__, self.values, self.descending_only))
+
     def validate(self, inputs: t.Collection[str]) -> None:
-        raw_inputs = set(i.strip("-") for i in inputs)
-        if not isinstance(inputs, set):
-            inputs = set(inputs)
+        mask, unknown = VOCABULARY.encode(i.strip("-") for i in inputs)
 
-        diff = raw_inputs - data.ALL_METRICS
-        if diff:
-            raise errors.InvalidSortOptions(diff)
+        invalid = mask & ~vocabulary.ALL_METRICS
+        if unknown or invalid:
+            raise errors.InvalidSortOptions(unknown | VOCABULARY.decode(invalid))
 
-        diff = raw_inputs - self.values
-        if diff:
-            raise errors.UnsupportedSortOptions(diff)
+        unsupported = mask & ~self.mask
+        if unsupported:
+            raise errors.UnsupportedSortOptions(VOCABULARY.decode(unsupported))
 
         if self.descending_only:
             diff = {i for i in inputs if not i.startswith("-")}
@@ -113,46 +137,35 @@ class SortOptions(abc.FeatureType, CompareMixin):
 
 
 class Dimensions(abc.SegmentedFeatureType, NestedCompareMixin):
+    __slots__ = ()
+
     def validate(self, inputs: t.Collection[str]) -> None:
-        if not isinstance(inputs, set):
-            inputs = set(inputs)
+        mask, unknown = VOCABULARY.encode(inputs)
 
-        diff = inputs - data.ALL_DIMENSIONS
-        if diff:
-            depr = inputs & data.DEPRECATED_DIMENSIONS
+        invalid = mask & ~vocabulary.ALL_DIMENSIONS
+        if unknown or invalid:
+            diff = unknown | VOCABULARY.decode(invalid)
+            depr = diff & data.DEPRECATED_DIMENSIONS
             raise errors.InvalidDimensions(diff, depr)
 
-        diff = inputs - self.every
-        if diff:
-            raise errors.UnsupportedDimensions(diff)
+        unsupported = mask & ~self.mask
+        if unsupported:
+            raise errors.UnsupportedDimensions(VOCABULARY.decode(unsupported))
 
         for set_type in self.values:
-            set_type.validate_dimensions(inputs)
+            set_type.validate_dimensions(mask)
 
 
 class Filters(abc.MappingFeatureType, NestedCompareMixin):
-    @property
-    def every_key(self) -> set[str]:
-        return {v[: v.index("=")] if "==" in v else v for v in self.every}
-
-    @property
-    def locked(self) -> dict[str, str]:
-        locked = {}
-
-        for set_type in self.values:
-            for value in filter(lambda v: "==" in v, set_type.values):
-                k, v = value.split("==")
-                locked.update({k: v})
-
-        return locked
+    __slots__ = ()
 
     def validate(self, inputs: dict[str, str]) -> None:
-        keys = set(inputs.keys())
+        mask, unknown = VOCABULARY.encode(inputs)
         locked = self.locked
 
-        diff = keys - data.ALL_FILTERS
-        if diff:
-            raise errors.InvalidFilters(diff)
+        invalid = mask & ~vocabulary.ALL_FILTERS
+        if unknown or invalid:
+            raise errors.InvalidFilters(unknown | VOCABULARY.decode(invalid))
 
         for k, v in inputs.items():
             valid = data.VALID_FILTER_OPTIONS[k]
@@ -160,97 +173,111 @@ class Filters(abc.MappingFeatureType, NestedCompareMixin):
             if valid and (v not in valid):
                 raise errors.InvalidFilterValue(k, v)
 
-            if k in locked.keys():
+            if k in locked:
                 if v != locked[k]:
                     raise errors.UnsupportedFilterValue(k, v)
 
-        diff = keys - self.every_key
-        if diff:
-            raise errors.UnsupportedFilters(diff)
+        # The mask of a set of filters covers their keys, not their
+        # locked values.
+        unsupported = mask & ~self.mask
+        if unsupported:
+            raise errors.UnsupportedFilters(VOCABULARY.decode(unsupported))
 
         for set_type in self.values:
-            set_type.validate_filters(keys)
+            set_type.validate_filters(mask)
 
 
 class Required(abc.SetType, CompareMixin):
-    def validate_dimensions(self, inputs: set[str]) -> None:
-        if self.values & inputs == self.values:
+    __slots__ = ()
+
+    def validate_dimensions(self, inputs: int) -> None:
+        if self.mask & inputs == self.mask:
             return
 
-        common = len(inputs & self.values)
+        common = popcount(inputs & self.mask)
         raise errors.InvalidSetOfDimensions("all", common, self.values)
 
-    def validate_filters(self, keys: set[str]) -> None:
-        if self.expd_keys & keys == self.expd_keys:
+    def validate_filters(self, keys: int) -> None:
+        if self.key_mask & keys == self.key_mask:
             return
 
-        common = len(keys & self.expd_keys)
+        common = popcount(keys & self.key_mask)
         raise errors.InvalidSetOfFilters("all", common, self.values)
 
 
 class ExactlyOne(abc.SetType, CompareMixin):
-    def validate_dimensions(self, inputs: set[str]) -> None:
-        if len(self.values & inputs) == 1:
+    __slots__ = ()
+
+    def validate_dimensions(self, inputs: int) -> None:
+        if popcount(self.mask & inputs) == 1:
             return
 
-        common = len(inputs & self.values)
+        common = popcount(inputs & self.mask)
         raise errors.InvalidSetOfDimensions("1", common, self.values)
 
-    def validate_filters(self, keys: set[str]) -> None:
-        if len(self.expd_keys & keys) == 1:
+    def validate_filters(self, keys: int) -> None:
+        if popcount(self.key_mask & keys) == 1:
             return
 
-        common = len(keys & self.expd_keys)
+        common = popcount(keys & self.key_mask)
         raise errors.InvalidSetOfFilters("1", common, self.values)
 
 
 class OneOrMore(abc.SetType, CompareMixin):
-    def validate_dimensions(self, inputs: set[str]) -> None:
-        if len(self.values & inputs) > 0:
+    __slots__ = ()
+
+    def validate_dimensions(self, inputs: int) -> None:
+        if self.mask & inputs:
             return
 
-        common = len(inputs & self.values)
+        common = popcount(inputs & self.mask)
         raise errors.InvalidSetOfDimensions("at least 1", common, self.values)
 
-    def validate_filters(self, keys: set[str]) -> None:
-        if len(self.expd_keys & keys) > 0:
+    def validate_filters(self, keys: int) -> None:
+        if self.key_mask & keys:
             return
 
-        common = len(keys & self.expd_keys)
+        common = popcount(keys & self.key_mask)
         raise errors.InvalidSetOfFilters("at least 1", common, self.values)
 
 
 class Optional(abc.SetType, CompareMixin):
-    def validate_dimensions(self, inputs: set[str]) -> None:
+    __slots__ = ()
+
+    def validate_dimensions(self, inputs: int) -> None:
         # No verifiction required.
         ...
 
-    def validate_filters(self, keys: set[str]) -> None:
+    def validate_filters(self, keys: int) -> None:
         # No verifiction required.
         ...
 
 
 class ZeroOrOne(abc.SetType, CompareMixin):
-    def validate_dimensions(self, inputs: set[str]) -> None:
-        if len(self.values & inputs) < 2:
+    __slots__ = ()
+
+    def validate_dimensions(self, inputs: int) -> None:
+        if popcount(self.mask & inputs) < 2:
             return
 
-        common = len(inputs & self.values)
+        common = popcount(inputs & self.mask)
         raise errors.InvalidSetOfDimensions("0 or 1", common, self.values)
 
-    def validate_filters(self, keys: set[str]) -> None:
-        if len(self.expd_keys & keys) < 2:
+    def validate_filters(self, keys: int) -> None:
+        if popcount(self.key_mask & keys) < 2:
             return
 
-        common = len(keys & self.expd_keys)
+        common = popcount(keys & self.key_mask)
         raise errors.InvalidSetOfFilters("0 or 1", common, self.values)
 
 
 class ZeroOrMore(abc.SetType, CompareMixin):
-    def validate_dimensions(self, inputs: set[str]) -> None:
+    __slots__ = ()
+
+    def validate_dimensions(self, inputs: int) -> None:
         # No verifiction required.
         ...
 
-    def validate_filters(self, keys: set[str]) -> None:
+    def validate_filters(self, keys: int) -> None:
         # No verifiction required.
         ...
@@ -0,0 +1,301 @@
+# Copyright (c) 2021-present, Ethan Henderson
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from __future__ import annotations
+
+import logging
+import time
+import typing as t
+from dataclasses import dataclass
+
+if t.TYPE_CHECKING:
+    from analytix.queries import Query
+    from analytix.reports import Report
+    from analytix.retries import Attempt
+
+_log = logging.getLogger(__name__)
+
+
+@dataclass()
+class RequestEvent:
+    """A dataclass representing the progress of a single request. The
+    same instance is passed to every hook called for a request, and is
+    updated as the request progresses.
+
+    Args:
+        query:
+            The query being retrieved, or ``None`` for token refreshes.
+        timings:
+            The number of seconds each completed stage took, by name.
+            The stages are "validate", "auth", "cache", "http",
+            "decode", "build", and "refresh". Stages which were skipped
+            are not included.
+        status_code:
+            The status code of the response, if one has been received.
+        size:
+            The size of the response body in bytes, if it has been
+            read.
+        attempt:
+            The attempt that is about to be retried, if any.
+        report:
+            The report, once it has been built.
+        from_cache:
+            Whether the report was retrieved from the client's cache.
+
+    .. versionadded:: 3.6.0
+    """
+
+    __slots__ = (
+        "query",
+        "timings",
+        "status_code",
+        "size",
+        "attempt",
+        "report",
+        "from_cache",
+    )
+
+    query: Query | None
+    timings: dict[str, float]
+    status_code: int | None
+    size: int | None
+    attempt: Attempt | None
+    report: Report | None
+    from_cache: bool
+
+    @classmethod
+    def for_query(
+        cls, query: Query | None, timings: dict[str, float] | None = None
+    ) -> RequestEvent:
+        """Create an event for a query.
+
+        Args:
+            query:
+                The query being retrieved.
+            timings:
+                The timings of any stages which have already completed.
+                Defaults to ``None``. These are copied.
+
+        Returns:
+            The new event.
+        """
+
+        return cls(query, dict(timings or {}), None, None, None, None, False)
+
+    @property
+    def total(self) -> float:
+        """The total number of seconds across all recorded stages."""
+
+        return sum(self.timings.values())
+
+
+class Hooks:
+    """The base class for request lifecycle hooks. Hooks are passed to
+    clients on creation, and are called at each stage of retrieving a
+    report. They can be used to record metrics, trace requests, or
+    inspect reports without subclassing the client.
+
+    All hooks do nothing by default, so only the ones you need have to
+    be overridden. Hooks are called synchronously in the thread or task
+    making the request, so should return quickly. Exceptions raised by
+    hooks are logged and otherwise ignored.
+
+    .. versionadded:: 3.6.0
+    """
+
+    __slots__ = ()
+
+    def before_request(self, event: RequestEvent) -> None:
+        """Called just before a request is sent to the API, after the
+        cache has been checked.
+
+        Args:
+            event:
+                The request's event.
+        """
+
+    def after_response(self, event: RequestEvent) -> None:
+        """Called once the final response has been received, after any
+        retries.
+
+        Args:
+            event:
+                The request's event.
+        """
+
+    def on_retry(self, event: RequestEvent) -> None:
+        """Called when an attempt has failed and is about to be retried.
+        The attempt is available as ``event.attempt``.
+
+        Args:
+            event:
+                The request's event.
+        """
+
+    def on_refresh(self, event: RequestEvent) -> None:
+        """Called once a request to refresh the access token has
+        completed, whether or not it succeeded.
+
+        Args:
+            event:
+                The refresh's event. This has no query.
+        """
+
+    def on_report_built(self, event: RequestEvent) -> None:
+        """Called once a report has been created, including when it was
+        retrieved from the cache. The report is available as
+        ``event.report``.
+
+        Args:
+            event:
+                The request's event.
+        """
+
+
+class HookGroup(Hooks):
+    """A set of hooks which are called one after the other, in the
+    order they were given.
+
+    Args:
+        hooks:
+            The hooks to call.
+
+    Attributes:
+        hooks:
+            The hooks to call.
+
+    .. versionadded:: 3.6.0
+    """
+
+    __slots__ = ("hooks",)
+
+    def __init__(self, hooks: t.Iterable[Hooks]) -> None:
+        self.hooks = list(hooks)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(hooks={self.hooks!r})"
+
+    @classmethod
+    def combine(cls, hooks: Hooks | t.Iterable[Hooks] | None) -> HookGroup:
+        """Combine hooks into a single group.
+
+        Args:
+            hooks:
+                A single set of hooks, multiple sets of hooks, or
+                ``None``.
+
+        Returns:
+            The group of hooks. This is empty if ``hooks`` is ``None``,
+            and is ``hooks`` itself if it is already a group.
+        """
+
+        if hooks is None:
+            return cls(())
+
+        if isinstance(hooks, HookGroup):
+            return hooks
+
+        if isinstance(hooks, Hooks):
+            return cls((hooks,))
+
+        return cls(hooks)
+
+    def retry_callback(self, event: RequestEvent) -> t.Callable[[Attempt], None]:
+        """Create a function which calls :meth:`on_retry` for an event.
+        This is intended to be passed to
+        :meth:`RetryPolicy.send <analytix.retries.RetryPolicy.send>`.
+
+        Args:
+            event:
+                The request's event.
+
+        Returns:
+            The callback.
+        """
+
+        def callback(attempt: Attempt) -> None:
+            event.attempt = attempt
+            self.on_retry(event)
+
+        return callback
+
+    def _call(self, name: str, event: RequestEvent) -> None:
+        for hook in self.hooks:
+            try:
+                getattr(hook, name)(event)
+            except Exception as exc:
+                _log.error(f"Hook {hook!r} failed in {name}: {exc!r}")
+
+    def before_request(self, event: RequestEvent) -> None:
+        self._call("before_request", event)
+
+    def after_response(self, event: RequestEvent) -> None:
+        self._call("after_response", event)
+
+    def on_retry(self, event: RequestEvent) -> None:
+        self._call("on_retry", event)
+
+    def on_refresh(self, event: RequestEvent) -> None:
+        self._call("on_refresh", event)
+
+    def on_report_built(self, event: RequestEvent) -> None:
+        self._call("on_report_built", event)
+
+
+class Stopwatch:
+    """A helper for timing the stages of a request.
+
+    Args:
+        timings:
+            The dictionary to record timings in.
+
+    .. versionadded:: 3.6.0
+    """
+
+    __slots__ = ("timings", "_started")
+
+    def __init__(self, timings: dict[str, float]) -> None:
+        self.timings = timings
+        self._started = time.perf_counter()
+
+    def lap(self, stage: str) -> None:
+        """Record the time since the last lap (or creation) as a stage.
+
+        Args:
+            stage:
+                The name of the stage.
+        """
+
+        now = time.perf_counter()
+        self.timings[stage] = now - self._started
+        self._started = now
+
+    def skip(self) -> None:
+        """Restart timing without recording a stage."""
+
+        self._started = time.perf_counter()
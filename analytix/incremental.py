@@ -0,0 +1,409 @@
+# Copyright (c) 2021-present, Ethan Henderson
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from __future__ import annotations
+
+import datetime as dt
+import hashlib
+import logging
+import os
+import pathlib
+import tempfile
+import typing as t
+from dataclasses import dataclass
+
+import aiofiles
+
+from analytix import codecs
+from analytix.caching import valid_namespace
+from analytix.errors import InvalidRequest
+from analytix.queries import Query
+from analytix.reports import Report
+
+if t.TYPE_CHECKING:
+    from analytix.analytics import Analytics
+    from analytix.async_analytics import AsyncAnalytics
+    from analytix.types import QuerySpecT
+
+_log = logging.getLogger(__name__)
+
+
+@dataclass()
+class SyncState:
+    """A dataclass representing the stored state of an incrementally
+    synced query.
+
+    Args:
+        last_date:
+            The last date data was successfully fetched for.
+        data:
+            The raw data of the report accumulated so far.
+
+    .. versionadded:: 3.6.0
+    """
+
+    __slots__ = ("last_date", "data")
+
+    last_date: dt.date
+    data: dict[str, t.Any]
+
+
+class SyncStore:
+    """A local store which keeps the state of incrementally synced
+    queries on disk.
+
+    Each query's state is stored as a JSON file in the store's
+    directory, and is replaced atomically whenever it is saved.
+
+    Args:
+        path:
+            The directory to store sync state in. Defaults to
+            ".analytix_sync" in the current directory. This is created
+            if it does not exist.
+
+    Attributes:
+        path:
+            The directory sync state is stored in.
+
+    .. versionadded:: 3.6.0
+    """
+
+    __slots__ = ("path",)
+
+    def __init__(self, path: pathlib.Path | str = ".analytix_sync") -> None:
+        if not isinstance(path, pathlib.Path):
+            path = pathlib.Path(path)
+
+        path.mkdir(parents=True, exist_ok=True)
+        self.path = path
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(path={str(self.path)!r})"
+
+    def _state_path(self, key: str) -> pathlib.Path:
+        return self.path / f"{key}.json"
+
+    def _encode(self, state: SyncState) -> bytes:
+        entry = {"last_date": state.last_date.isoformat(), "data": state.data}
+        return codecs.dumps(entry)
+
+    def _decode(self, raw: bytes) -> SyncState:
+        entry = codecs.loads(raw)
+        return SyncState(dt.date.fromisoformat(entry["last_date"]), entry["data"])
+
+    def _temp_path(self) -> pathlib.Path:
+        fd, tmp = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        os.close(fd)
+        return pathlib.Path(tmp)
+
+    def load(self, key: str) -> SyncState | None:
+        """Load the state of a query.
+
+        Args:
+            key:
+                The key of the query.
+
+        Returns:
+            The query's state, or ``None`` if it has never been synced.
+        """
+
+        try:
+            return self._decode(self._state_path(key).read_bytes())
+        except FileNotFoundError:
+            return None
+
+    def save(self, key: str, state: SyncState) -> None:
+        """Save the state of a query.
+
+        Args:
+            key:
+                The key of the query.
+            state:
+                The query's new state.
+        """
+
+        tmp = self._temp_path()
+
+        try:
+            tmp.write_bytes(self._encode(state))
+            os.replace(tmp, self._state_path(key))
+        except BaseException:
+            tmp.unlink()
+            raise
+
+    def remove(self, key: str) -> None:
+        """Remove the state of a query, so that the next sync fetches
+        its full initial window again. This does nothing if the query
+        has never been synced.
+
+        Args:
+            key:
+                The key of the query.
+        """
+
+        try:
+            self._state_path(key).unlink()
+        except FileNotFoundError:
+            ...
+
+    async def aload(self, key: str) -> SyncState | None:
+        """Asynchronous version of :meth:`load`."""
+
+        try:
+            async with aiofiles.open(self._state_path(key), "rb") as f:
+                return self._decode(await f.read())
+        except FileNotFoundError:
+            return None
+
+    async def asave(self, key: str, state: SyncState) -> None:
+        """Asynchronous version of :meth:`save`."""
+
+        tmp = self._temp_path()
+
+        try:
+            async with aiofiles.open(tmp, "wb") as f:
+                await f.write(self._encode(state))
+            os.replace(tmp, self._state_path(key))
+        except BaseException:
+            tmp.unlink()
+            raise
+
+
+class IncrementalSync:
+    """A helper for keeping a local copy of a daily report up to date
+    without refetching data which has not changed.
+
+    The first sync of a query fetches its whole date range. After that,
+    each sync only fetches the days since the last successful sync,
+    plus a restatement window of recent days which the API may still
+    have been revising. Fetched rows replace any stored rows for the
+    same days, and the merged report is saved to the store.
+
+    Queries are identified by everything except their dates, so
+    changing any other part of a query starts a new sync from scratch.
+    State is only ever shared between syncs with the same namespace, so
+    each channel (or set of tokens) should have its own. Syncs with
+    different namespaces can safely share a store.
+
+    Args:
+        store:
+            The store to keep sync state in, or the path to a directory
+            to create one in. Defaults to ".analytix_sync" in the
+            current directory.
+
+    Keyword Args:
+        namespace:
+            The name of the channel or account this sync stores reports
+            for. This can only contain letters, numbers, underscores,
+            hyphens, and full stops.
+        restatement_days:
+            The number of already fetched days to fetch again on each
+            sync. Defaults to ``3``.
+
+    Attributes:
+        store:
+            The store sync state is kept in.
+        namespace:
+            The name of the channel or account this sync stores reports
+            for.
+        restatement_days:
+            The number of already fetched days to fetch again on each
+            sync.
+
+    .. versionadded:: 3.6.0
+    """
+
+    __slots__ = ("store", "namespace", "restatement_days")
+
+    def __init__(
+        self,
+        store: SyncStore | pathlib.Path | str = ".analytix_sync",
+        *,
+        namespace: str,
+        restatement_days: int = 3,
+    ) -> None:
+        if not valid_namespace(namespace):
+            raise ValueError(f"invalid sync namespace {namespace!r}")
+
+        if restatement_days < 0:
+            raise ValueError("the number of restatement days should be non-negative")
+
+        if not isinstance(store, SyncStore):
+            store = SyncStore(store)
+
+        self.store = store
+        self.namespace = namespace
+        self.restatement_days = restatement_days
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(store={self.store!r}, "
+            f"namespace={self.namespace!r}, "
+            f"restatement_days={self.restatement_days})"
+        )
+
+    @staticmethod
+    def _query(template: QuerySpecT, start: dt.date, end: dt.date) -> Query:
+        options = {
+            k: v for k, v in template.items() if k not in ("start_date", "end_date")
+        }
+        return Query(start_date=start, end_date=end, **options)
+
+    def key(self, template: QuerySpecT) -> str:
+        """Get the key a query's state is stored under. This includes
+        the sync's namespace.
+
+        Args:
+            template:
+                The query, as the keyword arguments that would be passed
+                to ``retrieve``.
+
+        Returns:
+            The query's key.
+        """
+
+        # The dates are pinned so they don't contribute to the key.
+        query = self._query(template, dt.date.min, dt.date.min)
+        digest = hashlib.sha256(query.key.encode("utf-8")).hexdigest()
+        return f"{self.namespace}.{digest}"
+
+    def _window(
+        self, template: QuerySpecT, state: SyncState | None
+    ) -> tuple[dt.date, dt.date]:
+        query = Query(
+            start_date=template.get("start_date"), end_date=template.get("end_date")
+        )
+        start, end = query._start_date, query._end_date
+
+        if state is not None:
+            start = state.last_date - dt.timedelta(days=self.restatement_days - 1)
+
+        return start, end
+
+    def _check(self, template: QuerySpecT) -> None:
+        query = self._query(template, dt.date.min, dt.date.min)
+
+        if "day" not in query.dimensions:
+            raise InvalidRequest("incremental syncing requires the 'day' dimension")
+
+        if query.sort_options or query.max_results or query.start_index != 1:
+            raise InvalidRequest(
+                "incrementally synced reports cannot be sorted, limited, or offset"
+            )
+
+    def _stored_report(self, template: QuerySpecT, state: SyncState) -> Report:
+        query = self._query(template, state.last_date, state.last_date)
+        query.set_report_type()
+        assert query.rtype is not None
+        return Report(state.data, query.rtype)
+
+    def _merge(
+        self,
+        state: SyncState | None,
+        report: Report,
+        start: dt.date,
+        end: dt.date,
+    ) -> SyncState:
+        if state is None:
+            return SyncState(end, report.data)
+
+        index = [h["name"] for h in state.data["columnHeaders"]].index("day")
+        first, last = start.isoformat(), end.isoformat()
+        kept = [r for r in state.data["rows"] if not first <= r[index] <= last]
+
+        stored = Report({**state.data, "rows": kept}, report.type)
+        merged = Report.concat([stored, report])
+        # Dates are ISO formatted, so sort correctly as strings. The
+        # sort is stable, so rows within each day keep the API's order.
+        merged.data["rows"].sort(key=lambda r: r[index])
+        return SyncState(max(end, state.last_date), merged.data)
+
+    def run(self, client: Analytics, template: QuerySpecT, **kwargs: t.Any) -> Report:
+        """Sync a query, fetching only the data that is new or may have
+        changed since it was last synced.
+
+        Args:
+            client:
+                The client to retrieve reports with.
+            template:
+                The query, as the keyword arguments that would be passed
+                to :meth:`~analytix.analytics.Analytics.retrieve`.
+                The query must have the "day" dimension, and cannot be
+                sorted, limited, or offset. The start date is only used
+                for the first sync, and the end date defaults to the
+                current date as usual.
+
+        Keyword Args:
+            **kwargs:
+                Additional keyword arguments to pass to ``retrieve``,
+                such as ``skip_validation`` or ``shard_by``.
+
+        Returns:
+            The full synced report, including previously stored rows.
+
+        Raises:
+            InvalidRequest:
+                The query cannot be synced incrementally.
+        """
+
+        self._check(template)
+        key = self.key(template)
+        state = self.store.load(key)
+        start, end = self._window(template, state)
+
+        if state is not None and start > end:
+            _log.info("Nothing to sync -- the stored report is already up to date")
+            return self._stored_report(template, state)
+
+        _log.info(f"Syncing data between {start} and {end}")
+        spec: dict[str, t.Any] = {**template, "start_date": start, "end_date": end}
+        report = client.retrieve(**spec, **kwargs)
+        state = self._merge(state, report, start, end)
+        self.store.save(key, state)
+        return Report(state.data, report.type)
+
+    async def arun(
+        self, client: AsyncAnalytics, template: QuerySpecT, **kwargs: t.Any
+    ) -> Report:
+        """Asynchronous version of :meth:`run`."""
+
+        self._check(template)
+        key = self.key(template)
+        state = await self.store.aload(key)
+        start, end = self._window(template, state)
+
+        if state is not None and start > end:
+            _log.info("Nothing to sync -- the stored report is already up to date")
+            return self._stored_report(template, state)
+
+        _log.info(f"Syncing data between {start} and {end}")
+        spec: dict[str, t.Any] = {**template, "start_date": start, "end_date": end}
+        report = await client.retrieve(**spec, **kwargs)
+        state = self._merge(state, report, start, end)
+        await self.store.asave(key, state)
+        return Report(state.data, report.type)
@@ -0,0 +1,377 @@
+# Copyright (c) 2021-present, Ethan Henderson
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import logging
+import threading
+import time
+
+from analytix import errors
+
+_log = logging.getLogger(__name__)
+
+EXHAUSTION_POLICIES = ("refuse", "delay")
+
+_limiters: dict[str, RateLimiter] = {}
+_quotas: dict[str, Quota] = {}
+_registry_lock = threading.Lock()
+
+
+class RateLimiter:
+    """A token bucket rate limiter.
+
+    The bucket holds up to ``burst`` tokens and is refilled at a
+    constant rate. Every request takes a token, and waits for one to
+    become available if the bucket is empty. A single limiter can be
+    shared between any number of clients, threads, and tasks.
+
+    Args:
+        rate:
+            The number of requests allowed per second.
+
+    Keyword Args:
+        burst:
+            The number of requests that can be made in quick succession
+            before limiting kicks in. Defaults to ``1``.
+
+    Attributes:
+        rate:
+            The number of requests allowed per second.
+        burst:
+            The size of the bucket.
+
+    .. versionadded:: 3.6.0
+    """
+
+    __slots__ = ("rate", "burst", "_tokens", "_updated", "_lock")
+
+    def __init__(self, rate: float, *, burst: int = 1) -> None:
+        if rate <= 0:
+            raise ValueError(f"expected a positive rate, got {rate}")
+
+        if burst < 1:
+            raise ValueError(f"expected a burst of at least 1, got {burst}")
+
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"RateLimiter(rate={self.rate}, burst={self.burst})"
+
+    @classmethod
+    def shared(cls, key: str, rate: float, *, burst: int = 1) -> RateLimiter:
+        """Get the limiter registered under a given key, creating it
+        first if necessary. This allows clients in the same process to
+        share a limiter without passing it around.
+
+        Args:
+            key:
+                The key to register the limiter under. This will usually
+                be a project ID.
+            rate:
+                The number of requests allowed per second. This is only
+                used if the limiter needs to be created.
+
+        Keyword Args:
+            burst:
+                The size of the bucket. This is only used if the limiter
+                needs to be created. Defaults to ``1``.
+
+        Returns:
+            The shared limiter.
+        """
+
+        with _registry_lock:
+            if key not in _limiters:
+                _limiters[key] = cls(rate, burst=burst)
+            return _limiters[key]
+
+    @property
+    def available(self) -> float:
+        """The number of tokens currently in the bucket. This property
+        is read-only."""
+
+        with self._lock:
+            self._refill()
+            return max(0.0, self._tokens)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            float(self.burst), self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def _reserve(self) -> float:
+        # Tokens are taken immediately, even if that leaves the bucket
+        # in debt, so waiting callers are served in the order they
+        # arrived.
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self) -> None:
+        """Take a token, waiting for one to become available if
+        necessary."""
+
+        delay = self._reserve()
+        if delay:
+            _log.debug(f"Rate limited; waiting {delay:.2f} seconds")
+            time.sleep(delay)
+
+    async def aacquire(self) -> None:
+        """Asynchronous version of :obj:`acquire`."""
+
+        delay = self._reserve()
+        if delay:
+            _log.debug(f"Rate limited; waiting {delay:.2f} seconds")
+            await asyncio.sleep(delay)
+
+
+class Quota:
+    """A running count of the requests made against a Google Developers
+    project's quota.
+
+    The count is reset at midnight every day. Google resets quotas at
+    midnight Pacific Time, so you may want to pass a suitable timezone.
+
+    Args:
+        project_id:
+            The ID of the project the quota belongs to.
+
+    Keyword Args:
+        budget:
+            The number of requests that can be made each day. Defaults
+            to ``None``. If this is ``None``, requests are counted but
+            never restricted.
+        on_exhausted:
+            What to do when a request is made once the budget has been
+            used up. This can be "refuse" to raise a
+            :obj:`QuotaExceeded` error, or "delay" to wait until the
+            quota resets. Defaults to "refuse".
+        tz:
+            The timezone that determines when the quota resets.
+            Defaults to UTC.
+
+    Attributes:
+        project_id:
+            The ID of the project the quota belongs to.
+        budget:
+            The number of requests that can be made each day, if
+            limited.
+        on_exhausted:
+            What to do when the budget has been used up.
+        tz:
+            The timezone that determines when the quota resets.
+
+    .. versionadded:: 3.6.0
+    """
+
+    __slots__ = (
+        "project_id",
+        "budget",
+        "on_exhausted",
+        "tz",
+        "_used",
+        "_resets_at",
+        "_lock",
+    )
+
+    def __init__(
+        self,
+        project_id: str,
+        *,
+        budget: int | None = None,
+        on_exhausted: str = "refuse",
+        tz: dt.tzinfo = dt.timezone.utc,
+    ) -> None:
+        if on_exhausted not in EXHAUSTION_POLICIES:
+            vals = ", ".join(EXHAUSTION_POLICIES)
+            raise ValueError(
+                f"expected exhaustion policy to be one of {vals}, "
+                f"got {on_exhausted!r}"
+            )
+
+        self.project_id = project_id
+        self.budget = budget
+        self.on_exhausted = on_exhausted
+        self.tz = tz
+        self._used = 0
+        self._resets_at = self._next_reset()
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return (
+            f"Quota(project_id={self.project_id!r}, used={self.used}, "
+            f"budget={self.budget})"
+        )
+
+    @classmethod
+    def for_project(
+        cls,
+        project_id: str,
+        *,
+        budget: int | None = None,
+        on_exhausted: str = "refuse",
+        tz: dt.tzinfo = dt.timezone.utc,
+    ) -> Quota:
+        """Get the quota for a given project, creating it first if
+        necessary. All clients in the same process using the returned
+        quota share the same count.
+
+        Args:
+            project_id:
+                The ID of the project.
+
+        Keyword Args:
+            budget:
+                The daily budget. This is only used if the quota needs
+                to be created. Defaults to ``None``.
+            on_exhausted:
+                What to do when the budget has been used up. This is
+                only used if the quota needs to be created. Defaults to
+                "refuse".
+            tz:
+                The timezone that determines when the quota resets. This
+                is only used if the quota needs to be created. Defaults
+                to UTC.
+
+        Returns:
+            The project's quota.
+        """
+
+        with _registry_lock:
+            if project_id not in _quotas:
+                _quotas[project_id] = cls(
+                    project_id, budget=budget, on_exhausted=on_exhausted, tz=tz
+                )
+            return _quotas[project_id]
+
+    @property
+    def used(self) -> int:
+        """The number of requests made since the quota last reset. This
+        property is read-only."""
+
+        with self._lock:
+            self._maybe_reset()
+            return self._used
+
+    @property
+    def remaining(self) -> int | None:
+        """The number of requests that can still be made before the
+        quota resets, or ``None`` if there is no budget. This property
+        is read-only."""
+
+        if self.budget is None:
+            return None
+
+        return max(0, self.budget - self.used)
+
+    @property
+    def resets_at(self) -> dt.datetime:
+        """The time at which the quota next resets. This property is
+        read-only."""
+
+        with self._lock:
+            self._maybe_reset()
+            return self._resets_at
+
+    def _next_reset(self) -> dt.datetime:
+        tomorrow = dt.datetime.now(self.tz).date() + dt.timedelta(days=1)
+        return dt.datetime.combine(tomorrow, dt.time(), tzinfo=self.tz)
+
+    def _maybe_reset(self) -> None:
+        if dt.datetime.now(self.tz) >= self._resets_at:
+            _log.info(f"Resetting quota for project {self.project_id}")
+            self._used = 0
+            self._resets_at = self._next_reset()
+
+    def reset(self) -> None:
+        """Reset the count to zero."""
+
+        with self._lock:
+            self._used = 0
+            self._resets_at = self._next_reset()
+
+    def _consume(self, cost: int) -> float | None:
+        with self._lock:
+            self._maybe_reset()
+
+            if self.budget is not None and self._used + cost > self.budget:
+                if self.on_exhausted == "refuse":
+                    raise errors.QuotaExceeded(self.project_id, self.budget)
+
+                now = dt.datetime.now(self.tz)
+                return max(0.0, (self._resets_at - now).total_seconds())
+
+            self._used += cost
+            return None
+
+    def consume(self, cost: int = 1) -> None:
+        """Count a request against the quota.
+
+        If the budget has been used up, this either raises an error or
+        waits until the quota resets, depending on the exhaustion
+        policy.
+
+        Args:
+            cost:
+                The number of units the request costs. Defaults to
+                ``1``.
+
+        Raises:
+            QuotaExceeded:
+                The budget has been used up and the exhaustion policy is
+                "refuse".
+        """
+
+        while True:
+            delay = self._consume(cost)
+            if delay is None:
+                return
+
+            _log.warning(f"Quota exhausted; waiting {delay:.0f} seconds for reset")
+            time.sleep(delay)
+
+    async def aconsume(self, cost: int = 1) -> None:
+        """Asynchronous version of :obj:`consume`."""
+
+        while True:
+            delay = self._consume(cost)
+            if delay is None:
+                return
+
+            _log.warning(f"Quota exhausted; waiting {delay:.0f} seconds for reset")
+            await asyncio.sleep(delay)
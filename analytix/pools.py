@@ -0,0 +1,499 @@
+# Copyright (c) 2021-present, Ethan Henderson
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from __future__ import annotations
+
+import abc
+import asyncio
+import logging
+import pathlib
+import typing as t
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import httpx
+
+from analytix.analytics import Analytics
+from analytix.async_analytics import AsyncAnalytics
+from analytix.caching import valid_namespace
+from analytix.hooks import HookGroup, Hooks
+from analytix.tokens import FileTokenStore
+
+if t.TYPE_CHECKING:
+    from analytix.abc import ReportCache
+    from analytix.limits import Quota, RateLimiter
+    from analytix.reports import Report
+    from analytix.retries import RetryPolicy
+    from analytix.secrets import Secrets
+    from analytix.tokens import Tokens
+    from analytix.types import QuerySpecT
+
+_log = logging.getLogger(__name__)
+
+ClientT = t.TypeVar("ClientT", Analytics, AsyncAnalytics)
+
+
+class _BasePool(t.Generic[ClientT], metaclass=abc.ABCMeta):
+    __slots__ = (
+        "secrets",
+        "token_dir",
+        "_session",
+        "_clients",
+        "_options",
+        "_cache_factory",
+    )
+
+    def __init__(
+        self,
+        secrets: Secrets,
+        *,
+        token_dir: pathlib.Path | str = ".",
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        cache_factory: t.Callable[[str], ReportCache | None] | None = None,
+        refresh_margin: float = 60.0,
+        retry_policy: RetryPolicy | None = None,
+        rate_limiter: RateLimiter | None = None,
+        quota: Quota | None = None,
+        hooks: Hooks | t.Iterable[Hooks] | None = None,
+        **kwargs: t.Any,
+    ) -> None:
+        if not isinstance(token_dir, pathlib.Path):
+            token_dir = pathlib.Path(token_dir)
+
+        self.secrets = secrets
+        self.token_dir = token_dir
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        )
+        self._session = self._create_session(limits, kwargs)
+        self._clients: dict[str, ClientT] = {}
+        self._cache_factory = cache_factory
+        self._options: dict[str, t.Any] = {
+            "refresh_margin": refresh_margin,
+            "retry_policy": retry_policy,
+            "rate_limiter": rate_limiter,
+            "quota": quota,
+            # Combined once so iterators aren't used up by the first
+            # client.
+            "hooks": HookGroup.combine(hooks),
+        }
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def __contains__(self, channel: object) -> bool:
+        return channel in self._clients
+
+    def __getitem__(self, channel: str) -> ClientT:
+        try:
+            return self._clients[channel]
+        except KeyError:
+            raise KeyError(f"no channel named {channel!r} in this pool") from None
+
+    @property
+    def channels(self) -> list[str]:
+        """The names of all the channels in this pool. This property is
+        read-only."""
+
+        return list(self._clients)
+
+    def add_channel(self, channel: str, *, tokens: Tokens | None = None) -> ClientT:
+        """Add a channel to the pool.
+
+        Each channel's tokens are stored in their own file in the
+        pool's token directory, named after the channel.
+
+        Args:
+            channel:
+                The name of the channel. This must be unique within the
+                pool, and can only contain letters, numbers,
+                underscores, hyphens, and full stops.
+
+        Keyword Args:
+            tokens:
+                The channel's tokens. Defaults to ``None``. If this is
+                ``None``, the tokens are loaded from the channel's token
+                file, and if there isn't one, the channel is authorised
+                the first time a report is retrieved for it.
+
+        Returns:
+            The client for the channel.
+
+        Raises:
+            ValueError:
+                The channel name is invalid, or a channel with the same
+                name is already in the pool.
+        """
+
+        if not valid_namespace(channel):
+            raise ValueError(f"invalid channel name {channel!r}")
+
+        if channel in self._clients:
+            raise ValueError(f"channel {channel!r} is already in this pool")
+
+        cache = self._cache_factory(channel) if self._cache_factory else None
+        client = self._create_client(
+            cache=cache,
+            token_store=FileTokenStore(self.token_dir / f"{channel}.json"),
+            **self._options,
+        )
+        client._tokens = tokens
+        self._clients[channel] = client
+        _log.debug(f"Added channel {channel!r} to pool")
+        return client
+
+    @abc.abstractmethod
+    def _create_session(self, limits: httpx.Limits, kwargs: dict[str, t.Any]) -> t.Any:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def _create_client(self, **kwargs: t.Any) -> ClientT:
+        raise NotImplementedError
+
+    def remove_channel(self, channel: str) -> None:
+        """Remove a channel from the pool.
+
+        Args:
+            channel:
+                The name of the channel.
+
+        Raises:
+            KeyError:
+                There is no channel with that name in the pool.
+        """
+
+        self[channel]
+        del self._clients[channel]
+
+
+class ChannelPool(_BasePool[Analytics]):
+    """A pool of clients for many channels belonging to the same Google
+    Developers project.
+
+    All clients in the pool share the project secrets and a single HTTP
+    client, so connections are reused across channels. Each channel has
+    its own tokens, which are used for all requests made for it.
+
+    Args:
+        secrets:
+            The project secrets from the Google Developers Console.
+
+    Keyword Args:
+        token_dir:
+            The directory to store each channel's tokens in. Defaults
+            to the current directory.
+        max_connections:
+            The maximum number of connections the pool can open at
+            once. Defaults to ``100``.
+        max_keepalive_connections:
+            The maximum number of idle connections to keep open.
+            Defaults to ``20``.
+        cache_factory:
+            A function which takes a channel name and returns the cache
+            to use for that channel, if any. Defaults to ``None``. Each
+            channel needs its own cache, as queries for different
+            channels are otherwise identical. For disk caches, passing
+            the channel name as the namespace does this.
+        refresh_margin:
+            The number of seconds before an access token expires that
+            it should be refreshed. Defaults to ``60``.
+        retry_policy:
+            How failed requests should be retried. Defaults to ``None``.
+        rate_limiter:
+            The rate limiter shared by all channels. Defaults to
+            ``None``.
+        quota:
+            The quota shared by all channels. Defaults to ``None``.
+        hooks:
+            The hooks shared by all channels. Defaults to ``None``.
+        **kwargs:
+            Additional parameters to be passed to the
+            :obj:`httpx.Client` constructor.
+
+    Attributes:
+        secrets:
+            The project secrets.
+        token_dir:
+            The directory each channel's tokens are stored in.
+
+    .. versionadded:: 3.6.0
+    """
+
+    __slots__ = ()
+
+    _session: httpx.Client
+
+    def _create_session(
+        self, limits: httpx.Limits, kwargs: dict[str, t.Any]
+    ) -> httpx.Client:
+        return httpx.Client(limits=limits, **kwargs)
+
+    def _create_client(self, **kwargs: t.Any) -> Analytics:
+        return Analytics(self.secrets, session=self._session, **kwargs)
+
+    def retrieve(self, channel: str, **kwargs: t.Any) -> Report:
+        """Retrieve a report for a channel. This takes the same
+        arguments as :obj:`Analytics.retrieve`, except the update check
+        is always skipped.
+
+        Args:
+            channel:
+                The name of the channel.
+
+        Returns:
+            The retrieved report.
+        """
+
+        return self[channel].retrieve(skip_update_check=True, **kwargs)
+
+    def retrieve_many(
+        self,
+        requests: t.Iterable[tuple[str, QuerySpecT]],
+        *,
+        max_workers: int = 10,
+        skip_validation: bool = False,
+        skip_refresh_check: bool = False,
+    ) -> list[Report | Exception]:
+        """Retrieve many reports across any number of channels
+        concurrently.
+
+        Args:
+            requests:
+                The reports to retrieve, each as a tuple of a channel
+                name and a mapping of arguments for
+                :obj:`Analytics.retrieve`.
+
+        Keyword Args:
+            max_workers:
+                The maximum number of reports to retrieve at once
+                across all channels. Defaults to ``10``.
+            skip_validation:
+                Whether to skip validation of the requests. Defaults to
+                ``False``.
+            skip_refresh_check:
+                Whether to skip token refreshing. Defaults to ``False``.
+
+        Returns:
+            A list of results in the same order as the requests. Each
+            result is either the retrieved report, or the exception
+            raised while validating or retrieving it.
+
+        Raises:
+            ValueError:
+                ``max_workers`` is less than 1.
+        """
+
+        if max_workers < 1:
+            raise ValueError(f"expected at least 1 worker, got {max_workers}")
+
+        requests = list(requests)
+        results: list[Report | Exception | None] = [None] * len(requests)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(
+                    self.retrieve,
+                    channel,
+                    skip_validation=skip_validation,
+                    skip_refresh_check=skip_refresh_check,
+                    **spec,
+                ): i
+                for i, (channel, spec) in enumerate(requests)
+            }
+
+            for future in as_completed(futures):
+                try:
+                    results[futures[future]] = future.result()
+                except Exception as exc:
+                    results[futures[future]] = exc
+
+        return t.cast(t.List[t.Union["Report", Exception]], results)
+
+    def close_session(self) -> None:
+        """Close the pool's session. The pool cannot be used after this
+        is called."""
+
+        self._session.close()
+        _log.info("Session closed")
+
+
+class AsyncChannelPool(_BasePool[AsyncAnalytics]):
+    """An asynchronous pool of clients for many channels belonging to
+    the same Google Developers project.
+
+    All clients in the pool share the project secrets and a single HTTP
+    client, so connections are reused across channels. Each channel has
+    its own tokens, which are used for all requests made for it.
+
+    Args:
+        secrets:
+            The project secrets from the Google Developers Console.
+
+    Keyword Args:
+        token_dir:
+            The directory to store each channel's tokens in. Defaults
+            to the current directory.
+        max_connections:
+            The maximum number of connections the pool can open at
+            once. Defaults to ``100``.
+        max_keepalive_connections:
+            The maximum number of idle connections to keep open.
+            Defaults to ``20``.
+        cache_factory:
+            A function which takes a channel name and returns the cache
+            to use for that channel, if any. Defaults to ``None``. Each
+            channel needs its own cache, as queries for different
+            channels are otherwise identical. For disk caches, passing
+            the channel name as the namespace does this.
+        refresh_margin:
+            The number of seconds before an access token expires that
+            it should be refreshed. Defaults to ``60``.
+        retry_policy:
+            How failed requests should be retried. Defaults to ``None``.
+        rate_limiter:
+            The rate limiter shared by all channels. Defaults to
+            ``None``.
+        quota:
+            The quota shared by all channels. Defaults to ``None``.
+        hooks:
+            The hooks shared by all channels. Defaults to ``None``.
+        **kwargs:
+            Additional parameters to be passed to the
+            :obj:`httpx.AsyncClient` constructor.
+
+    Attributes:
+        secrets:
+            The project secrets.
+        token_dir:
+            The directory each channel's tokens are stored in.
+
+    .. versionadded:: 3.6.0
+    """
+
+    __slots__ = ()
+
+    _session: httpx.AsyncClient
+
+    def _create_session(
+        self, limits: httpx.Limits, kwargs: dict[str, t.Any]
+    ) -> httpx.AsyncClient:
+        return httpx.AsyncClient(limits=limits, **kwargs)
+
+    def _create_client(self, **kwargs: t.Any) -> AsyncAnalytics:
+        return AsyncAnalytics(self.secrets, session=self._session, **kwargs)
+
+    async def retrieve(self, channel: str, **kwargs: t.Any) -> Report:
+        """Retrieve a report for a channel. This takes the same
+        arguments as :obj:`AsyncAnalytics.retrieve`, except the update
+        check is always skipped.
+
+        Args:
+            channel:
+                The name of the channel.
+
+        Returns:
+            The retrieved report.
+        """
+
+        return await self[channel].retrieve(skip_update_check=True, **kwargs)
+
+    async def retrieve_many(
+        self,
+        requests: t.Iterable[tuple[str, QuerySpecT]],
+        *,
+        max_concurrency: int = 10,
+        skip_validation: bool = False,
+        skip_refresh_check: bool = False,
+    ) -> list[Report | Exception]:
+        """Retrieve many reports across any number of channels
+        concurrently.
+
+        Args:
+            requests:
+                The reports to retrieve, each as a tuple of a channel
+                name and a mapping of arguments for
+                :obj:`AsyncAnalytics.retrieve`.
+
+        Keyword Args:
+            max_concurrency:
+                The maximum number of reports to retrieve at once
+                across all channels. Defaults to ``10``.
+            skip_validation:
+                Whether to skip validation of the requests. Defaults to
+                ``False``.
+            skip_refresh_check:
+                Whether to skip token refreshing. Defaults to ``False``.
+
+        Returns:
+            A list of results in the same order as the requests. Each
+            result is either the retrieved report, or the exception
+            raised while validating or retrieving it.
+
+        Raises:
+            ValueError:
+                ``max_concurrency`` is less than 1.
+        """
+
+        if max_concurrency < 1:
+            raise ValueError(
+                f"expected a concurrency of at least 1, got {max_concurrency}"
+            )
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def limited(channel: str, spec: QuerySpecT) -> Report:
+            async with semaphore:
+                return await self.retrieve(
+                    channel,
+                    skip_validation=skip_validation,
+                    skip_refresh_check=skip_refresh_check,
+                    **spec,
+                )
+
+        results = await asyncio.gather(
+            *(limited(channel, spec) for channel, spec in requests),
+            return_exceptions=True,
+        )
+
+        for result in results:
+            if isinstance(result, BaseException) and not isinstance(result, Exception):
+                raise result
+
+        return t.cast(t.List[t.Union["Report", Exception]], results)
+
+    async def close_session(self) -> None:
+        """Close the pool's session, stopping any background tasks its
+        clients are running. The pool cannot be used after this is
+        called."""
+
+        for client in self._clients.values():
+            await client.close_session()
+
+        await self._session.aclose()
+        _log.info("Session closed")
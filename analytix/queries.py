@@ -28,9 +28,13 @@
 
 from __future__ import annotations
 
+import copy
 import datetime as dt
 import logging
+import threading
 import typing as t
+from collections import OrderedDict
+from dataclasses import dataclass
 
 import analytix
 from analytix import data
@@ -38,8 +42,230 @@ from analytix import report_types as rt
 from analytix.abc import ReportType
 from analytix.errors import InvalidRequest
 
+if t.TYPE_CHECKING:
+    from analytix.types import QuerySpecT
+
 _log = logging.getLogger(__name__)
 
+SHARD_UNITS = ("day", "week", "month")
+
+
+def _next_month(date: dt.date) -> dt.date:
+    return (date.replace(day=28) + dt.timedelta(days=4)).replace(day=1)
+
+
+def _date_windows(
+    start: dt.date, end: dt.date, by: str, monthly: bool
+) -> list[tuple[dt.date, dt.date]]:
+    if monthly:
+        # Monthly reports are bounded by the first days of months (see
+        # `Query.validate`), so each window is a single month.
+        windows = []
+        while start <= end:
+            windows.append((start, start))
+            start = _next_month(start)
+        return windows
+
+    windows = []
+    while start <= end:
+        if by == "day":
+            stop = start
+        elif by == "week":
+            stop = start + dt.timedelta(days=6)
+        else:
+            stop = _next_month(start) - dt.timedelta(days=1)
+
+        stop = min(stop, end)
+        windows.append((start, stop))
+        start = stop + dt.timedelta(days=1)
+
+    return windows
+
+
+_DECISIVE_DIMENSIONS = frozenset(
+    (
+        "adType",
+        "ageGroup",
+        "country",
+        "day",
+        "deviceType",
+        "elapsedVideoTimeRatio",
+        "gender",
+        "insightPlaybackLocationDetail",
+        "insightPlaybackLocationType",
+        "insightTrafficSourceDetail",
+        "insightTrafficSourceType",
+        "liveOrOnDemand",
+        "month",
+        "operatingSystem",
+        "playlist",
+        "province",
+        "sharingService",
+        "subscribedStatus",
+        "video",
+        "youtubeProduct",
+    )
+)
+_DECISIVE_FILTERS = frozenset(
+    ("liveOrOnDemand", "province", "subscribedStatus", "youtubeProduct")
+)
+
+_Shape = t.Tuple[t.FrozenSet[str], t.FrozenSet[str], bool, bool]
+_INSTANCES: dict[type[ReportType], ReportType] = {}
+_REPORT_TYPES: dict[_Shape, ReportType] = {}
+
+_ValidationKey = t.Tuple[
+    t.Tuple[str, ...],
+    t.Tuple[t.Tuple[str, str], ...],
+    t.Tuple[str, ...],
+    t.Tuple[str, ...],
+    int,
+]
+_ValidationResult = t.Union[t.Tuple[ReportType, t.List[str]], "_Failure"]
+_VALIDATION_CACHE_SIZE = 512
+_validated: OrderedDict[_ValidationKey, _ValidationResult] = OrderedDict()
+_validated_lock = threading.Lock()
+
+
+def _decide(
+    dimensions: frozenset[str],
+    filters: frozenset[str],
+    curated: bool,
+    view_percentage: bool,
+) -> type[ReportType]:
+    if "adType" in dimensions:
+        return rt.AdPerformance
+
+    if "sharingService" in dimensions:
+        return rt.EngagementAndContentSharing
+
+    if "elapsedVideoTimeRatio" in dimensions:
+        return rt.AudienceRetention
+
+    if "playlist" in dimensions:
+        return rt.TopPlaylists
+
+    if "insightPlaybackLocationType" in dimensions:
+        if curated:
+            return rt.PlaybackLocationPlaylist
+        return rt.PlaybackLocation
+
+    if "insightPlaybackLocationDetail" in dimensions:
+        if curated:
+            return rt.PlaybackLocationDetailPlaylist
+        return rt.PlaybackLocationDetail
+
+    if "insightTrafficSourceType" in dimensions:
+        if curated:
+            return rt.TrafficSourcePlaylist
+        return rt.TrafficSource
+
+    if "insightTrafficSourceDetail" in dimensions:
+        if curated:
+            return rt.TrafficSourceDetailPlaylist
+        return rt.TrafficSourceDetail
+
+    if "ageGroup" in dimensions or "gender" in dimensions:
+        if curated:
+            return rt.ViewerDemographicsPlaylist
+        return rt.ViewerDemographics
+
+    if "deviceType" in dimensions:
+        if "operatingSystem" in dimensions:
+            if curated:
+                return rt.DeviceTypeAndOperatingSystemPlaylist
+            return rt.DeviceTypeAndOperatingSystem
+        if curated:
+            return rt.DeviceTypePlaylist
+        return rt.DeviceType
+
+    if "operatingSystem" in dimensions:
+        if curated:
+            return rt.OperatingSystemPlaylist
+        return rt.OperatingSystem
+
+    if "video" in dimensions:
+        if "province" in filters:
+            return rt.TopVideosUS
+        if "subscribedStatus" not in filters:
+            return rt.TopVideosRegional
+        if "province" not in filters and "youtubeProduct" not in filters:
+            return rt.TopVideosSubscribed
+        if view_percentage:
+            return rt.TopVideosYouTubeProduct
+        return rt.TopVideosPlaybackDetail
+
+    if "country" in dimensions:
+        if "liveOrOnDemand" in dimensions or "liveOrOnDemand" in filters:
+            return rt.PlaybackDetailsLiveGeographyBased
+        if curated:
+            return rt.GeographyBasedActivityPlaylist
+        if (
+            "subscribedStatus" in dimensions
+            or "subscribedStatus" in filters
+            or "youtubeProduct" in dimensions
+            or "youtubeProduct" in filters
+        ):
+            return rt.PlaybackDetailsViewPercentageGeographyBased
+        return rt.GeographyBasedActivity
+
+    if "province" in dimensions:
+        if "liveOrOnDemand" in dimensions or "liveOrOnDemand" in filters:
+            return rt.PlaybackDetailsLiveGeographyBasedUS
+        if curated:
+            return rt.GeographyBasedActivityUSPlaylist
+        if (
+            "subscribedStatus" in dimensions
+            or "subscribedStatus" in filters
+            or "youtubeProduct" in dimensions
+            or "youtubeProduct" in filters
+        ):
+            return rt.PlaybackDetailsViewPercentageGeographyBasedUS
+        return rt.GeographyBasedActivityUS
+
+    if "youtubeProduct" in dimensions or "youtubeProduct" in filters:
+        if "liveOrOnDemand" in dimensions or "liveOrOnDemand" in filters:
+            return rt.PlaybackDetailsLiveTimeBased
+        return rt.PlaybackDetailsViewPercentageTimeBased
+
+    if "liveOrOnDemand" in dimensions or "liveOrOnDemand" in filters:
+        return rt.PlaybackDetailsLiveTimeBased
+
+    if "subscribedStatus" in dimensions:
+        if "province" in filters:
+            return rt.PlaybackDetailsSubscribedStatusUS
+        return rt.PlaybackDetailsSubscribedStatus
+
+    if "day" in dimensions or "month" in dimensions:
+        if curated:
+            return rt.TimeBasedActivityPlaylist
+        if "province" in filters:
+            return rt.TimeBasedActivityUS
+        return rt.TimeBasedActivity
+
+    if curated:
+        return rt.BasicUserActivityPlaylist
+    if "province" in filters:
+        return rt.BasicUserActivityUS
+    return rt.BasicUserActivity
+
+
+@dataclass()
+class _Failure:
+    __slots__ = ("exc",)
+
+    exc: InvalidRequest
+
+    def error(self) -> InvalidRequest:
+        # Cached failures are shared between threads, so each query gets
+        # its own copy of the exception rather than one whose traceback
+        # and context are shared.
+        exc = copy.copy(self.exc)
+        exc.__traceback__ = None
+        exc.__context__ = None
+        exc.__cause__ = None
+        return exc
+
 
 class Query:
     __slots__ = (
@@ -112,9 +338,42 @@ class Query:
             f"&includeHistoricalData={self.include_historical_data}"
         )
 
+    @property
+    def key(self) -> str:
+        # Filters are sorted as their order has no bearing on the data
+        # returned. The order of dimensions and metrics determines the
+        # order of the columns in the report, so is preserved.
+        filters = ";".join(f"{k}=={v}" for k, v in sorted(self.filters.items()))
+        return (
+            f"dimensions={','.join(self.dimensions)}"
+            f"&filters={filters}"
+            f"&metrics={','.join(self.metrics)}"
+            f"&sort={','.join(self.sort_options)}"
+            f"&maxResults={self.max_results}"
+            f"&startDate={self.start_date}"
+            f"&endDate={self.end_date}"
+            f"&currency={self.currency}"
+            f"&startIndex={self.start_index}"
+            f"&includeHistoricalData={self.include_historical_data}"
+        )
+
     def validate(self) -> None:
         _log.info("Validating request...")
+        self._check_parameters()
+        _log.info("Getting data between %s and %s", self.start_date, self.end_date)
+
+        fill_metrics = not self.metrics
+        self._apply_shape(self._resolve_shape(self._shape_key()))
+        assert self.rtype is not None
+        _log.info("Report type determined as %r", self.rtype.name)
+
+        if fill_metrics:
+            _log.debug("Metrics set to: %s", ", ".join(self.metrics))
+
+        # If it gets to this point, it's fine.
+        _log.info("Request OK!")
 
+    def _check_parameters(self) -> None:
         if self.max_results < 0:
             raise InvalidRequest(
                 "the max results should be non-negative (0 for unlimited results)"
@@ -140,153 +399,191 @@ class Query:
                 )
                 self._end_date = dt.date(self._end_date.year, self._end_date.month, 1)
 
-        _log.info(f"Getting data between {self.start_date} and {self.end_date}")
-
         if self.currency not in data.CURRENCIES:
             raise InvalidRequest("expected a valid ISO 4217 currency code")
 
         if self.start_index < 1:
             raise InvalidRequest("the start index should be positive")
 
-        self.set_report_type()
-        assert self.rtype is not None
-
-        if not self.metrics:
-            self.metrics = [
-                m for m in data.ALL_METRICS_ORDERED if m in self.rtype.metrics.values
-            ]
-            _log.debug("Metrics set to: " + ", ".join(self.metrics))
-
-        self.rtype.validate(
-            self.dimensions,
-            self.filters,
-            self.metrics,
-            self.sort_options,
+    def _shape_key(self) -> _ValidationKey:
+        # Everything not checked by `_check_parameters` depends only on
+        # this, so the outcome is shared by queries that differ only in
+        # their dates, currency, or start index.
+        return (
+            tuple(self.dimensions),
+            tuple(sorted(self.filters.items())),
+            tuple(self.metrics),
+            tuple(self.sort_options),
             self.max_results,
         )
 
-        # If it gets to this point, it's fine.
-        _log.info("Request OK!")
+    def _resolve_shape(self, key: _ValidationKey) -> _ValidationResult:
+        with _validated_lock:
+            result = _validated.get(key)
+            if result is not None:
+                _validated.move_to_end(key)
+                return result
 
-    def determine_report_type(self) -> ReportType:
-        curated = self.filters.get("isCurated", "0") == "1"
+        result = self._validate_shape()
 
-        if "adType" in self.dimensions:
-            return rt.AdPerformance()
+        with _validated_lock:
+            _validated[key] = result
+            while len(_validated) > _VALIDATION_CACHE_SIZE:
+                _validated.popitem(last=False)
 
-        if "sharingService" in self.dimensions:
-            return rt.EngagementAndContentSharing()
+        return result
 
-        if "elapsedVideoTimeRatio" in self.dimensions:
-            return rt.AudienceRetention()
+    def _apply_shape(self, result: _ValidationResult) -> None:
+        if isinstance(result, _Failure):
+            raise result.error()
 
-        if "playlist" in self.dimensions:
-            return rt.TopPlaylists()
+        self.rtype, metrics = result
+        if not self.metrics:
+            self.metrics = list(metrics)
+
+    def _validate_shape(self) -> _ValidationResult:
+        rtype = self.determine_report_type()
+        metrics = self.metrics or [
+            m for m in data.ALL_METRICS_ORDERED if m in rtype.metrics.values
+        ]
+
+        try:
+            rtype.validate(
+                self.dimensions,
+                self.filters,
+                metrics,
+                self.sort_options,
+                self.max_results,
+            )
+        except InvalidRequest as exc:
+            # The original is never raised, so there's no need to keep
+            # its frames alive.
+            return _Failure(exc.with_traceback(None))
 
-        if "insightPlaybackLocationType" in self.dimensions:
-            if curated:
-                return rt.PlaybackLocationPlaylist()
-            return rt.PlaybackLocation()
+        return rtype, list(metrics)
 
-        if "insightPlaybackLocationDetail" in self.dimensions:
-            if curated:
-                return rt.PlaybackLocationDetailPlaylist()
-            return rt.PlaybackLocationDetail()
+    def shard(self, by: str) -> list[Query]:
+        if by not in SHARD_UNITS:
+            raise InvalidRequest(
+                f"expected shard unit to be one of {', '.join(SHARD_UNITS)}, "
+                f"got {by!r}"
+            )
 
-        if "insightTrafficSourceType" in self.dimensions:
-            if curated:
-                return rt.TrafficSourcePlaylist()
-            return rt.TrafficSource()
+        # Rows are only guaranteed to be split cleanly between shards if
+        # every row is tied to a single point in time.
+        monthly = "month" in self.dimensions
+        if not monthly and "day" not in self.dimensions:
+            raise InvalidRequest(
+                "sharding requires either the 'day' or 'month' dimension"
+            )
 
-        if "insightTrafficSourceDetail" in self.dimensions:
-            if curated:
-                return rt.TrafficSourceDetailPlaylist()
-            return rt.TrafficSourceDetail()
+        if monthly and by != "month":
+            raise InvalidRequest(
+                "reports with the 'month' dimension can only be sharded by month"
+            )
 
-        if "ageGroup" in self.dimensions or "gender" in self.dimensions:
-            if curated:
-                return rt.ViewerDemographicsPlaylist()
-            return rt.ViewerDemographics()
-
-        if "deviceType" in self.dimensions:
-            if "operatingSystem" in self.dimensions:
-                if curated:
-                    return rt.DeviceTypeAndOperatingSystemPlaylist()
-                return rt.DeviceTypeAndOperatingSystem()
-            if curated:
-                return rt.DeviceTypePlaylist()
-            return rt.DeviceType()
+        if self.sort_options or self.max_results or self.start_index != 1:
+            raise InvalidRequest("sharded reports cannot be sorted, limited, or offset")
+
+        shards = []
+
+        for start, end in _date_windows(self._start_date, self._end_date, by, monthly):
+            query = Query(
+                self.dimensions,
+                self.filters,
+                self.metrics,
+                self.sort_options,
+                self.max_results,
+                start,
+                end,
+                self.currency,
+                self.start_index,
+                self._include_historical_data,
+            )
+            query.rtype = self.rtype
+            shards.append(query)
 
-        if "operatingSystem" in self.dimensions:
-            if curated:
-                return rt.OperatingSystemPlaylist()
-            return rt.OperatingSystem()
-
-        if "video" in self.dimensions:
-            if "province" in self.filters:
-                return rt.TopVideosUS()
-            if "subscribedStatus" not in self.filters:
-                return rt.TopVideosRegional()
-            if "province" not in self.filters and "youtubeProduct" not in self.filters:
-                return rt.TopVideosSubscribed()
-            if "averageViewPercentage" in self.metrics:
-                return rt.TopVideosYouTubeProduct()
-            return rt.TopVideosPlaybackDetail()
-
-        if "country" in self.dimensions:
-            if "liveOrOnDemand" in self.dimensions or "liveOrOnDemand" in self.filters:
-                return rt.PlaybackDetailsLiveGeographyBased()
-            if curated:
-                return rt.GeographyBasedActivityPlaylist()
-            if (
-                "subscribedStatus" in self.dimensions
-                or "subscribedStatus" in self.filters
-                or "youtubeProduct" in self.dimensions
-                or "youtubeProduct" in self.filters
-            ):
-                return rt.PlaybackDetailsViewPercentageGeographyBased()
-            return rt.GeographyBasedActivity()
-
-        if "province" in self.dimensions:
-            if "liveOrOnDemand" in self.dimensions or "liveOrOnDemand" in self.filters:
-                return rt.PlaybackDetailsLiveGeographyBasedUS()
-            if curated:
-                return rt.GeographyBasedActivityUSPlaylist()
-            if (
-                "subscribedStatus" in self.dimensions
-                or "subscribedStatus" in self.filters
-                or "youtubeProduct" in self.dimensions
-                or "youtubeProduct" in self.filters
-            ):
-                return rt.PlaybackDetailsViewPercentageGeographyBasedUS()
-            return rt.GeographyBasedActivityUS()
-
-        if "youtubeProduct" in self.dimensions or "youtubeProduct" in self.filters:
-            if "liveOrOnDemand" in self.dimensions or "liveOrOnDemand" in self.filters:
-                return rt.PlaybackDetailsLiveTimeBased()
-            return rt.PlaybackDetailsViewPercentageTimeBased()
-
-        if "liveOrOnDemand" in self.dimensions or "liveOrOnDemand" in self.filters:
-            return rt.PlaybackDetailsLiveTimeBased()
-
-        if "subscribedStatus" in self.dimensions:
-            if "province" in self.filters:
-                return rt.PlaybackDetailsSubscribedStatusUS()
-            return rt.PlaybackDetailsSubscribedStatus()
-
-        if "day" in self.dimensions or "month" in self.dimensions:
-            if curated:
-                return rt.TimeBasedActivityPlaylist()
-            if "province" in self.filters:
-                return rt.TimeBasedActivityUS()
-            return rt.TimeBasedActivity()
+        _log.info("Split request into %d shard(s) by %s", len(shards), by)
+        return shards
 
-        if curated:
-            return rt.BasicUserActivityPlaylist()
-        if "province" in self.filters:
-            return rt.BasicUserActivityUS()
-        return rt.BasicUserActivity()
+    def determine_report_type(self) -> ReportType:
+        # Only a handful of names decide the report type, so queries are
+        # reduced to those before the index is consulted.
+        shape = (
+            _DECISIVE_DIMENSIONS.intersection(self.dimensions),
+            _DECISIVE_FILTERS.intersection(self.filters),
+            self.filters.get("isCurated", "0") == "1",
+            "averageViewPercentage" in self.metrics,
+        )
+
+        try:
+            return _REPORT_TYPES[shape]
+        except KeyError:
+            cls = _decide(*shape)
+
+            if cls not in _INSTANCES:
+                _INSTANCES[cls] = cls()  # type: ignore
+
+            rtype = _REPORT_TYPES[shape] = _INSTANCES[cls]
+            return rtype
 
     def set_report_type(self) -> None:
         self.rtype = self.determine_report_type()
-        _log.info(f"Report type determined as {self.rtype.name!r}")
+        _log.info("Report type determined as %r", self.rtype.name)
+
+
+def validate_many(specs: t.Iterable[QuerySpecT]) -> list[Query | Exception]:
+    """Validate many queries at once.
+
+    Queries are grouped by shape -- their dimensions, filters, metrics,
+    sort options, and max results -- and each unique shape is only
+    validated once. Dates, currency, and start index are still checked
+    for every query. This is what :meth:`Analytics.retrieve_many
+    <analytix.analytics.Analytics.retrieve_many>` and friends use to
+    validate their queries, but it can also be used on its own to check
+    a large set of queries before retrieving any of them.
+
+    Args:
+        specs:
+            The queries to validate. Each query should be a mapping of
+            the keyword arguments you would otherwise pass to
+            :meth:`Analytics.retrieve
+            <analytix.analytics.Analytics.retrieve>` to define the
+            report.
+
+    Returns:
+        A list of results in the same order as the given queries. Each
+        result is either the validated query, or the exception that was
+        raised while validating it.
+
+    .. versionadded:: 3.6.0
+    """
+
+    results: list[Query | Exception] = []
+    shapes: dict[_ValidationKey, _ValidationResult] = {}
+    failed = 0
+
+    for spec in specs:
+        try:
+            query = Query(**spec)
+            query._check_parameters()
+
+            key = query._shape_key()
+            result = shapes.get(key)
+            if result is None:
+                result = shapes[key] = query._resolve_shape(key)
+
+            query._apply_shape(result)
+        except (TypeError, InvalidRequest) as exc:
+            results.append(exc)
+            failed += 1
+        else:
+            results.append(query)
+
+    _log.info(
+        "Validated %d query(ies) across %d shape(s) (%d invalid)",
+        len(results),
+        len(shapes),
+        failed,
+    )
+    return results
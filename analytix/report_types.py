@@ -47,6 +47,8 @@ from analytix.features import (
 
 
 class BasicUserActivity(ReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "Basic user activity"
         self.dimensions = Dimensions()
@@ -59,6 +61,8 @@ class BasicUserActivity(ReportType):
 
 
 class BasicUserActivityUS(ReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "Basic user activity (US)"
         self.dimensions = Dimensions()
@@ -71,6 +75,8 @@ class BasicUserActivityUS(ReportType):
 
 
 class TimeBasedActivity(ReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "Time-based activity"
         self.dimensions = Dimensions(ExactlyOne("day", "month"))
@@ -83,6 +89,8 @@ class TimeBasedActivity(ReportType):
 
 
 class TimeBasedActivityUS(ReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "Time-based activity (US)"
         self.dimensions = Dimensions(ExactlyOne("day", "month"))
@@ -95,6 +103,8 @@ class TimeBasedActivityUS(ReportType):
 
 
 class GeographyBasedActivity(ReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "Geography-based activity"
         self.dimensions = Dimensions(Required("country"))
@@ -107,6 +117,8 @@ class GeographyBasedActivity(ReportType):
 
 
 class GeographyBasedActivityUS(ReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "Geography-based activity (US)"
         self.dimensions = Dimensions(Required("province"))
@@ -119,6 +131,8 @@ class GeographyBasedActivityUS(ReportType):
 
 
 class PlaybackDetailsSubscribedStatus(ReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "User activity by subscribed status"
         self.dimensions = Dimensions(
@@ -134,6 +148,8 @@ class PlaybackDetailsSubscribedStatus(ReportType):
 
 
 class PlaybackDetailsSubscribedStatusUS(ReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "User activity by subscribed status (US)"
         self.dimensions = Dimensions(
@@ -148,6 +164,8 @@ class PlaybackDetailsSubscribedStatusUS(ReportType):
 
 
 class PlaybackDetailsLiveTimeBased(ReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "Time-based playback details (live)"
         self.dimensions = Dimensions(
@@ -164,6 +182,8 @@ class PlaybackDetailsLiveTimeBased(ReportType):
 
 
 class PlaybackDetailsViewPercentageTimeBased(ReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "Time-based playback details (view percentage)"
         self.dimensions = Dimensions(
@@ -180,6 +200,8 @@ class PlaybackDetailsViewPercentageTimeBased(ReportType):
 
 
 class PlaybackDetailsLiveGeographyBased(ReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "Geography-based playback details (live)"
         self.dimensions = Dimensions(
@@ -196,6 +218,8 @@ class PlaybackDetailsLiveGeographyBased(ReportType):
 
 
 class PlaybackDetailsViewPercentageGeographyBased(ReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "Geography-based playback details (view percentage)"
         self.dimensions = Dimensions(
@@ -212,6 +236,8 @@ class PlaybackDetailsViewPercentageGeographyBased(ReportType):
 
 
 class PlaybackDetailsLiveGeographyBasedUS(ReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "Geography-based playback details (live, US)"
         self.dimensions = Dimensions(
@@ -228,6 +254,8 @@ class PlaybackDetailsLiveGeographyBasedUS(ReportType):
 
 
 class PlaybackDetailsViewPercentageGeographyBasedUS(ReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "Geography-based playback details (view percentage, US)"
         self.dimensions = Dimensions(
@@ -244,6 +272,8 @@ class PlaybackDetailsViewPercentageGeographyBasedUS(ReportType):
 
 
 class PlaybackLocation(ReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "Playback locations"
         self.dimensions = Dimensions(
@@ -260,6 +290,8 @@ class PlaybackLocation(ReportType):
 
 
 class PlaybackLocationDetail(DetailedReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "Playback locations (detailed)"
         self.dimensions = Dimensions(
@@ -279,6 +311,8 @@ class PlaybackLocationDetail(DetailedReportType):
 
 
 class TrafficSource(ReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "Traffic sources"
         self.dimensions = Dimensions(
@@ -295,6 +329,8 @@ class TrafficSource(ReportType):
 
 
 class TrafficSourceDetail(DetailedReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "Traffic sources (detailed)"
         self.dimensions = Dimensions(
@@ -328,6 +364,8 @@ class TrafficSourceDetail(DetailedReportType):
 
 
 class DeviceType(ReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "Device types"
         self.dimensions = Dimensions(
@@ -349,6 +387,8 @@ class DeviceType(ReportType):
 
 
 class OperatingSystem(ReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "Operating systems"
         self.dimensions = Dimensions(
@@ -370,6 +410,8 @@ class OperatingSystem(ReportType):
 
 
 class DeviceTypeAndOperatingSystem(ReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "Device types and operating systems"
         self.dimensions = Dimensions(
@@ -386,6 +428,8 @@ class DeviceTypeAndOperatingSystem(ReportType):
 
 
 class ViewerDemographics(ReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "Viewer demographics"
         self.dimensions = Dimensions(
@@ -402,6 +446,8 @@ class ViewerDemographics(ReportType):
 
 
 class EngagementAndContentSharing(ReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "Engagement and content sharing"
         self.dimensions = Dimensions(
@@ -418,6 +464,8 @@ class EngagementAndContentSharing(ReportType):
 
 
 class AudienceRetention(ReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "Audience retention"
         self.dimensions = Dimensions(Required("elapsedVideoTimeRatio"))
@@ -443,6 +491,8 @@ class AudienceRetention(ReportType):
 
 
 class TopVideosRegional(DetailedReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "Top videos by region"
         self.dimensions = Dimensions(Required("video"))
@@ -455,6 +505,8 @@ class TopVideosRegional(DetailedReportType):
 
 
 class TopVideosUS(DetailedReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "Top videos by state"
         self.dimensions = Dimensions(Required("video"))
@@ -467,6 +519,8 @@ class TopVideosUS(DetailedReportType):
 
 
 class TopVideosSubscribed(DetailedReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "Top videos by subscription status"
         self.dimensions = Dimensions(Required("video"))
@@ -482,6 +536,8 @@ class TopVideosSubscribed(DetailedReportType):
 
 
 class TopVideosYouTubeProduct(DetailedReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "Top videos by YouTube product"
         self.dimensions = Dimensions(Required("video"))
@@ -497,6 +553,8 @@ class TopVideosYouTubeProduct(DetailedReportType):
 
 
 class TopVideosPlaybackDetail(DetailedReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "Top videos by playback detail"
         self.dimensions = Dimensions(Required("video"))
@@ -512,6 +570,8 @@ class TopVideosPlaybackDetail(DetailedReportType):
 
 
 class BasicUserActivityPlaylist(ReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "Basic user activity for playlists"
         self.dimensions = Dimensions()
@@ -526,6 +586,8 @@ class BasicUserActivityPlaylist(ReportType):
 
 
 class TimeBasedActivityPlaylist(ReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "Time-based activity for playlists"
         self.dimensions = Dimensions(
@@ -543,6 +605,8 @@ class TimeBasedActivityPlaylist(ReportType):
 
 
 class GeographyBasedActivityPlaylist(ReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "Geography-based activity for playlists"
         self.dimensions = Dimensions(
@@ -560,6 +624,8 @@ class GeographyBasedActivityPlaylist(ReportType):
 
 
 class GeographyBasedActivityUSPlaylist(ReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "Geography-based activity for playlists (US)"
         self.dimensions = Dimensions(
@@ -576,6 +642,8 @@ class GeographyBasedActivityUSPlaylist(ReportType):
 
 
 class PlaybackLocationPlaylist(ReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "Playback locations for playlists"
         self.dimensions = Dimensions(
@@ -593,6 +661,8 @@ class PlaybackLocationPlaylist(ReportType):
 
 
 class PlaybackLocationDetailPlaylist(DetailedReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "Playback locations for playlists (detailed)"
         self.dimensions = Dimensions(
@@ -612,6 +682,8 @@ class PlaybackLocationDetailPlaylist(DetailedReportType):
 
 
 class TrafficSourcePlaylist(ReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "Traffic sources for playlists"
         self.dimensions = Dimensions(
@@ -629,6 +701,8 @@ class TrafficSourcePlaylist(ReportType):
 
 
 class TrafficSourceDetailPlaylist(DetailedReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "Traffic sources for playlists (detailed)"
         self.dimensions = Dimensions(
@@ -662,6 +736,8 @@ class TrafficSourceDetailPlaylist(DetailedReportType):
 
 
 class DeviceTypePlaylist(ReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "Device types for playlists"
         self.dimensions = Dimensions(
@@ -679,6 +755,8 @@ class DeviceTypePlaylist(ReportType):
 
 
 class OperatingSystemPlaylist(ReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "Operating systems for playlists"
         self.dimensions = Dimensions(
@@ -696,6 +774,8 @@ class OperatingSystemPlaylist(ReportType):
 
 
 class DeviceTypeAndOperatingSystemPlaylist(ReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "Device types and operating systems for playlists"
         self.dimensions = Dimensions(
@@ -713,6 +793,8 @@ class DeviceTypeAndOperatingSystemPlaylist(ReportType):
 
 
 class ViewerDemographicsPlaylist(ReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "Viewer demographics for playlists"
         self.dimensions = Dimensions(
@@ -730,6 +812,8 @@ class ViewerDemographicsPlaylist(ReportType):
 
 
 class TopPlaylists(DetailedReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "Top playlists"
         self.dimensions = Dimensions(Required("playlist"))
@@ -744,6 +828,8 @@ class TopPlaylists(DetailedReportType):
 
 
 class AdPerformance(ReportType):
+    __slots__ = ()
+
     def __init__(self) -> None:
         self.name = "Ad performance"
         self.dimensions = Dimensions(Required("adType"), Optional("day"))
@@ -29,7 +29,6 @@
 from __future__ import annotations
 
 import datetime as dt
-import json
 import logging
 import typing as t
 from dataclasses import dataclass
@@ -39,7 +38,7 @@ from pathlib import Path
 import aiofiles
 
 import analytix
-from analytix import errors
+from analytix import codecs, errors
 from analytix.abc import DynamicReportWriter
 from analytix.types import ReportRowT
 
@@ -59,19 +58,19 @@ class JSONReportWriter(DynamicReportWriter):
         if not self._path.endswith(".json"):
             self._path += ".json"
 
-        with open(self._path, "w") as f:
-            json.dump(self._data, f, indent=self._indent)
+        with open(self._path, "wb") as f:
+            f.write(codecs.dumps(self._data, indent=self._indent))
 
-        return _log.info(f"Saved report as JSON to {Path(self._path).resolve()}")
+        return _log.info("Saved report as JSON to %s", Path(self._path).resolve())
 
     async def _run_async(self) -> None:
         if not self._path.endswith(".json"):
             self._path += ".json"
 
-        async with aiofiles.open(self._path, "w") as f:
-            await f.write(json.dumps(self._data, indent=self._indent))
+        async with aiofiles.open(self._path, "wb") as f:
+            await f.write(codecs.dumps(self._data, indent=self._indent))
 
-        return _log.info(f"Saved report as JSON to {Path(self._path).resolve()}")
+        return _log.info("Saved report as JSON to %s", Path(self._path).resolve())
 
 
 class CSVReportWriter(DynamicReportWriter):
@@ -89,7 +88,7 @@ class CSVReportWriter(DynamicReportWriter):
                 line = self._delimiter.join(f"{v}" for v in row)
                 f.write(f"{line}\n")
 
-        return _log.info(f"Saved report as CSV to {Path(self._path).resolve()}")
+        return _log.info("Saved report as CSV to %s", Path(self._path).resolve())
 
     async def _run_async(self) -> None:
         extension = ".tsv" if self._delimiter == "\t" else ".csv"
@@ -103,7 +102,7 @@ class CSVReportWriter(DynamicReportWriter):
                 line = self._delimiter.join(f"{v}" for v in row)
                 await f.write(f"{line}\n")
 
-        return _log.info(f"Saved report as CSV to {Path(self._path).resolve()}")
+        return _log.info("Saved report as CSV to %s", Path(self._path).resolve())
 
 
 class ColumnType(Enum):
@@ -194,6 +193,41 @@ class Report:
         ]
         self._shape = (len(data["rows"]), len(self._column_headers))
 
+    @classmethod
+    def concat(cls, reports: t.Iterable[Report]) -> Report:
+        """Concatenate the rows of multiple reports into a single
+        report. All reports must have identical column headers.
+
+        Args:
+            reports:
+                The reports to concatenate, in the order their rows
+                should appear.
+
+        Returns:
+            The concatenated report. This uses the report type of the
+            first report.
+
+        .. versionadded:: 3.6.0
+        """
+
+        reports = list(reports)
+        if not reports:
+            raise errors.ConcatenationError("expected at least 1 report, got 0")
+
+        first = reports[0]
+        headers = first.data["columnHeaders"]
+        rows: ReportRowT = []
+
+        for report in reports:
+            if report.data["columnHeaders"] != headers:
+                raise errors.ConcatenationError(
+                    "cannot concatenate reports with different column headers"
+                )
+
+            rows.extend(report.data["rows"])
+
+        return cls({**first.data, "rows": rows}, first.type)
+
     @property
     def shape(self) -> tuple[int, int]:
         """The shape of the report in the format ``(rows, columns)``."""
@@ -241,7 +275,7 @@ class Report:
         .. versionadded:: 3.3.0
         """
 
-        return self.type.metrics.values
+        return set(self.type.metrics.values)
 
     @property
     def ordered_dimensions(self) -> list[str]:
@@ -301,7 +335,7 @@ class Report:
             for col in ("day", "month"):
                 if col in df.columns:
                     df[col] = pd.to_datetime(df[col], format="%Y-%m-%d")
-                    _log.info(f"Converted {col!r} column to datetime64[ns] format")
+                    _log.info("Converted %r column to datetime64[ns] format", col)
                     break
 
         return df
@@ -338,7 +372,7 @@ class Report:
         table = pa.Table.from_arrays(data, names=self.columns)
         return table
 
-    def to_json(self, path: str, *, indent: int = 4) -> JSONReportWriter:
+    def to_json(self, path: str, *, indent: int | None = 4) -> JSONReportWriter:
         """Write the report data to a JSON file.
 
         .. note::
@@ -351,7 +385,12 @@ class Report:
         Keyword Args:
             indent:
                 The amount of indentation the data should be written
-                with. Defaults to ``4``.
+                with. Defaults to ``4``. If this is ``None``, the data
+                is written as compactly as possible, which is much
+                faster for large reports.
+
+                .. versionchanged:: 3.6.0
+                    This can now be ``None``.
 
         Returns:
             The report writer. This is done to allow this method to run
@@ -360,7 +399,7 @@ class Report:
 
         return JSONReportWriter(path, data=self.data, indent=indent)
 
-    async def ato_json(self, path: str, *, indent: int = 4) -> None:
+    async def ato_json(self, path: str, *, indent: int | None = 4) -> None:
         _log.warning(
             "The `report.ato_json` method is deprecated -- "
             "use `await report.to_json` instead"
@@ -432,7 +471,7 @@ class Report:
             ws.append(row)
 
         wb.save(path)
-        _log.info(f"Saved report as spreadsheet to {Path(path).resolve()}")
+        _log.info("Saved report as spreadsheet to %s", Path(path).resolve())
 
     def to_feather(self, path: str) -> None:
         """Write the report data to an Apache Feather file.
@@ -453,7 +492,7 @@ class Report:
             path += ".feather"
 
         pf.write_feather(self.to_arrow_table(), path)
-        _log.info(f"Saved report as Apache Feather file to {Path(path).resolve()}")
+        _log.info("Saved report as Apache Feather file to %s", Path(path).resolve())
 
     def to_parquet(self, path: str) -> None:
         """Write the report data to an Apache Parquet file.
@@ -474,4 +513,4 @@ class Report:
             path += ".parquet"
 
         pq.write_table(self.to_arrow_table(), path)
-        _log.info(f"Saved report as Apache Parquet file to {Path(path).resolve()}")
+        _log.info("Saved report as Apache Parquet file to %s", Path(path).resolve())
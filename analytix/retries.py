@@ -0,0 +1,403 @@
+# Copyright (c) 2021-present, Ethan Henderson
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import email.utils
+import logging
+import random
+import time
+import typing as t
+from dataclasses import dataclass
+
+import httpx
+
+from analytix import codecs
+
+_log = logging.getLogger(__name__)
+
+RETRY_STATUSES = frozenset((408, 429, 500, 502, 503, 504))
+RETRY_REASONS = frozenset(
+    ("rateLimitExceeded", "userRateLimitExceeded", "backendError", "internalError")
+)
+
+
+@dataclass()
+class Attempt:
+    """A dataclass representing a single attempt at a request.
+
+    Args:
+        number:
+            The attempt number, starting at 1.
+        elapsed:
+            The number of seconds the attempt took.
+        status_code:
+            The status code of the response, or ``None`` if no response
+            was received.
+        error:
+            The transport error raised by the attempt, if any.
+        delay:
+            The number of seconds that will be waited before the next
+            attempt. This is ``None`` if no further attempts will be
+            made.
+
+    .. versionadded:: 3.6.0
+    """
+
+    __slots__ = ("number", "elapsed", "status_code", "error", "delay")
+
+    number: int
+    elapsed: float
+    status_code: int | None
+    error: Exception | None
+    delay: float | None
+
+    @property
+    def will_retry(self) -> bool:
+        """Whether another attempt will be made."""
+
+        return self.delay is not None
+
+
+class RetryPolicy:
+    """A class representing how failed requests should be retried.
+
+    Requests are retried if they fail with a transport error, or if the
+    response indicates a transient problem, such as a rate limit or a
+    server error. Client errors (such as invalid requests) are never
+    retried.
+
+    The time to wait between attempts grows exponentially with "full
+    jitter", meaning a random amount of time between zero and the
+    current backoff is used. If the response includes a
+    ``Retry-After`` header, that is honoured instead, unless waiting
+    that long would exceed the time limit, in which case the request is
+    not retried.
+
+    Keyword Args:
+        max_attempts:
+            The maximum number of attempts to make, including the first.
+            Defaults to ``5``. Setting this to ``1`` disables retries.
+        base_delay:
+            The backoff before the second attempt in seconds. This
+            doubles with every attempt. Defaults to ``0.5``.
+        max_delay:
+            The maximum backoff between attempts in seconds. Defaults
+            to ``30``. This does not apply to waits requested by the
+            API through the ``Retry-After`` header.
+        max_time:
+            The maximum number of seconds to spend on a request,
+            including all attempts and waits. No attempt will be made if
+            the wait before it would exceed this. Defaults to ``120``.
+        retry_statuses:
+            The status codes which should be retried. Defaults to 408,
+            429, 500, 502, 503, and 504.
+        on_attempt:
+            A function to call with an :obj:`Attempt` after every
+            attempt. This can be used to record timings. Defaults to
+            ``None``.
+
+    Attributes:
+        max_attempts:
+            The maximum number of attempts to make.
+        base_delay:
+            The backoff before the second attempt in seconds.
+        max_delay:
+            The maximum backoff between attempts in seconds.
+        max_time:
+            The maximum number of seconds to spend on a request.
+        retry_statuses:
+            The status codes which should be retried.
+        on_attempt:
+            The function called after every attempt, if any.
+
+    .. versionadded:: 3.6.0
+    """
+
+    __slots__ = (
+        "max_attempts",
+        "base_delay",
+        "max_delay",
+        "max_time",
+        "retry_statuses",
+        "on_attempt",
+    )
+
+    def __init__(
+        self,
+        *,
+        max_attempts: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        max_time: float = 120.0,
+        retry_statuses: t.Collection[int] = RETRY_STATUSES,
+        on_attempt: t.Callable[[Attempt], None] | None = None,
+    ) -> None:
+        if max_attempts < 1:
+            raise ValueError(f"expected at least 1 attempt, got {max_attempts}")
+
+        if 400 in retry_statuses:
+            raise ValueError("requests with status code 400 cannot be retried")
+
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_time = max_time
+        self.retry_statuses = frozenset(retry_statuses)
+        self.on_attempt = on_attempt
+
+    def __repr__(self) -> str:
+        return (
+            f"RetryPolicy(max_attempts={self.max_attempts}, "
+            f"base_delay={self.base_delay}, max_delay={self.max_delay}, "
+            f"max_time={self.max_time})"
+        )
+
+    def is_retryable(self, resp: httpx.Response) -> bool:
+        """Whether a response indicates the request should be retried.
+
+        Args:
+            resp:
+                The response to check.
+
+        Returns:
+            Whether the request should be retried.
+        """
+
+        if resp.status_code in self.retry_statuses:
+            return True
+
+        if resp.status_code != 403:
+            return False
+
+        # Rate limits are sometimes reported as forbidden, so the reason
+        # needs to be checked to tell them apart from permission errors.
+        try:
+            errors = codecs.loads(resp.content)["error"].get("errors", [])
+            return any(e.get("reason") in RETRY_REASONS for e in errors)
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return False
+
+    def backoff(self, attempt: int) -> float:
+        """Calculate a randomised backoff to wait after a given attempt.
+
+        Args:
+            attempt:
+                The number of the attempt that failed, starting at 1.
+
+        Returns:
+            The number of seconds to wait.
+        """
+
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)  # nosec B311
+
+    def _retry_after(self, resp: httpx.Response) -> float | None:
+        value = resp.headers.get("Retry-After")
+        if value is None:
+            return None
+
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+
+        try:
+            when: dt.datetime = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            _log.debug(f"Ignoring invalid Retry-After header: {value!r}")
+            return None
+
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=dt.timezone.utc)
+
+        return max(0.0, (when - dt.datetime.now(dt.timezone.utc)).total_seconds())
+
+    def _next_delay(
+        self,
+        number: int,
+        started: float,
+        resp: httpx.Response | None,
+        error: Exception | None,
+    ) -> float | None:
+        if number >= self.max_attempts:
+            return None
+
+        if resp is not None:
+            if not self.is_retryable(resp):
+                return None
+
+            # A wait the server asks for is never shortened, as
+            # retrying early would only fail again. It's still bounded
+            # by the time limit below, though.
+            delay = self._retry_after(resp)
+            if delay is None:
+                delay = self.backoff(number)
+        elif isinstance(error, httpx.TransportError):
+            delay = self.backoff(number)
+        else:
+            return None
+
+        if time.monotonic() - started + delay > self.max_time:
+            _log.debug("Not retrying as the time limit would be exceeded")
+            return None
+
+        return delay
+
+    def _record(
+        self,
+        number: int,
+        elapsed: float,
+        resp: httpx.Response | None,
+        error: Exception | None,
+        delay: float | None,
+        on_retry: t.Callable[[Attempt], None] | None,
+    ) -> None:
+        status = resp.status_code if resp is not None else None
+        attempt = Attempt(number, elapsed, status, error, delay)
+
+        if delay is not None:
+            _log.info(
+                f"Attempt {number} failed ({status or error!r}); "
+                f"retrying in {delay:.2f} seconds"
+            )
+
+            if on_retry:
+                on_retry(attempt)
+
+        if self.on_attempt:
+            self.on_attempt(attempt)
+
+    def send(
+        self,
+        request: t.Callable[[], httpx.Response],
+        *,
+        on_retry: t.Callable[[Attempt], None] | None = None,
+    ) -> httpx.Response:
+        """Make a request, retrying it according to this policy.
+
+        Args:
+            request:
+                A function which makes the request and returns its
+                response.
+
+        Keyword Args:
+            on_retry:
+                A function called with each attempt that is going to be
+                retried, before waiting. Defaults to ``None``.
+
+        Returns:
+            The response of the last attempt.
+
+        Raises:
+            httpx.TransportError:
+                The last attempt failed with a transport error.
+        """
+
+        started = time.monotonic()
+
+        for number in range(1, self.max_attempts + 1):
+            resp: httpx.Response | None = None
+            error: Exception | None = None
+            attempt_started = time.perf_counter()
+
+            try:
+                resp = request()
+            except httpx.TransportError as exc:
+                error = exc
+
+            elapsed = time.perf_counter() - attempt_started
+            delay = self._next_delay(number, started, resp, error)
+            self._record(number, elapsed, resp, error, delay, on_retry)
+
+            if delay is None:
+                break
+
+            time.sleep(delay)
+
+        if error is not None:
+            raise error
+
+        assert resp is not None
+        return resp
+
+    async def asend(
+        self,
+        request: t.Callable[[], t.Awaitable[httpx.Response]],
+        *,
+        on_retry: t.Callable[[Attempt], None] | None = None,
+    ) -> httpx.Response:
+        """Asynchronously make a request, retrying it according to this
+        policy.
+
+        Args:
+            request:
+                A function which returns an awaitable that makes the
+                request and returns its response.
+
+        Keyword Args:
+            on_retry:
+                A function called with each attempt that is going to be
+                retried, before waiting. Defaults to ``None``.
+
+        Returns:
+            The response of the last attempt.
+
+        Raises:
+            httpx.TransportError:
+                The last attempt failed with a transport error.
+        """
+
+        started = time.monotonic()
+
+        for number in range(1, self.max_attempts + 1):
+            resp: httpx.Response | None = None
+            error: Exception | None = None
+            attempt_started = time.perf_counter()
+
+            try:
+                resp = await request()
+            except httpx.TransportError as exc:
+                error = exc
+
+            elapsed = time.perf_counter() - attempt_started
+            delay = self._next_delay(number, started, resp, error)
+            self._record(number, elapsed, resp, error, delay, on_retry)
+
+            if delay is None:
+                break
+
+            await asyncio.sleep(delay)
+
+        if error is not None:
+            raise error
+
+        assert resp is not None
+        return resp
@@ -28,7 +28,6 @@
 
 from __future__ import annotations
 
-import json
 import logging
 import pathlib
 import typing as t
@@ -36,6 +35,7 @@ from dataclasses import dataclass
 
 import aiofiles
 
+from analytix import codecs
 from analytix.types import SecretT
 
 _log = logging.getLogger(__name__)
@@ -100,8 +100,8 @@ class Secrets:
 
         _log.debug(f"Loading secrets from {path.resolve()}...")
 
-        with open(path) as f:
-            data = json.load(f)["installed"]
+        with open(path, "rb") as f:
+            data = codecs.loads(f.read())["installed"]
 
         _log.info("Secrets loaded!")
         return cls(**data)
@@ -124,8 +124,8 @@ class Secrets:
 
         _log.debug(f"Loading secrets from {path.resolve()}...")
 
-        async with aiofiles.open(path) as f:
-            data = json.loads(await f.read())["installed"]
+        async with aiofiles.open(path, "rb") as f:
+            data = codecs.loads(await f.read())["installed"]
 
         _log.info("Secrets loaded!")
         return cls(**data)
@@ -0,0 +1,444 @@
+# Copyright (c) 2021-present, Ethan Henderson
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from __future__ import annotations
+
+import json
+import logging
+import typing as t
+from collections import deque
+from pathlib import Path
+
+import aiofiles
+
+from analytix import errors
+from analytix.reports import ColumnHeader
+
+if t.TYPE_CHECKING:
+    from analytix.abc import ReportType
+    from analytix.types import RowT
+
+_log = logging.getLogger(__name__)
+
+_WHITESPACE = " \t\n\r"
+
+# Parser states.
+_START = 0
+_KEY = 1
+_COLON = 2
+_VALUE = 3
+_NEXT_KEY = 4
+_ROWS = 5
+_ROW = 6
+_NEXT_ROW = 7
+_DONE = 8
+
+# The consumed part of the buffer is only discarded once it grows this
+# big, so rows aren't copied every time one is parsed.
+_COMPACT_AT = 1024**2
+
+
+class RowParser:
+    """An incremental parser for the JSON bodies of report responses.
+
+    Text is fed to the parser as it arrives, and rows are made
+    available as soon as each one has been parsed in full. Everything
+    other than the rows, such as the column headers, is stored in
+    :attr:`data`.
+
+    Attributes:
+        data:
+            Everything in the response body other than the rows.
+        rows:
+            The rows which have been parsed but not yet consumed.
+
+    .. versionadded:: 3.6.0
+    """
+
+    __slots__ = (
+        "data",
+        "rows",
+        "_decoder",
+        "_buf",
+        "_pos",
+        "_state",
+        "_key",
+        "_closed",
+    )
+
+    def __init__(self) -> None:
+        self.data: dict[str, t.Any] = {}
+        self.rows: deque[RowT] = deque()
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._state = _START
+        self._key = ""
+        self._closed = False
+
+    @property
+    def done(self) -> bool:
+        """Whether the whole body has been parsed."""
+
+        return self._state == _DONE
+
+    @property
+    def has_headers(self) -> bool:
+        """Whether the column headers have been parsed."""
+
+        return "columnHeaders" in self.data
+
+    def feed(self, text: str) -> None:
+        """Feed the next chunk of the body to the parser.
+
+        Args:
+            text:
+                The chunk of text.
+
+        Raises:
+            APIError:
+                The body contains an error instead of a report.
+        """
+
+        if self._pos >= _COMPACT_AT:
+            self._buf = self._buf[self._pos :]
+            self._pos = 0
+
+        self._buf += text
+        self._parse()
+
+    def close(self) -> None:
+        """Tell the parser there is no more of the body to come.
+
+        Raises:
+            json.JSONDecodeError:
+                The body is not valid JSON, or ended unexpectedly.
+            APIError:
+                The body contains an error instead of a report.
+        """
+
+        self._closed = True
+        self._parse()
+
+        if self._state != _DONE:
+            raise json.JSONDecodeError("Unexpected end of data", self._buf, self._pos)
+
+    def _skip_whitespace(self) -> bool:
+        buf, pos = self._buf, self._pos
+
+        while pos < len(buf) and buf[pos] in _WHITESPACE:
+            pos += 1
+
+        self._pos = pos
+        return pos < len(buf)
+
+    def _expect(self, *chars: str) -> str:
+        char = self._buf[self._pos]
+        if char not in chars:
+            expected = " or ".join(repr(c) for c in chars)
+            raise json.JSONDecodeError(f"Expecting {expected}", self._buf, self._pos)
+
+        self._pos += 1
+        return char
+
+    def _decode(self) -> tuple[bool, t.Any]:
+        try:
+            value, end = self._decoder.raw_decode(self._buf, self._pos)
+        except json.JSONDecodeError:
+            if self._closed:
+                raise
+            return False, None
+
+        if end == len(self._buf) and not self._closed:
+            # A number at the end of the buffer might continue in the
+            # next chunk, so wait for more to be sure.
+            return False, None
+
+        self._pos = end
+        return True, value
+
+    def _parse(self) -> None:
+        while self._state != _DONE and self._skip_whitespace():
+            state = self._state
+
+            if state == _START:
+                self._expect("{")
+                self._state = _KEY
+
+            elif state == _KEY:
+                if self._buf[self._pos] == "}" and not self.data:
+                    self._pos += 1
+                    self._state = _DONE
+                    continue
+
+                ok, key = self._decode()
+                if not ok:
+                    return
+                if not isinstance(key, str):
+                    raise json.JSONDecodeError("Expecting key", self._buf, self._pos)
+
+                self._key = key
+                self._state = _COLON
+
+            elif state == _COLON:
+                self._expect(":")
+                self._state = _ROWS if self._key == "rows" else _VALUE
+
+            elif state == _VALUE:
+                ok, value = self._decode()
+                if not ok:
+                    return
+
+                if self._key == "error":
+                    raise errors.APIError(value["code"], value["message"])
+
+                self.data[self._key] = value
+                self._state = _NEXT_KEY
+
+            elif state == _NEXT_KEY:
+                self._state = _KEY if self._expect(",", "}") == "," else _DONE
+
+            elif state == _ROWS:
+                self._expect("[")
+                self._state = _ROW
+
+                # Handle empty row arrays here so the row state doesn't
+                # need to know whether it's on the first row.
+                if self._skip_whitespace() and self._buf[self._pos] == "]":
+                    self._pos += 1
+                    self._state = _NEXT_KEY
+
+            elif state == _ROW:
+                ok, row = self._decode()
+                if not ok:
+                    return
+
+                self.rows.append(row)
+                self._state = _NEXT_ROW
+
+            elif state == _NEXT_ROW:
+                self._state = _ROW if self._expect(",", "]") == "," else _NEXT_KEY
+
+
+class _BaseStream:
+    __slots__ = ("type", "column_headers", "rows_read", "_parser")
+
+    def __init__(self, type: ReportType) -> None:
+        self.type = type
+        self.column_headers: list[ColumnHeader] = []
+        self.rows_read = 0
+        self._parser = RowParser()
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(type={self.type.name!r}, "
+            f"columns={self.columns!r}, rows_read={self.rows_read})"
+        )
+
+    @property
+    def columns(self) -> list[str]:
+        """A list of all column names. This property is read-only."""
+
+        return [header.name for header in self.column_headers]
+
+    @property
+    def data(self) -> dict[str, t.Any]:
+        """Everything in the response other than the rows, such as the
+        raw column headers. This property is read-only."""
+
+        return self._parser.data
+
+    def _set_headers(self) -> None:
+        self.column_headers = [
+            ColumnHeader.from_json(header)
+            for header in self._parser.data["columnHeaders"]
+        ]
+
+    def _csv_path(self, path: str, delimiter: str) -> str:
+        extension = ".tsv" if delimiter == "\t" else ".csv"
+        return path if path.endswith(extension) else path + extension
+
+
+class ReportStream(_BaseStream):
+    """A report whose rows are parsed from the response as they are
+    read, rather than all at once.
+
+    Iterating over the stream yields each row in turn. Rows are not
+    kept once they have been yielded, so the stream can only be
+    iterated over once.
+
+    You should never need to create these yourself; use
+    :meth:`~analytix.analytics.Analytics.retrieve_stream` instead.
+
+    Args:
+        chunks:
+            An iterator of the chunks of the response body.
+        type:
+            The report type.
+
+    Attributes:
+        type:
+            The report type.
+        column_headers:
+            The column headers of the report.
+        rows_read:
+            The number of rows yielded so far.
+
+    .. versionadded:: 3.6.0
+    """
+
+    __slots__ = ("_chunks",)
+
+    def __init__(self, chunks: t.Iterator[str], type: ReportType) -> None:
+        super().__init__(type)
+        self._chunks = chunks
+
+        while not (self._parser.has_headers or self._parser.done):
+            self._read()
+
+        self._set_headers()
+
+    def __iter__(self) -> t.Iterator[RowT]:
+        parser = self._parser
+
+        while True:
+            while parser.rows:
+                self.rows_read += 1
+                yield parser.rows.popleft()
+
+            if parser.done:
+                _log.info("Streamed %d row(s)", self.rows_read)
+                return
+
+            self._read()
+
+    def _read(self) -> None:
+        chunk = next(self._chunks, None)
+
+        if chunk is None:
+            self._parser.close()
+        else:
+            self._parser.feed(chunk)
+
+    def to_csv(self, path: str, *, delimiter: str = ",") -> None:
+        """Write the remaining rows to a CSV file as they are read.
+
+        Args:
+            path:
+                The path to save the file to. If the path does not
+                already end in the correct extension, one will be
+                added.
+
+        Keyword Args:
+            delimiter:
+                The character to use as a delimiter. If this is "\\t",
+                the file will be saved as a TSV.
+        """
+
+        path = self._csv_path(path, delimiter)
+
+        with open(path, "w") as f:
+            f.write(f"{delimiter.join(self.columns)}\n")
+            for row in self:
+                line = delimiter.join(f"{v}" for v in row)
+                f.write(f"{line}\n")
+
+        _log.info("Saved report as CSV to %s", Path(path).resolve())
+
+
+class AsyncReportStream(_BaseStream):
+    """An asynchronous version of :class:`ReportStream`.
+
+    You should never need to create these yourself; use
+    :meth:`~analytix.async_analytics.AsyncAnalytics.retrieve_stream`
+    instead.
+
+    Args:
+        chunks:
+            An asynchronous iterator of the chunks of the response body.
+        type:
+            The report type.
+
+    Attributes:
+        type:
+            The report type.
+        column_headers:
+            The column headers of the report. These are only available
+            once the stream has been started.
+        rows_read:
+            The number of rows yielded so far.
+
+    .. versionadded:: 3.6.0
+    """
+
+    __slots__ = ("_chunks",)
+
+    def __init__(self, chunks: t.AsyncIterator[str], type: ReportType) -> None:
+        super().__init__(type)
+        self._chunks = chunks
+
+    async def _start(self) -> None:
+        while not (self._parser.has_headers or self._parser.done):
+            await self._read()
+
+        self._set_headers()
+
+    async def __aiter__(self) -> t.AsyncIterator[RowT]:
+        parser = self._parser
+
+        while True:
+            while parser.rows:
+                self.rows_read += 1
+                yield parser.rows.popleft()
+
+            if parser.done:
+                _log.info("Streamed %d row(s)", self.rows_read)
+                return
+
+            await self._read()
+
+    async def _read(self) -> None:
+        try:
+            chunk = await self._chunks.__anext__()
+        except StopAsyncIteration:
+            self._parser.close()
+        else:
+            self._parser.feed(chunk)
+
+    async def ato_csv(self, path: str, *, delimiter: str = ",") -> None:
+        """Asynchronous version of :meth:`ReportStream.to_csv`."""
+
+        path = self._csv_path(path, delimiter)
+
+        async with aiofiles.open(path, "w") as f:
+            await f.write(f"{delimiter.join(self.columns)}\n")
+            async for row in self:
+                line = delimiter.join(f"{v}" for v in row)
+                await f.write(f"{line}\n")
+
+        _log.info("Saved report as CSV to %s", Path(path).resolve())
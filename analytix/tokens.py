@@ -28,16 +28,57 @@
 
 from __future__ import annotations
 
-import json
+import asyncio
+import contextlib
+import dataclasses
+import hashlib
 import logging
+import os
 import pathlib
+import sys
+import tempfile
+import time
 import typing as t
 from dataclasses import dataclass
 
 import aiofiles
 
+from analytix import codecs
+from analytix.abc import TokenStore
 from analytix.types import TokenT
 
+if sys.platform == "win32":
+    import msvcrt
+
+    def _lock_fd(fd: int) -> None:
+        while True:
+            try:
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                # LK_LOCK gives up after 10 seconds, so keep trying.
+                continue
+
+    def _unlock_fd(fd: int) -> None:
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+else:
+    import fcntl
+
+    def _lock_fd(fd: int) -> None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+
+    def _unlock_fd(fd: int) -> None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+def _release_fd(fd: int, locking: asyncio.Future[None]) -> None:
+    if not locking.cancelled() and locking.exception() is None:
+        _unlock_fd(fd)
+
+    os.close(fd)
+
+
 _log = logging.getLogger(__name__)
 
 
@@ -62,6 +103,13 @@ class Tokens:
             space.
         token_type:
             The type of token. Will probably be "Bearer".
+        expires_at:
+            The time at which the access token expires as a UNIX
+            timestamp. This is calculated from ``expires_in`` whenever
+            tokens are retrieved or refreshed. If this is ``None``, the
+            expiry time is not known.
+
+            .. versionadded:: 3.6.0
     """
 
     access_token: str
@@ -69,13 +117,16 @@ class Tokens:
     refresh_token: str
     scope: str
     token_type: str
+    expires_at: float | None = None
 
     def __getitem__(self, key: str) -> TokenT:
         return t.cast(TokenT, getattr(self, key))
 
     @classmethod
     def from_data(cls, data: dict[str, TokenT]) -> Tokens:
-        """Create an instance of this class from a dictionary.
+        """Create an instance of this class from a dictionary. If the
+        data does not specify when the access token expires, it is
+        assumed the tokens were just issued.
 
         Args:
             data:
@@ -85,7 +136,10 @@ class Tokens:
             The created instance.
         """
 
-        return cls(**data)  # type: ignore
+        tokens = cls(**data)  # type: ignore
+        if tokens.expires_at is None:
+            tokens.expires_at = time.time() + int(tokens.expires_in)
+        return tokens
 
     @classmethod
     def from_file(cls, path: pathlib.Path | str) -> Tokens:
@@ -104,8 +158,8 @@ class Tokens:
 
         _log.debug(f"Loading tokens from {path.resolve()}...")
 
-        with open(path) as f:
-            data = json.load(f)
+        with open(path, "rb") as f:
+            data = codecs.loads(f.read())
 
         _log.info("Tokens loaded!")
         return cls(**data)
@@ -128,8 +182,8 @@ class Tokens:
 
         _log.debug(f"Loading tokens from {path.resolve()}...")
 
-        async with aiofiles.open(path) as f:
-            data = json.loads(await f.read())
+        async with aiofiles.open(path, "rb") as f:
+            data = codecs.loads(await f.read())
 
         _log.info("Tokens loaded!")
         return cls(**data)
@@ -148,14 +202,39 @@ class Tokens:
         for k, v in data.items():
             setattr(self, k, v)
 
+        if "expires_in" in data and "expires_at" not in data:
+            self.expires_at = time.time() + int(data["expires_in"])
+
         _log.info("Tokens updated!")
 
-    def to_dict(self) -> dict[str, TokenT]:
+    def is_expired(self, *, margin: float = 0.0) -> bool:
+        """Whether the access token has expired, or will expire within
+        the given margin. If the expiry time is not known, the token is
+        assumed not to have expired.
+
+        Keyword Args:
+            margin:
+                The number of seconds before the actual expiry time the
+                token should be considered expired. Defaults to ``0``.
+
+        Returns:
+            Whether the access token has expired.
+
+        .. versionadded:: 3.6.0
+        """
+
+        if self.expires_at is None:
+            return False
+
+        return time.time() + margin >= self.expires_at
+
+    def to_dict(self) -> dict[str, TokenT | None]:
         """Convert tokens to a dictionary.
 
         Returns:
             A dictionary of tokens, where the keys are strings, and the
-            values are either strings or integers.
+            values are either strings or numbers. The expiry time may
+            also be ``None``.
         """
 
         return {
@@ -164,11 +243,16 @@ class Tokens:
             "refresh_token": self.refresh_token,
             "scope": self.scope,
             "token_type": self.token_type,
+            "expires_at": self.expires_at,
         }
 
     def write(self, path: pathlib.Path | str) -> None:
         """Write tokens to a file.
 
+        .. versionchanged:: 3.6.0
+            The file is now replaced atomically, so other processes
+            never read a partially written file.
+
         Args:
             path:
                 The path to the tokens file.
@@ -177,14 +261,25 @@ class Tokens:
         if not isinstance(path, pathlib.Path):
             path = pathlib.Path(path)
 
-        with open(path, "w") as f:
-            json.dump(self.to_dict(), f)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(codecs.dumps(self.to_dict()))
+            os.replace(tmp, path)
+        except BaseException:
+            os.remove(tmp)
+            raise
 
         _log.info(f"Tokens saved to {path.resolve()}")
 
     async def awrite(self, path: pathlib.Path | str) -> None:
         """Asynchronously write tokens to a file.
 
+        .. versionchanged:: 3.6.0
+            The file is now replaced atomically, so other processes
+            never read a partially written file.
+
         Args:
             path:
                 The path to the tokens file.
@@ -193,7 +288,158 @@ class Tokens:
         if not isinstance(path, pathlib.Path):
             path = pathlib.Path(path)
 
-        async with aiofiles.open(path, "w") as f:
-            await f.write(json.dumps(self.to_dict()))
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+        os.close(fd)
+
+        try:
+            async with aiofiles.open(tmp, "wb") as f:
+                await f.write(codecs.dumps(self.to_dict()))
+            os.replace(tmp, path)
+        except BaseException:
+            os.remove(tmp)
+            raise
 
         _log.info(f"Tokens saved to {path.resolve()}")
+
+
+class FileTokenStore(TokenStore):
+    """A token store which keeps tokens in a JSON file, and which can be
+    shared safely between processes.
+
+    Tokens are written atomically, and loaded tokens are kept in memory
+    until the file changes. The store's lock is an advisory file lock,
+    so only one process holding it can refresh the tokens at a time.
+
+    Args:
+        path:
+            The path to the tokens file.
+
+    Attributes:
+        path:
+            The path to the tokens file.
+
+    .. versionadded:: 3.6.0
+    """
+
+    __slots__ = ("path", "_cached", "_stamp")
+
+    def __init__(self, path: pathlib.Path | str) -> None:
+        if not isinstance(path, pathlib.Path):
+            path = pathlib.Path(path)
+
+        self.path = path
+        self._cached: Tokens | None = None
+        self._stamp: tuple[int, int] | None = None
+
+    def __repr__(self) -> str:
+        return f"FileTokenStore(path={str(self.path)!r})"
+
+    @property
+    def lock_path(self) -> pathlib.Path:
+        """The path to the lock file. Lock files are kept in the
+        system's temporary directory so they don't clutter the
+        directory the tokens are stored in. This property is
+        read-only."""
+
+        digest = hashlib.sha1(  # nosec B303
+            str(self.path.resolve()).encode()
+        ).hexdigest()
+        return pathlib.Path(tempfile.gettempdir()) / f"analytix-{digest}.lock"
+
+    def _stat(self) -> tuple[int, int] | None:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+
+        return st.st_mtime_ns, st.st_size
+
+    def _from_cache(self, stamp: tuple[int, int]) -> Tokens | None:
+        if self._cached is None or stamp != self._stamp:
+            return None
+
+        _log.debug("Tokens file unchanged; using cached tokens")
+        # Hand out copies so callers can't change the cached tokens.
+        return dataclasses.replace(self._cached)
+
+    def _store(self, tokens: Tokens, stamp: tuple[int, int] | None) -> None:
+        self._cached = dataclasses.replace(tokens)
+        self._stamp = stamp
+
+    def load(self) -> Tokens | None:
+        stamp = self._stat()
+        if stamp is None:
+            return None
+
+        tokens = self._from_cache(stamp)
+        if tokens is not None:
+            return tokens
+
+        try:
+            tokens = Tokens.from_file(self.path)
+        except (OSError, ValueError, TypeError) as exc:
+            _log.warning(f"Unable to load tokens from {self.path}: {exc}")
+            return None
+
+        self._store(tokens, stamp)
+        return tokens
+
+    def save(self, tokens: Tokens) -> None:
+        tokens.write(self.path)
+        self._store(tokens, self._stat())
+
+    @contextlib.contextmanager
+    def lock(self) -> t.Iterator[None]:
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+
+        try:
+            _lock_fd(fd)
+            try:
+                yield
+            finally:
+                _unlock_fd(fd)
+        finally:
+            os.close(fd)
+
+    async def aload(self) -> Tokens | None:
+        stamp = self._stat()
+        if stamp is None:
+            return None
+
+        tokens = self._from_cache(stamp)
+        if tokens is not None:
+            return tokens
+
+        try:
+            tokens = await Tokens.afrom_file(self.path)
+        except (OSError, ValueError, TypeError) as exc:
+            _log.warning(f"Unable to load tokens from {self.path}: {exc}")
+            return None
+
+        self._store(tokens, stamp)
+        return tokens
+
+    async def asave(self, tokens: Tokens) -> None:
+        await tokens.awrite(self.path)
+        self._store(tokens, self._stat())
+
+    @contextlib.asynccontextmanager
+    async def alock(self) -> t.AsyncIterator[None]:
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        # Waiting for the lock mustn't block the event loop.
+        locking = asyncio.get_running_loop().run_in_executor(None, _lock_fd, fd)
+
+        try:
+            await asyncio.shield(locking)
+        except BaseException:
+            # If this task is cancelled, the worker thread may still be
+            # waiting for the lock, so the descriptor can only be closed
+            # (and the lock released) once it's done with it.
+            locking.add_done_callback(lambda f: _release_fd(fd, f))
+            raise
+
+        try:
+            yield
+        finally:
+            _unlock_fd(fd)
+            os.close(fd)
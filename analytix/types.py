@@ -30,5 +30,7 @@ import typing as t
 
 DataHeadersT = t.Tuple[t.Dict[str, str], t.Dict[str, str]]
 SecretT = t.Union[str, t.List[str]]
-TokenT = t.Union[str, int]
-ReportRowT = t.List[t.List[t.Union[str, int, float]]]
+TokenT = t.Union[str, int, float]
+RowT = t.List[t.Union[str, int, float]]
+ReportRowT = t.List[RowT]
+QuerySpecT = t.Mapping[str, t.Any]
@@ -0,0 +1,140 @@
+# Copyright (c) 2021-present, Ethan Henderson
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import pathlib
+import tempfile
+import time
+
+import analytix
+
+_log = logging.getLogger(__name__)
+
+CHECK_FOR_UPDATES = True
+DISABLE_ENV_VAR = "ANALYTIX_DISABLE_UPDATE_CHECK"
+UPDATE_CHECK_TTL = 86400.0
+
+
+def _cache_dir() -> pathlib.Path:
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or pathlib.Path.home() / "AppData/Local"
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or pathlib.Path.home() / ".cache"
+
+    return pathlib.Path(base) / "analytix"
+
+
+VERSION_CACHE_PATH = _cache_dir() / "latest_version.json"
+
+
+def enabled() -> bool:
+    """Whether update checks are enabled. They can be disabled by
+    setting ``CHECK_FOR_UPDATES`` in this module to ``False``, or by
+    setting the ``ANALYTIX_DISABLE_UPDATE_CHECK`` environment variable
+    to any non-empty value.
+
+    .. versionadded:: 3.6.0
+
+    Returns:
+        ``False`` if update checks have been disabled either globally or
+        using the environment variable, otherwise ``True``.
+    """
+
+    return CHECK_FOR_UPDATES and not os.environ.get(DISABLE_ENV_VAR)
+
+
+def read_cached() -> str | None:
+    """Get the latest version from the cache, if it has been checked
+    recently. Versions are cached for a day.
+
+    .. versionadded:: 3.6.0
+
+    Returns:
+        The latest version, or ``None`` if it is not cached or the
+        cached version has expired.
+    """
+
+    try:
+        with open(VERSION_CACHE_PATH) as f:
+            data = json.load(f)
+
+        if time.time() - data["checked_at"] > UPDATE_CHECK_TTL:
+            return None
+
+        return str(data["latest"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def write_cached(latest: str) -> None:
+    """Store the latest version in the cache. Any errors are ignored, as
+    failing to cache the version only means it's checked again next
+    time.
+
+    .. versionadded:: 3.6.0
+
+    Args:
+        latest:
+            The latest version.
+    """
+
+    path = VERSION_CACHE_PATH
+
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"checked_at": time.time(), "latest": latest}, f)
+            os.replace(tmp, path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+    except OSError as exc:
+        _log.debug(f"Failed to cache latest version: {exc}")
+
+
+def warn_if_outdated(latest: str) -> None:
+    """Log a warning if a newer version of analytix is available.
+
+    .. versionadded:: 3.6.0
+
+    Args:
+        latest:
+            The latest version.
+    """
+
+    if analytix.__version__ != latest:
+        _log.warning(
+            f"You do not have the latest stable version of analytix (v{latest})"
+        )
@@ -0,0 +1,149 @@
+# Copyright (c) 2021-present, Ethan Henderson
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from __future__ import annotations
+
+import typing as t
+
+from analytix import data
+
+
+class Vocabulary:
+    """A fixed set of names, each of which is assigned its own bit.
+    Collections of names can then be represented as integer masks, so
+    comparing them takes a handful of integer operations.
+
+    Args:
+        names:
+            The names to include. Bits are assigned in iteration order,
+            and duplicates are ignored.
+
+    Attributes:
+        names:
+            The names in this vocabulary, in bit order.
+
+    .. versionadded:: 3.6.0
+    """
+
+    __slots__ = ("names", "_bits")
+
+    def __init__(self, names: t.Iterable[str]) -> None:
+        self.names = tuple(dict.fromkeys(names))
+        self._bits = {name: 1 << i for i, name in enumerate(self.names)}
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(names={len(self.names)})"
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._bits
+
+    def mask(self, names: t.Iterable[str]) -> int:
+        """Encode a collection of names as a mask. Names that are not in
+        this vocabulary are ignored.
+
+        Args:
+            names:
+                The names to encode.
+
+        Returns:
+            The mask.
+        """
+
+        return self.encode(names)[0]
+
+    def encode(self, names: t.Iterable[str]) -> tuple[int, set[str]]:
+        """Encode a collection of names as a mask, keeping track of any
+        names that are not in this vocabulary.
+
+        Args:
+            names:
+                The names to encode.
+
+        Returns:
+            A tuple containing the mask and a set of unknown names.
+        """
+
+        bits = self._bits
+        mask = 0
+        unknown = set()
+
+        for name in names:
+            bit = bits.get(name)
+            if bit is None:
+                unknown.add(name)
+            else:
+                mask |= bit
+
+        return mask, unknown
+
+    def decode(self, mask: int) -> set[str]:
+        """Decode a mask back into the names it represents.
+
+        Args:
+            mask:
+                The mask to decode.
+
+        Returns:
+            The set of names.
+        """
+
+        names = set()
+
+        while mask:
+            bit = mask & -mask
+            names.add(self.names[bit.bit_length() - 1])
+            mask ^= bit
+
+        return names
+
+
+def popcount(mask: int) -> int:
+    """Count the number of names in a mask.
+
+    Args:
+        mask:
+            The mask.
+
+    Returns:
+        The number of set bits.
+
+    .. versionadded:: 3.6.0
+    """
+
+    return bin(mask).count("1")
+
+
+VOCABULARY = Vocabulary(
+    sorted(data.ALL_METRICS | data.ALL_DIMENSIONS | data.ALL_FILTERS)
+)
+ALL_METRICS = VOCABULARY.mask(data.ALL_METRICS)
+ALL_DIMENSIONS = VOCABULARY.mask(data.ALL_DIMENSIONS)
+ALL_FILTERS = VOCABULARY.mask(data.ALL_FILTERS)
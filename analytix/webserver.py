@@ -26,20 +26,57 @@
 # OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import asyncio
 import logging
+import time
 import typing as t
 from http import server
 from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from analytix import errors
 
 _log = logging.getLogger(__name__)
 
+LANDING_PAGE_PATH = Path(__file__).parent / "data/landing.html"
+
+
+def _parse_callback(path: str) -> dict[str, str]:
+    query = parse_qs(urlsplit(path).query)
+    return {k: v[0] for k, v in query.items()}
+
 
 class Server(server.HTTPServer):
     def __init__(self, *args: t.Any, **kwargs: t.Any) -> None:
         super().__init__(*args, **kwargs)
         self.code = ""
+        self.error: errors.AuthenticationError | None = None
         _log.info(f"Started webserver on {self.server_name}:{self.server_port}")
 
+    def wait_for_code(self, *, timeout: float | None = 300.0) -> str:
+        # Browsers often make other requests (like for a favicon) before
+        # the redirect arrives, so keep handling them until it does.
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while not self.code and self.error is None:
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise errors.AuthenticationError(
+                        "timeout",
+                        "no authorisation code was received within "
+                        f"{timeout} seconds",
+                    )
+
+                self.timeout = remaining
+
+            self.handle_request()
+
+        if self.error is not None:
+            raise self.error
+
+        return self.code
+
     def server_close(self) -> None:
         super().server_close()
         _log.info("Closed webserver")
@@ -50,12 +87,146 @@ class RequestHandler(server.BaseHTTPRequestHandler):
         _log.debug(f"Received request ({args[0]})")
 
     def do_GET(self) -> None:
+        self.server: Server  # Overwrite type so code is exposed.
+        params = _parse_callback(self.path)
+
+        if "code" in params:
+            self.server.code = params["code"]
+            _log.debug(f"Code: {self.server.code}")
+        elif "error" in params:
+            self.server.error = errors.AuthenticationError(
+                params["error"],
+                params.get("error_description", "authorisation failed"),
+            )
+        else:
+            # Browsers often ask for things like /favicon.ico as well.
+            _log.debug(f"Ignoring request for {self.path}")
+            self.send_response(404)
+            self.end_headers()
+            return
+
         self.send_response(200)
         self.send_header("Content-type", "text/html")
         self.end_headers()
+        self.wfile.write(LANDING_PAGE_PATH.read_bytes())
 
-        self.server: Server  # Overwrite type so code is exposed.
-        self.server.code = self.path.split("&")[1][5:]
-        _log.debug(f"Code: {self.server.code}")
 
-        self.wfile.write((Path(__file__).parent / "data/landing.html").read_bytes())
+class AsyncServer:
+    """A loopback server which receives the authorisation code without
+    blocking the event loop.
+
+    Requests which don't carry an authorisation code, such as requests
+    for a favicon, are ignored.
+
+    Args:
+        host:
+            The host to listen on.
+        port:
+            The port to listen on.
+
+    Attributes:
+        host:
+            The host to listen on.
+        port:
+            The port to listen on.
+
+    .. versionadded:: 3.6.0
+    """
+
+    __slots__ = ("host", "port", "_result")
+
+    def __init__(self, host: str, port: int) -> None:
+        self.host = host
+        self.port = port
+        self._result: asyncio.Future[str] | None = None
+
+    async def wait_for_code(self, *, timeout: float | None = 300.0) -> str:
+        """Start the server and wait for the authorisation code.
+
+        Keyword Args:
+            timeout:
+                The number of seconds to wait for the code. Defaults to
+                ``300``. If this is ``None``, this waits indefinitely.
+
+        Returns:
+            The authorisation code.
+
+        Raises:
+            AuthenticationError:
+                No code was received in time, or authorisation was
+                denied.
+        """
+
+        self._result = asyncio.get_running_loop().create_future()
+        srv = await asyncio.start_server(self._handle, self.host, self.port)
+        _log.info(f"Started webserver on {self.host}:{self.port}")
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(self._result), timeout)
+        except asyncio.TimeoutError:
+            raise errors.AuthenticationError(
+                "timeout",
+                f"no authorisation code was received within {timeout} seconds",
+            ) from None
+        finally:
+            srv.close()
+            await srv.wait_closed()
+            _log.info("Closed webserver")
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            line = await asyncio.wait_for(reader.readline(), 10)
+            parts = line.decode("latin-1").split()
+
+            # Read and discard the headers.
+            while (await asyncio.wait_for(reader.readline(), 10)).strip():
+                ...
+
+            if len(parts) < 2 or parts[0] != "GET":
+                await self._respond(writer, 405, "Method Not Allowed")
+                return
+
+            _log.debug(f"Received request (GET {parts[1]})")
+            params = _parse_callback(parts[1])
+            assert self._result is not None
+
+            if "code" in params:
+                await self._respond(writer, 200, "OK", LANDING_PAGE_PATH.read_bytes())
+                if not self._result.done():
+                    _log.debug(f"Code: {params['code']}")
+                    self._result.set_result(params["code"])
+            elif "error" in params:
+                await self._respond(writer, 200, "OK", LANDING_PAGE_PATH.read_bytes())
+                if not self._result.done():
+                    self._result.set_exception(
+                        errors.AuthenticationError(
+                            params["error"],
+                            params.get("error_description", "authorisation failed"),
+                        )
+                    )
+            else:
+                _log.debug(f"Ignoring request for {parts[1]}")
+                await self._respond(writer, 404, "Not Found")
+        except (
+            asyncio.TimeoutError,
+            asyncio.LimitOverrunError,
+            ConnectionError,
+            ValueError,
+        ) as exc:
+            # Overly long lines raise ValueError.
+            _log.debug(f"Dropped connection: {exc!r}")
+        finally:
+            writer.close()
+
+    async def _respond(
+        self, writer: asyncio.StreamWriter, status: int, reason: str, body: bytes = b""
+    ) -> None:
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\n"
+            "Content-Type: text/html\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n".encode("latin-1") + body
+        )
+        await writer.drain()
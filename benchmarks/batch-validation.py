@@ -0,0 +1,66 @@
+import datetime as dt
+import logging
+import statistics
+import sys
+import time
+
+from analytix import queries
+from analytix.queries import Query, validate_many
+
+QUERIES = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+REPEATS = 5
+
+SHAPES = (
+    {"dimensions": ("day",), "metrics": ("views", "likes")},
+    {"dimensions": ("country",), "metrics": ("views",)},
+    {"dimensions": ("month",), "filters": {"country": "US"}},
+    {"dimensions": ("ageGroup", "gender"), "metrics": ("viewerPercentage",)},
+    {"dimensions": ("deviceType",), "filters": {"video": "abc"}},
+)
+
+
+def make_specs(count):
+    start = dt.date(2020, 1, 1)
+    specs = []
+
+    for i in range(count):
+        spec = dict(SHAPES[i % len(SHAPES)])
+        spec["start_date"] = start + dt.timedelta(days=i % 365)
+        spec["end_date"] = spec["start_date"] + dt.timedelta(days=30)
+        specs.append(spec)
+
+    return specs
+
+
+def timed(func):
+    timings = []
+
+    for _ in range(REPEATS):
+        queries._validated.clear()
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+
+    return statistics.median(timings)
+
+
+if __name__ == "__main__":
+    # Info logging is off, as it would be for most batch jobs.
+    logging.getLogger("analytix").setLevel(logging.ERROR)
+
+    specs = make_specs(QUERIES)
+
+    def one_by_one():
+        for spec in specs:
+            Query(**spec).validate()
+
+    def batched():
+        validate_many(specs)
+
+    single = timed(one_by_one)
+    batch = timed(batched)
+
+    print(f"Queries:                    {QUERIES:,}")
+    print(f"One at a time (median):     {single * 1000:,.1f} ms")
+    print(f"Batched (median):           {batch * 1000:,.1f} ms")
+    print(f"Per query (batched):        {batch * 1e6 / QUERIES:,.2f} µs")
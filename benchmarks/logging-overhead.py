@@ -0,0 +1,93 @@
+import datetime as dt
+import json
+import logging
+import statistics
+import sys
+import time
+
+import httpx
+
+from analytix import Analytics
+from analytix.secrets import Secrets
+from analytix.tokens import Tokens
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+REPEATS = 5
+
+
+def make_payload(rows):
+    start = dt.date(2000, 1, 1)
+    return {
+        "kind": "youtubeAnalytics#resultTable",
+        "columnHeaders": [
+            {"name": "day", "columnType": "DIMENSION", "dataType": "STRING"},
+            {"name": "views", "columnType": "METRIC", "dataType": "INTEGER"},
+            {"name": "likes", "columnType": "METRIC", "dataType": "INTEGER"},
+        ],
+        "rows": [
+            [(start + dt.timedelta(days=i % 7000)).isoformat(), i, i // 10]
+            for i in range(rows)
+        ],
+    }
+
+
+def make_client(body):
+    secrets = Secrets(
+        client_id="id",
+        project_id="project",
+        auth_uri="https://accounts.google.com/o/oauth2/auth",
+        token_uri="https://oauth2.googleapis.com/token",
+        auth_provider_x509_cert_url="https://www.googleapis.com/oauth2/v1/certs",
+        client_secret="secret",
+        redirect_uris=["http://localhost"],
+    )
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=body))
+    client = Analytics(secrets, session=httpx.Client(transport=transport))
+    client._tokens = Tokens(
+        access_token="a",
+        expires_in=3599,
+        refresh_token="r",
+        scope="",
+        token_type="Bearer",
+        expires_at=time.time() + 3600,
+    )
+    return client
+
+
+def timed(func):
+    timings = []
+
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+
+    return statistics.median(timings)
+
+
+if __name__ == "__main__":
+    # Debug logging is off, as it would be in production.
+    logging.getLogger("analytix").setLevel(logging.INFO)
+
+    payload = make_payload(ROWS)
+    client = make_client(json.dumps(payload).encode("utf-8"))
+
+    def retrieve():
+        client.retrieve(
+            dimensions=("day",),
+            metrics=("views", "likes"),
+            skip_update_check=True,
+            skip_refresh_check=True,
+        )
+
+    def format_payload():
+        # What every retrieval used to do, even with debug logging off.
+        f"Data retrieved: {payload}"
+
+    retrieval = timed(retrieve)
+    formatting = timed(format_payload)
+
+    print(f"Rows:                       {ROWS:,}")
+    print(f"Retrieval (median):         {retrieval * 1000:,.1f} ms")
+    print(f"Old payload formatting:     {formatting * 1000:,.1f} ms")
+    print(f"Overhead avoided per call:  {formatting / retrieval:.0%} of retrieval")
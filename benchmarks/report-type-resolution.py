@@ -0,0 +1,57 @@
+import statistics
+import sys
+import time
+
+from analytix.queries import Query
+
+QUERIES = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+REPEATS = 5
+
+SHAPES = (
+    {"dimensions": ()},
+    {"dimensions": ("day",)},
+    {"dimensions": ("month",), "filters": {"isCurated": "1", "playlist": "abc"}},
+    {"dimensions": ("country",), "filters": {"video": "abc"}},
+    {"dimensions": ("province",), "filters": {"country": "US"}},
+    {"dimensions": ("deviceType", "operatingSystem", "day")},
+    {"dimensions": ("ageGroup", "gender")},
+    {"dimensions": ("insightTrafficSourceDetail",)},
+    {"dimensions": ("video",), "filters": {"province": "US-OH"}},
+    {"dimensions": ("day", "subscribedStatus")},
+)
+
+
+def make_queries(count):
+    return [Query(**SHAPES[i % len(SHAPES)]) for i in range(count)]
+
+
+def timed(func):
+    timings = []
+
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+
+    return statistics.median(timings)
+
+
+if __name__ == "__main__":
+    queries = make_queries(QUERIES)
+
+    def resolve():
+        for query in queries:
+            query.determine_report_type()
+
+    def construct():
+        # What every resolution used to cost on top of the branch chain.
+        for query in queries:
+            type(query.determine_report_type())()
+
+    resolution = timed(resolve)
+    construction = timed(construct) - resolution
+
+    print(f"Queries:                    {QUERIES:,}")
+    print(f"Resolution (median):        {resolution * 1e6 / QUERIES:,.2f} µs/query")
+    print(f"Old per-call construction:  {construction * 1e6 / QUERIES:,.2f} µs/query")
+    print(f"Total for all queries:      {resolution * 1000:,.1f} ms")
@@ -29,18 +29,30 @@
 import builtins
 import datetime as dt
 import json
+import logging
 import os
 import shutil
+import time
 
 import httpx
 import mock
 import pytest
 
-from analytix import Analytics
-from analytix.errors import APIError, AuthenticationError
-from analytix.report_types import TimeBasedActivity
+from analytix import Analytics, updates
+from analytix.caching import DiskCache
+from analytix.errors import (
+    APIError,
+    AuthenticationError,
+    InvalidMetrics,
+    InvalidRequest,
+    QuotaExceeded,
+)
+from analytix.limits import Quota, RateLimiter
+from analytix.report_types import TimeBasedActivity, TopVideosRegional
+from analytix.reports import Report
+from analytix.retries import RetryPolicy
 from analytix.secrets import Secrets
-from analytix.tokens import Tokens
+from analytix.tokens import FileTokenStore, Tokens
 from analytix.webserver import Server
 from tests.paths import JSON_OUTPUT_PATH, MOCK_DATA_PATH
 from tests.test_reports import request_data  # noqa
@@ -70,6 +82,13 @@ def test_load_from_non_existent_secrets_file():
     assert f"{exc.value}" == "you must provided a valid path to a secrets file"
 
 
+@pytest.fixture(autouse=True)
+def version_cache(tmp_path, monkeypatch):
+    path = tmp_path / "latest_version.json"
+    monkeypatch.setattr(updates, "VERSION_CACHE_PATH", path)
+    return path
+
+
 @pytest.fixture()
 def client() -> Analytics:
     return Analytics.with_secrets(SECRETS_PATH)
@@ -130,14 +149,14 @@ def test_authorise_with_tokens_non_path_and_dir(client):
 
 
 def test_authorise_without_tokens(client, tokens_dict):
-    with mock.patch.object(Server, "handle_request") as mock_req:
+    with mock.patch.object(Server, "wait_for_code") as mock_req:
         with mock.patch.object(httpx.Client, "post") as mock_post:
             with mock.patch.object(Tokens, "write") as mock_write:
                 mock_write.return_value = None
                 mock_post.return_value = httpx.Response(
                     status_code=200, json=tokens_dict, request=mock.Mock()
                 )
-                mock_req.return_value = None
+                mock_req.return_value = "code"
 
                 tokens = client.authorise(token_path=TOKENS_PATH, force=True)
 
@@ -212,8 +231,8 @@ def test_retrieve_token_refresh_token_failure(client, tokens):
 
         client._tokens = tokens
 
-        with mock.patch.object(Server, "handle_request") as mock_req:
-            mock_req.return_value = None
+        with mock.patch.object(Server, "wait_for_code") as mock_req:
+            mock_req.return_value = "code"
 
             # If we get here, refreshing failed, and we can also test
             # retrieval failure.
@@ -337,6 +356,23 @@ def test_retrieve(client, request_data, tokens):
         assert isinstance(report.type, TimeBasedActivity)
 
 
+def test_retrieve_logs_payload_summary(client, request_data, tokens, caplog):
+    caplog.set_level(logging.DEBUG, logger="analytix")
+
+    with mock.patch.object(httpx.Client, "get") as mock_get:
+        client._tokens = tokens
+        resp = httpx.Response(status_code=200, request=mock.Mock(), json=request_data)
+        mock_get.return_value = resp
+
+        client.retrieve(
+            dimensions=("day",), skip_update_check=True, skip_refresh_check=True
+        )
+
+    rows = len(request_data["rows"])
+    assert f"Retrieved {rows} row(s) ({len(resp.content)} bytes) in" in caplog.text
+    assert request_data["rows"][0][0] not in caplog.text
+
+
 def test_retrieve_version_check(client, request_data, tokens):
     with mock.patch.object(httpx.Client, "get") as mock_get:
         client._tokens = tokens
@@ -356,6 +392,8 @@ def test_retrieve_version_check(client, request_data, tokens):
                 end_date=dt.date(2022, 1, 31),
                 skip_refresh_check=True,
             )
+            client._update_thread.join()
+            mock_check.assert_called_once()
             mock_get.assert_called_once()
             assert report.data == request_data
             assert isinstance(report.type, TimeBasedActivity)
@@ -456,3 +494,521 @@ def test_retrieve_with_no_authorisation(client, tokens, request_data):
 
             mock_auth.assert_called_once()
             mock_get.assert_called_once()
+
+
+def test_retrieve_many(client, request_data, tokens):
+    with mock.patch.object(httpx.Client, "get") as mock_get:
+        client._tokens = tokens
+
+        mock_get.return_value = httpx.Response(
+            status_code=200,
+            request=mock.Mock(),
+            json=request_data,
+        )
+
+        with mock.patch.object(Analytics, "needs_refresh") as mock_check:
+            mock_check.return_value = False
+
+            reports = client.retrieve_many(
+                [
+                    {
+                        "dimensions": ("day",),
+                        "start_date": dt.date(2022, 1, 1),
+                        "end_date": dt.date(2022, 1, 31),
+                    },
+                    {"dimensions": ("day",), "metrics": ("does-not-exist",)},
+                    {
+                        "dimensions": ("day",),
+                        "start_date": dt.date(2022, 2, 1),
+                        "end_date": dt.date(2022, 2, 28),
+                    },
+                ],
+                max_workers=2,
+                skip_update_check=True,
+            )
+
+            mock_check.assert_called_once()
+            assert mock_get.call_count == 2
+
+    assert len(reports) == 3
+    assert reports[0].data == request_data
+    assert isinstance(reports[0].type, TimeBasedActivity)
+    assert isinstance(reports[1], InvalidMetrics)
+    assert reports[2].data == request_data
+
+
+def test_retrieve_as_completed(client, request_data, tokens):
+    with mock.patch.object(httpx.Client, "get") as mock_get:
+        client._tokens = tokens
+
+        mock_get.side_effect = [
+            httpx.Response(
+                status_code=403,
+                request=mock.Mock(),
+                json={"error": {"code": 403, "message": "Forbidden"}},
+            ),
+            httpx.Response(status_code=200, request=mock.Mock(), json=request_data),
+        ]
+
+        results = dict(
+            client.retrieve_as_completed(
+                [
+                    {"dimensions": ("day",)},
+                    {"oops": True},
+                    {"dimensions": ("day",)},
+                ],
+                max_workers=1,
+                skip_update_check=True,
+                skip_refresh_check=True,
+            )
+        )
+
+    assert isinstance(results[0], APIError)
+    assert str(results[0]) == "API returned 403: Forbidden"
+    assert isinstance(results[1], TypeError)
+    assert results[2].data == request_data
+
+
+def test_retrieve_as_completed_prepares_tokens_once(client, request_data, tokens):
+    with mock.patch.object(httpx.Client, "get") as mock_get:
+        mock_get.return_value = httpx.Response(
+            status_code=200, request=mock.Mock(), json=request_data
+        )
+
+        with mock.patch.object(Analytics, "authorise") as mock_auth:
+            mock_auth.side_effect = lambda **_: setattr(client, "_tokens", tokens)
+
+            results = client.retrieve_as_completed(
+                [{"dimensions": ("day",)}] * 5,
+                max_workers=3,
+                skip_update_check=True,
+                skip_refresh_check=True,
+            )
+
+            # Tokens are sorted before any results are requested.
+            mock_auth.assert_called_once()
+            assert sorted(i for i, _ in results) == [0, 1, 2, 3, 4]
+            assert mock_get.call_count == 5
+
+
+def test_retrieve_many_invalid_workers(client):
+    with pytest.raises(ValueError) as exc:
+        client.retrieve_many([], max_workers=0)
+    assert str(exc.value) == "the maximum number of workers should be positive"
+
+
+def test_retrieve_sharded(client, request_data, tokens):
+    with mock.patch.object(httpx.Client, "get") as mock_get:
+        client._tokens = tokens
+
+        mock_get.return_value = httpx.Response(
+            status_code=200,
+            request=mock.Mock(),
+            json=request_data,
+        )
+
+        report = client.retrieve(
+            dimensions=("day",),
+            start_date=dt.date(2022, 1, 1),
+            end_date=dt.date(2022, 3, 31),
+            skip_update_check=True,
+            skip_refresh_check=True,
+            shard_by="month",
+            max_workers=2,
+        )
+
+        assert mock_get.call_count == 3
+        urls = sorted(c.args[0] for c in mock_get.call_args_list)
+        assert "startDate=2022-01-01&endDate=2022-01-31" in urls[0]
+        assert "startDate=2022-02-01&endDate=2022-02-28" in urls[1]
+        assert "startDate=2022-03-01&endDate=2022-03-31" in urls[2]
+
+    assert report.rows == request_data["rows"] * 3
+    assert isinstance(report.type, TimeBasedActivity)
+
+
+def test_retrieve_sharded_not_additive(client, tokens):
+    client._tokens = tokens
+
+    with mock.patch.object(httpx.Client, "get") as mock_get:
+        with pytest.raises(InvalidRequest) as exc:
+            client.retrieve(
+                dimensions=("country",),
+                skip_update_check=True,
+                skip_refresh_check=True,
+                shard_by="week",
+            )
+        assert (
+            str(exc.value) == "sharding requires either the 'day' or 'month' dimension"
+        )
+        mock_get.assert_not_called()
+
+
+def _page(request_data, rows):
+    return httpx.Response(
+        status_code=200,
+        request=mock.Mock(),
+        json={**request_data, "rows": (request_data["rows"] * 10)[:rows]},
+    )
+
+
+def test_retrieve_pages(client, request_data, tokens):
+    with mock.patch.object(httpx.Client, "get") as mock_get:
+        client._tokens = tokens
+        mock_get.side_effect = [
+            _page(request_data, 200),
+            _page(request_data, 200),
+            _page(request_data, 13),
+        ]
+
+        pages = list(
+            client.retrieve_pages(
+                dimensions=("video",),
+                sort_options=("-views",),
+                skip_update_check=True,
+                skip_refresh_check=True,
+            )
+        )
+
+        assert [p.shape[0] for p in pages] == [200, 200, 13]
+        urls = [c.args[0] for c in mock_get.call_args_list]
+        assert "maxResults=200" in urls[0] and "startIndex=1&" in urls[0]
+        assert "maxResults=200" in urls[1] and "startIndex=201&" in urls[1]
+        assert "maxResults=200" in urls[2] and "startIndex=401&" in urls[2]
+
+    report = Report.concat(pages)
+    assert report.shape[0] == 413
+    assert isinstance(report.type, TopVideosRegional)
+
+
+def test_retrieve_pages_row_limit(client, request_data, tokens):
+    with mock.patch.object(httpx.Client, "get") as mock_get:
+        client._tokens = tokens
+        mock_get.side_effect = [
+            _page(request_data, 25),
+            _page(request_data, 15),
+        ]
+
+        pages = list(
+            client.retrieve_pages(
+                dimensions=("insightTrafficSourceDetail",),
+                filters={"insightTrafficSourceType": "YT_SEARCH"},
+                sort_options=("-views",),
+                row_limit=40,
+                skip_update_check=True,
+                skip_refresh_check=True,
+            )
+        )
+
+        assert [p.shape[0] for p in pages] == [25, 15]
+        urls = [c.args[0] for c in mock_get.call_args_list]
+        assert "maxResults=25" in urls[0] and "startIndex=1&" in urls[0]
+        assert "maxResults=15" in urls[1] and "startIndex=26&" in urls[1]
+
+
+def test_retrieve_pages_uncapped(client, request_data, tokens):
+    with mock.patch.object(httpx.Client, "get") as mock_get:
+        client._tokens = tokens
+        mock_get.return_value = _page(request_data, 31)
+
+        pages = list(
+            client.retrieve_pages(
+                dimensions=("day",),
+                skip_update_check=True,
+                skip_refresh_check=True,
+            )
+        )
+
+        mock_get.assert_called_once()
+        assert "maxResults=0" in mock_get.call_args.args[0]
+        assert len(pages) == 1
+
+
+def test_retrieve_pages_invalid_row_limit(client):
+    with pytest.raises(InvalidRequest) as exc:
+        list(client.retrieve_pages(row_limit=-1))
+    assert (
+        str(exc.value) == "the row limit should be non-negative (0 for unlimited rows)"
+    )
+
+
+def test_needs_refresh_local(client, tokens):
+    client._tokens = tokens
+    tokens.expires_at = time.time() + 3600
+
+    with mock.patch.object(httpx.Client, "get") as mock_get:
+        assert not client.needs_refresh()
+        client.refresh_margin = 3600
+        assert client.needs_refresh()
+        mock_get.assert_not_called()
+
+
+def test_needs_refresh_records_expiry(client, tokens):
+    client._tokens = tokens
+
+    with mock.patch.object(httpx.Client, "get") as mock_get:
+        mock_get.return_value = httpx.Response(
+            status_code=200, request=mock.Mock(), json={"expires_in": "3000"}
+        )
+
+        assert not client.needs_refresh()
+        assert not client.needs_refresh()
+        mock_get.assert_called_once()
+        assert tokens.expires_at == pytest.approx(time.time() + 3000, abs=5)
+
+
+def test_retrieve_rejected_token(client, request_data, tokens):
+    client._tokens = tokens
+    tokens.expires_at = time.time() + 3600
+    unauthorised = httpx.Response(
+        status_code=401,
+        request=mock.Mock(),
+        json={"error": {"code": 401, "message": "Unauthorised"}},
+    )
+    ok = httpx.Response(status_code=200, request=mock.Mock(), json=request_data)
+
+    with mock.patch.object(httpx.Client, "get") as mock_get:
+        with mock.patch.object(Analytics, "refresh_access_token") as mock_refresh:
+            # Report, token check, report.
+            mock_get.side_effect = [unauthorised, mock.Mock(is_error=True), ok]
+
+            report = client.retrieve(dimensions=("day",), skip_update_check=True)
+            mock_refresh.assert_called_once()
+            assert mock_get.call_count == 3
+            assert report.data == request_data
+
+
+def test_retrieve_rejected_valid_token(client, tokens):
+    client._tokens = tokens
+    tokens.expires_at = time.time() + 3600
+    unauthorised = httpx.Response(
+        status_code=401,
+        request=mock.Mock(),
+        json={"error": {"code": 401, "message": "Unauthorised"}},
+    )
+    valid = httpx.Response(status_code=200, request=mock.Mock(), json={})
+
+    with mock.patch.object(httpx.Client, "get") as mock_get:
+        with mock.patch.object(Analytics, "refresh_access_token") as mock_refresh:
+            mock_get.side_effect = [unauthorised, valid]
+
+            with pytest.raises(APIError) as exc:
+                client.retrieve(dimensions=("day",), skip_update_check=True)
+            assert str(exc.value) == "API returned 401: Unauthorised"
+            mock_refresh.assert_not_called()
+
+
+def test_retrieve_cached(client, request_data, tokens, tmp_path):
+    client._tokens = tokens
+    client.cache = DiskCache(tmp_path, namespace="test")
+
+    with mock.patch.object(httpx.Client, "get") as mock_get:
+        mock_get.return_value = httpx.Response(
+            status_code=200, request=mock.Mock(), json=request_data
+        )
+
+        for _ in range(2):
+            report = client.retrieve(
+                dimensions=("day",),
+                start_date=dt.date(2022, 1, 1),
+                end_date=dt.date(2022, 1, 31),
+                skip_update_check=True,
+                skip_refresh_check=True,
+            )
+            assert report.data == request_data
+
+        mock_get.assert_called_once()
+
+
+def test_retrieve_retries_transient_errors(client, request_data, tokens):
+    client._tokens = tokens
+    attempts = []
+    client.retry_policy = RetryPolicy(on_attempt=attempts.append)
+    unavailable = httpx.Response(
+        status_code=503,
+        request=mock.Mock(),
+        headers={"Retry-After": "1"},
+        json={"error": {"code": 503, "message": "Unavailable"}},
+    )
+    valid = httpx.Response(status_code=200, request=mock.Mock(), json=request_data)
+
+    with mock.patch.object(httpx.Client, "get") as mock_get:
+        with mock.patch("time.sleep") as mock_sleep:
+            mock_get.side_effect = [unavailable, valid]
+
+            report = client.retrieve(
+                dimensions=("day",), skip_update_check=True, skip_refresh_check=True
+            )
+            assert report.data == request_data
+            assert mock_get.call_count == 2
+            mock_sleep.assert_called_once_with(1.0)
+            assert [a.status_code for a in attempts] == [503, 200]
+
+
+def test_retrieve_does_not_retry_bad_requests(client, tokens):
+    client._tokens = tokens
+    bad_request = httpx.Response(
+        status_code=400,
+        request=mock.Mock(),
+        json={"error": {"code": 400, "message": "Bad request"}},
+    )
+
+    with mock.patch.object(httpx.Client, "get") as mock_get:
+        mock_get.return_value = bad_request
+
+        with pytest.raises(APIError) as exc:
+            client.retrieve(
+                dimensions=("day",), skip_update_check=True, skip_refresh_check=True
+            )
+        assert str(exc.value) == "API returned 400: Bad request"
+        mock_get.assert_called_once()
+
+
+def test_refresh_access_token_retries_transient_errors(client, tokens):
+    client._tokens = tokens
+    unavailable = httpx.Response(status_code=503, request=mock.Mock())
+    valid = httpx.Response(
+        status_code=200,
+        request=mock.Mock(),
+        json={"access_token": "a", "expires_in": 3599},
+    )
+
+    with mock.patch.object(httpx.Client, "post") as mock_post:
+        with mock.patch.object(Tokens, "write"), mock.patch("time.sleep"):
+            mock_post.side_effect = [unavailable, valid]
+
+            client.refresh_access_token()
+            assert mock_post.call_count == 2
+            assert client._tokens.access_token == "a"
+
+
+def test_quota_must_match_project(secrets):
+    with pytest.raises(ValueError) as exc:
+        Analytics(secrets, quota=Quota("another-project"))
+    assert str(exc.value) == (
+        f"quota belongs to project another-project, not {secrets.project_id}"
+    )
+
+
+def test_retrieve_rate_limited_and_counted(client, request_data, tokens):
+    client._tokens = tokens
+    client.rate_limiter = RateLimiter(10, burst=5)
+    client.quota = Quota(client.secrets.project_id, budget=2)
+
+    with mock.patch.object(httpx.Client, "get") as mock_get:
+        with mock.patch.object(
+            RateLimiter, "acquire", wraps=client.rate_limiter.acquire
+        ) as mock_acquire:
+            mock_get.return_value = httpx.Response(
+                status_code=200, request=mock.Mock(), json=request_data
+            )
+            kwargs = {
+                "dimensions": ("day",),
+                "skip_update_check": True,
+                "skip_refresh_check": True,
+            }
+
+            client.retrieve(**kwargs)
+            client.retrieve(metrics=("views",), **kwargs)
+            assert mock_acquire.call_count == 2
+            assert client.quota.used == 2
+
+            with pytest.raises(QuotaExceeded):
+                client.retrieve(metrics=("likes",), **kwargs)
+            assert mock_get.call_count == 2
+
+
+def test_update_check_runs_in_background(client, version_cache):
+    with mock.patch.object(httpx.Client, "get") as mock_get:
+        mock_get.return_value = httpx.Response(
+            status_code=200,
+            request=mock.Mock(),
+            json={"info": {"version": "9999.9.9"}},
+        )
+
+        client._start_update_check()
+        client._update_thread.join()
+        mock_get.assert_called_once()
+        assert updates.read_cached() == "9999.9.9"
+
+        # Further checks on any client are served from the cache.
+        other = Analytics(client.secrets)
+        other._start_update_check()
+        other._update_thread.join()
+        mock_get.assert_called_once()
+
+
+def test_update_check_failure_in_background(client, version_cache):
+    with mock.patch.object(httpx.Client, "get") as mock_get:
+        mock_get.side_effect = httpx.ConnectError("Connection refused")
+
+        client._start_update_check()
+        client._update_thread.join()
+        assert client._checked_for_update
+        assert not version_cache.exists()
+
+
+def test_update_check_disabled(client, monkeypatch):
+    monkeypatch.setenv(updates.DISABLE_ENV_VAR, "1")
+
+    with mock.patch.object(Analytics, "check_for_updates") as mock_check:
+        client._start_update_check()
+        assert client._checked_for_update
+        assert client._update_thread is None
+        mock_check.assert_not_called()
+
+
+def test_refresh_uses_tokens_refreshed_elsewhere(client, tokens, tmp_path):
+    path = tmp_path / "tokens.json"
+    tokens.write(path)
+    client.authorise(token_path=path)
+
+    # Another process refreshes the tokens first.
+    refreshed = Tokens.from_data({**tokens.to_dict(), "access_token": "a"})
+    refreshed.expires_at = time.time() + 3600
+    FileTokenStore(path).save(refreshed)
+
+    with mock.patch.object(httpx.Client, "post") as mock_post:
+        client.refresh_access_token()
+        mock_post.assert_not_called()
+
+    assert client._tokens.access_token == "a"
+
+
+def test_refresh_saves_to_token_store(client, tokens, tmp_path):
+    store = FileTokenStore(tmp_path / "tokens.json")
+    store.save(tokens)
+    client.token_store = store
+    client.authorise()
+
+    with mock.patch.object(httpx.Client, "post") as mock_post:
+        mock_post.return_value = httpx.Response(
+            status_code=200,
+            request=mock.Mock(),
+            json={"access_token": "a", "expires_in": 3599},
+        )
+
+        client.refresh_access_token()
+        mock_post.assert_called_once()
+
+    assert store.load().access_token == "a"
+
+
+def test_authorise_loads_tokens_saved_while_waiting(client, tokens, tmp_path):
+    path = tmp_path / "tokens.json"
+    load = FileTokenStore.load
+
+    def load_after_first(store):
+        # Another process authorises while this one waits for the lock.
+        if mock_load.call_count > 1 and not path.exists():
+            tokens.write(path)
+        return load(store)
+
+    with mock.patch.object(
+        FileTokenStore, "load", autospec=True, side_effect=load_after_first
+    ) as mock_load:
+        with mock.patch.object(Analytics, "_retrieve_tokens") as mock_retrieve:
+            client.authorise(token_path=path)
+            mock_retrieve.assert_not_called()
+
+    assert client._tokens == tokens
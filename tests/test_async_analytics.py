@@ -28,11 +28,14 @@
 
 from __future__ import annotations
 
+import asyncio
 import builtins
 import datetime as dt
 import json
+import logging
 import os
 import shutil
+import time
 import typing as t
 
 import httpx
@@ -40,12 +43,16 @@ import mock
 import pytest
 import pytest_asyncio
 
-from analytix import AsyncAnalytics
-from analytix.errors import APIError, AuthenticationError
-from analytix.report_types import TimeBasedActivity
+from analytix import AsyncAnalytics, updates
+from analytix.caching import DiskCache, MemoryCache
+from analytix.errors import APIError, AuthenticationError, InvalidMetrics, QuotaExceeded
+from analytix.limits import Quota, RateLimiter
+from analytix.report_types import TimeBasedActivity, TopVideosRegional
+from analytix.reports import Report
+from analytix.retries import RetryPolicy
 from analytix.secrets import Secrets
-from analytix.tokens import Tokens
-from analytix.webserver import Server
+from analytix.tokens import FileTokenStore, Tokens
+from analytix.webserver import AsyncServer
 from tests.paths import JSON_OUTPUT_PATH, MOCK_DATA_PATH
 from tests.test_secrets import SECRETS_PATH, secrets, secrets_dict  # noqa
 from tests.test_tokens import TOKENS_PATH, tokens, tokens_dict  # noqa
@@ -133,19 +140,19 @@ async def test_authorise_with_tokens_non_path_and_dir(client):
 
 
 async def test_authorise_without_tokens(client, tokens_dict):
-    with mock.patch.object(Server, "handle_request") as mock_req:
+    with mock.patch.object(AsyncServer, "wait_for_code") as mock_req:
         with mock.patch.object(httpx.AsyncClient, "post") as mock_post:
             with mock.patch.object(Tokens, "awrite") as mock_write:
                 mock_write.return_value = None
                 mock_post.return_value = httpx.Response(
                     status_code=200, json=tokens_dict, request=mock.Mock()
                 )
-                mock_req.return_value = None
+                mock_req.return_value = "code"
 
                 tokens = await client.authorise(token_path=TOKENS_PATH, force=True)
 
                 mock_post.assert_called_once()
-                mock_req.assert_called_once()
+                mock_req.assert_awaited_once()
                 mock_write.assert_called_once()
                 assert isinstance(tokens, Tokens)
 
@@ -215,8 +222,8 @@ async def test_retrieve_token_refresh_token_failure(client, tokens):
 
         client._tokens = tokens
 
-        with mock.patch.object(Server, "handle_request") as mock_req:
-            mock_req.return_value = None
+        with mock.patch.object(AsyncServer, "wait_for_code") as mock_req:
+            mock_req.return_value = "code"
 
             # If we get here, refreshing failed, and we can also test
             # retrieval failure.
@@ -309,6 +316,13 @@ async def test_update_check_failure(client):
         assert latest is None
 
 
+@pytest.fixture(autouse=True)
+def version_cache(tmp_path, monkeypatch):
+    path = tmp_path / "latest_version.json"
+    monkeypatch.setattr(updates, "VERSION_CACHE_PATH", path)
+    return path
+
+
 @pytest.fixture()
 def request_data():
     with open(MOCK_DATA_PATH) as f:
@@ -337,6 +351,23 @@ async def test_retrieve(client, request_data, tokens):
         assert isinstance(report.type, TimeBasedActivity)
 
 
+async def test_retrieve_logs_payload_summary(client, request_data, tokens, caplog):
+    caplog.set_level(logging.DEBUG, logger="analytix")
+
+    with mock.patch.object(httpx.AsyncClient, "get") as mock_get:
+        client._tokens = tokens
+        resp = httpx.Response(status_code=200, request=mock.Mock(), json=request_data)
+        mock_get.return_value = resp
+
+        await client.retrieve(
+            dimensions=("day",), skip_update_check=True, skip_refresh_check=True
+        )
+
+    rows = len(request_data["rows"])
+    assert f"Retrieved {rows} row(s) ({len(resp.content)} bytes) in" in caplog.text
+    assert request_data["rows"][0][0] not in caplog.text
+
+
 async def test_retrieve_version_check(client, request_data, tokens):
     with mock.patch.object(httpx.AsyncClient, "get") as mock_get:
         client._tokens = tokens
@@ -348,7 +379,7 @@ async def test_retrieve_version_check(client, request_data, tokens):
         )
 
         with mock.patch.object(AsyncAnalytics, "check_for_updates") as mock_check:
-            mock_check.return_value == "9999.9.9"
+            mock_check.return_value = "9999.9.9"
 
             report = await client.retrieve(
                 dimensions=("day",),
@@ -356,6 +387,8 @@ async def test_retrieve_version_check(client, request_data, tokens):
                 end_date=dt.date(2022, 1, 31),
                 skip_refresh_check=True,
             )
+            await client._update_task
+            mock_check.assert_awaited_once()
             mock_get.assert_called_once()
             assert report.data == request_data
             assert isinstance(report.type, TimeBasedActivity)
@@ -469,3 +502,788 @@ async def test_retrieve_with_no_authorisation(client, tokens, request_data):
 
             mock_auth.assert_called_once()
             mock_get.assert_called_once()
+
+
+async def test_retrieve_many(client, request_data, tokens):
+    with mock.patch.object(httpx.AsyncClient, "get") as mock_get:
+        client._tokens = tokens
+
+        mock_get.return_value = httpx.Response(
+            status_code=200,
+            request=mock.Mock(),
+            json=request_data,
+        )
+
+        with mock.patch.object(AsyncAnalytics, "needs_refresh") as mock_check:
+            mock_check.return_value = False
+
+            reports = await client.retrieve_many(
+                [
+                    {
+                        "dimensions": ("day",),
+                        "start_date": dt.date(2022, 1, 1),
+                        "end_date": dt.date(2022, 1, 31),
+                    },
+                    {"dimensions": ("day",), "metrics": ("does-not-exist",)},
+                    {
+                        "dimensions": ("day",),
+                        "start_date": dt.date(2022, 2, 1),
+                        "end_date": dt.date(2022, 2, 28),
+                    },
+                ],
+                max_concurrency=2,
+                skip_update_check=True,
+            )
+
+            mock_check.assert_awaited_once()
+            assert mock_get.await_count == 2
+
+    assert len(reports) == 3
+    assert reports[0].data == request_data
+    assert isinstance(reports[0].type, TimeBasedActivity)
+    assert isinstance(reports[1], InvalidMetrics)
+    assert reports[2].data == request_data
+
+
+async def test_retrieve_many_collects_api_errors(client, request_data, tokens):
+    with mock.patch.object(httpx.AsyncClient, "get") as mock_get:
+        client._tokens = tokens
+
+        mock_get.side_effect = [
+            httpx.Response(
+                status_code=403,
+                request=mock.Mock(),
+                json={"error": {"code": 403, "message": "Forbidden"}},
+            ),
+            httpx.Response(status_code=200, request=mock.Mock(), json=request_data),
+        ]
+
+        reports = await client.retrieve_many(
+            [{"dimensions": ("day",)}, {"dimensions": ("day",)}],
+            max_concurrency=1,
+            skip_update_check=True,
+            skip_refresh_check=True,
+        )
+
+    assert isinstance(reports[0], APIError)
+    assert str(reports[0]) == "API returned 403: Forbidden"
+    assert reports[1].data == request_data
+
+
+async def test_retrieve_many_all_invalid(client):
+    with mock.patch.object(AsyncAnalytics, "authorise") as mock_auth:
+        reports = await client.retrieve_many(
+            [{"metrics": ("does-not-exist",)}, {"dimensions": "day", "oops": 1}],
+            skip_update_check=True,
+        )
+
+        mock_auth.assert_not_called()
+
+    assert isinstance(reports[0], InvalidMetrics)
+    assert isinstance(reports[1], TypeError)
+
+
+async def test_retrieve_many_invalid_concurrency(client):
+    with pytest.raises(ValueError) as exc:
+        await client.retrieve_many([], max_concurrency=0)
+    assert str(exc.value) == "the maximum concurrency should be positive"
+
+
+async def test_retrieve_sharded(client, request_data, tokens):
+    with mock.patch.object(httpx.AsyncClient, "get") as mock_get:
+        client._tokens = tokens
+
+        mock_get.return_value = httpx.Response(
+            status_code=200,
+            request=mock.Mock(),
+            json=request_data,
+        )
+
+        report = await client.retrieve(
+            dimensions=("day",),
+            start_date=dt.date(2022, 1, 1),
+            end_date=dt.date(2022, 1, 20),
+            skip_update_check=True,
+            skip_refresh_check=True,
+            shard_by="week",
+            max_concurrency=2,
+        )
+
+        assert mock_get.await_count == 3
+        urls = [c.args[0] for c in mock_get.call_args_list]
+        assert "startDate=2022-01-01&endDate=2022-01-07" in urls[0]
+        assert "startDate=2022-01-08&endDate=2022-01-14" in urls[1]
+        assert "startDate=2022-01-15&endDate=2022-01-20" in urls[2]
+
+    assert report.rows == request_data["rows"] * 3
+    assert isinstance(report.type, TimeBasedActivity)
+
+
+async def test_retrieve_sharded_invalid_concurrency(client, tokens):
+    client._tokens = tokens
+
+    with pytest.raises(ValueError) as exc:
+        await client.retrieve(
+            dimensions=("day",),
+            skip_update_check=True,
+            skip_refresh_check=True,
+            shard_by="week",
+            max_concurrency=0,
+        )
+    assert str(exc.value) == "the maximum concurrency should be positive"
+
+
+def _page(request_data, rows):
+    return httpx.Response(
+        status_code=200,
+        request=mock.Mock(),
+        json={**request_data, "rows": (request_data["rows"] * 10)[:rows]},
+    )
+
+
+async def test_retrieve_pages(client, request_data, tokens):
+    with mock.patch.object(httpx.AsyncClient, "get") as mock_get:
+        client._tokens = tokens
+        mock_get.side_effect = [_page(request_data, 200), _page(request_data, 150)]
+
+        pages = [
+            page
+            async for page in client.retrieve_pages(
+                dimensions=("video",),
+                sort_options=("-views",),
+                skip_update_check=True,
+                skip_refresh_check=True,
+            )
+        ]
+
+        assert [p.shape[0] for p in pages] == [200, 150]
+        urls = [c.args[0] for c in mock_get.call_args_list]
+        assert "maxResults=200" in urls[0] and "startIndex=1&" in urls[0]
+        assert "maxResults=200" in urls[1] and "startIndex=201&" in urls[1]
+
+    report = Report.concat(pages)
+    assert report.shape[0] == 350
+    assert isinstance(report.type, TopVideosRegional)
+
+
+async def test_retrieve_pages_row_limit(client, request_data, tokens):
+    with mock.patch.object(httpx.AsyncClient, "get") as mock_get:
+        client._tokens = tokens
+        mock_get.side_effect = [_page(request_data, 200), _page(request_data, 200)]
+
+        pages = [
+            page
+            async for page in client.retrieve_pages(
+                dimensions=("video",),
+                sort_options=("-views",),
+                row_limit=400,
+                skip_update_check=True,
+                skip_refresh_check=True,
+            )
+        ]
+
+        # A full final page should not trigger another request.
+        assert mock_get.await_count == 2
+        assert [p.shape[0] for p in pages] == [200, 200]
+
+
+async def test_needs_refresh_local(client, tokens):
+    client._tokens = tokens
+    tokens.expires_at = time.time() + 3600
+
+    with mock.patch.object(httpx.AsyncClient, "get") as mock_get:
+        assert not await client.needs_refresh()
+        client.refresh_margin = 3600
+        assert await client.needs_refresh()
+        mock_get.assert_not_called()
+
+
+async def test_needs_refresh_records_expiry(client, tokens):
+    client._tokens = tokens
+
+    with mock.patch.object(httpx.AsyncClient, "get") as mock_get:
+        mock_get.return_value = httpx.Response(
+            status_code=200, request=mock.Mock(), json={"expires_in": "3000"}
+        )
+
+        assert not await client.needs_refresh()
+        assert not await client.needs_refresh()
+        mock_get.assert_awaited_once()
+        assert tokens.expires_at == pytest.approx(time.time() + 3000, abs=5)
+
+
+async def test_retrieve_rejected_token(client, request_data, tokens):
+    client._tokens = tokens
+    tokens.expires_at = time.time() + 3600
+    unauthorised = httpx.Response(
+        status_code=401,
+        request=mock.Mock(),
+        json={"error": {"code": 401, "message": "Unauthorised"}},
+    )
+    ok = httpx.Response(status_code=200, request=mock.Mock(), json=request_data)
+
+    with mock.patch.object(httpx.AsyncClient, "get") as mock_get:
+        with mock.patch.object(AsyncAnalytics, "refresh_access_token") as mock_refresh:
+            mock_get.side_effect = [unauthorised, mock.Mock(is_error=True), ok]
+
+            report = await client.retrieve(dimensions=("day",), skip_update_check=True)
+            mock_refresh.assert_awaited_once()
+            assert mock_get.await_count == 3
+            assert report.data == request_data
+
+
+async def test_retrieve_cached(client, request_data, tokens, tmp_path):
+    client._tokens = tokens
+    client.cache = DiskCache(tmp_path, namespace="test")
+
+    with mock.patch.object(httpx.AsyncClient, "get") as mock_get:
+        mock_get.return_value = httpx.Response(
+            status_code=200, request=mock.Mock(), json=request_data
+        )
+
+        for _ in range(2):
+            report = await client.retrieve(
+                dimensions=("day",),
+                start_date=dt.date(2022, 1, 1),
+                end_date=dt.date(2022, 1, 31),
+                skip_update_check=True,
+                skip_refresh_check=True,
+            )
+            assert report.data == request_data
+
+        mock_get.assert_awaited_once()
+
+
+async def test_retrieve_memory_cached(client, request_data, tokens):
+    client._tokens = tokens
+    client.cache = MemoryCache()
+
+    with mock.patch.object(httpx.AsyncClient, "get") as mock_get:
+        mock_get.return_value = httpx.Response(
+            status_code=200, request=mock.Mock(), json=request_data
+        )
+
+        reports = [
+            await client.retrieve(
+                dimensions=("day",),
+                skip_update_check=True,
+                skip_refresh_check=True,
+            )
+            for _ in range(3)
+        ]
+
+        mock_get.assert_awaited_once()
+        assert reports[0] is reports[1] is reports[2]
+        assert client.cache.stats.hits == 2
+        assert client.cache.stats.misses == 1
+
+
+async def test_retrieve_coalesces_identical_requests(client, request_data, tokens):
+    client._tokens = tokens
+
+    async def slow_get(*args, **kwargs):
+        await asyncio.sleep(0.05)
+        return httpx.Response(status_code=200, request=mock.Mock(), json=request_data)
+
+    with mock.patch.object(httpx.AsyncClient, "get") as mock_get:
+        mock_get.side_effect = slow_get
+        kwargs = {
+            "dimensions": ("day",),
+            "skip_update_check": True,
+            "skip_refresh_check": True,
+        }
+
+        reports = await asyncio.gather(
+            *(client.retrieve(**kwargs) for _ in range(5)),
+            client.retrieve(metrics=("views",), **kwargs),
+        )
+
+        assert mock_get.await_count == 2
+        assert client.coalesced_requests == 4
+        assert all(r is reports[0] for r in reports[:5])
+        assert not client._inflight
+
+
+async def test_retrieve_coalesces_exceptions(client, tokens):
+    client._tokens = tokens
+
+    async def slow_get(*args, **kwargs):
+        await asyncio.sleep(0.05)
+        return httpx.Response(
+            status_code=403,
+            request=mock.Mock(),
+            json={"error": {"code": 403, "message": "Forbidden"}},
+        )
+
+    with mock.patch.object(httpx.AsyncClient, "get") as mock_get:
+        mock_get.side_effect = slow_get
+
+        results = await client.retrieve_many(
+            [{"dimensions": ("day",)}] * 3,
+            skip_update_check=True,
+            skip_refresh_check=True,
+        )
+
+        mock_get.assert_awaited_once()
+        assert client.coalesced_requests == 2
+        assert all(isinstance(r, APIError) for r in results)
+        assert results[0] is results[1] is results[2]
+
+
+async def test_retrieve_coalesced_caller_cancelled(client, request_data, tokens):
+    client._tokens = tokens
+
+    async def slow_get(*args, **kwargs):
+        await asyncio.sleep(0.05)
+        return httpx.Response(status_code=200, request=mock.Mock(), json=request_data)
+
+    with mock.patch.object(httpx.AsyncClient, "get") as mock_get:
+        mock_get.side_effect = slow_get
+        kwargs = {"skip_update_check": True, "skip_refresh_check": True}
+
+        leader = asyncio.ensure_future(client.retrieve(**kwargs))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(client.retrieve(**kwargs))
+        await asyncio.sleep(0.01)
+        follower.cancel()
+
+        report = await leader
+        assert report.data == request_data
+        assert follower.cancelled()
+        mock_get.assert_awaited_once()
+
+
+async def test_retrieve_coalesced_leader_cancelled(client, request_data, tokens):
+    client._tokens = tokens
+
+    async def slow_get(*args, **kwargs):
+        await asyncio.sleep(0.05)
+        return httpx.Response(status_code=200, request=mock.Mock(), json=request_data)
+
+    with mock.patch.object(httpx.AsyncClient, "get") as mock_get:
+        mock_get.side_effect = slow_get
+        kwargs = {"skip_update_check": True, "skip_refresh_check": True}
+
+        leader = asyncio.ensure_future(client.retrieve(**kwargs))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(client.retrieve(**kwargs))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+
+        report = await follower
+        assert report.data == request_data
+        assert leader.cancelled()
+        assert client.coalesced_requests == 1
+        mock_get.assert_awaited_once()
+        assert not client._inflight
+
+
+async def test_retrieve_coalesced_all_callers_cancelled(client, tokens):
+    client._tokens = tokens
+    started = asyncio.Event()
+    finished = []
+
+    async def slow_get(*args, **kwargs):
+        started.set()
+        await asyncio.sleep(1)
+        finished.append(True)
+
+    with mock.patch.object(httpx.AsyncClient, "get") as mock_get:
+        mock_get.side_effect = slow_get
+        kwargs = {"skip_update_check": True, "skip_refresh_check": True}
+
+        callers = [asyncio.ensure_future(client.retrieve(**kwargs)) for _ in range(2)]
+        await started.wait()
+        for caller in callers:
+            caller.cancel()
+
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert not finished
+        assert not client._inflight
+
+
+async def test_retrieve_retries_transient_errors(client, request_data, tokens):
+    client._tokens = tokens
+    attempts = []
+    client.retry_policy = RetryPolicy(on_attempt=attempts.append)
+    unavailable = httpx.Response(
+        status_code=503,
+        request=mock.Mock(),
+        headers={"Retry-After": "1"},
+        json={"error": {"code": 503, "message": "Unavailable"}},
+    )
+    valid = httpx.Response(status_code=200, request=mock.Mock(), json=request_data)
+
+    with mock.patch.object(httpx.AsyncClient, "get") as mock_get:
+        with mock.patch.object(asyncio, "sleep") as mock_sleep:
+            mock_get.side_effect = [unavailable, valid]
+
+            report = await client.retrieve(
+                dimensions=("day",), skip_update_check=True, skip_refresh_check=True
+            )
+            assert report.data == request_data
+            assert mock_get.await_count == 2
+            mock_sleep.assert_awaited_once_with(1.0)
+            assert [a.status_code for a in attempts] == [503, 200]
+
+
+async def test_retrieve_does_not_retry_bad_requests(client, tokens):
+    client._tokens = tokens
+    bad_request = httpx.Response(
+        status_code=400,
+        request=mock.Mock(),
+        json={"error": {"code": 400, "message": "Bad request"}},
+    )
+
+    with mock.patch.object(httpx.AsyncClient, "get") as mock_get:
+        mock_get.return_value = bad_request
+
+        with pytest.raises(APIError) as exc:
+            await client.retrieve(
+                dimensions=("day",), skip_update_check=True, skip_refresh_check=True
+            )
+        assert str(exc.value) == "API returned 400: Bad request"
+        mock_get.assert_awaited_once()
+
+
+async def test_refresh_access_token_retries_transient_errors(client, tokens):
+    client._tokens = tokens
+    unavailable = httpx.Response(status_code=503, request=mock.Mock())
+    valid = httpx.Response(
+        status_code=200,
+        request=mock.Mock(),
+        json={"access_token": "a", "expires_in": 3599},
+    )
+
+    with mock.patch.object(httpx.AsyncClient, "post") as mock_post:
+        with mock.patch.object(Tokens, "awrite"):
+            with mock.patch.object(asyncio, "sleep"):
+                mock_post.side_effect = [unavailable, valid]
+
+                await client.refresh_access_token()
+                assert mock_post.await_count == 2
+                assert client._tokens.access_token == "a"
+
+
+def test_quota_must_match_project(secrets):
+    with pytest.raises(ValueError) as exc:
+        AsyncAnalytics(secrets, quota=Quota("another-project"))
+    assert str(exc.value) == (
+        f"quota belongs to project another-project, not {secrets.project_id}"
+    )
+
+
+async def test_retrieve_rate_limited_and_counted(client, request_data, tokens):
+    client._tokens = tokens
+    client.rate_limiter = RateLimiter(10, burst=5)
+    client.quota = Quota(client.secrets.project_id, budget=2)
+
+    with mock.patch.object(httpx.AsyncClient, "get") as mock_get:
+        with mock.patch.object(
+            RateLimiter, "aacquire", wraps=client.rate_limiter.aacquire
+        ) as mock_acquire:
+            mock_get.return_value = httpx.Response(
+                status_code=200, request=mock.Mock(), json=request_data
+            )
+            kwargs = {
+                "dimensions": ("day",),
+                "skip_update_check": True,
+                "skip_refresh_check": True,
+            }
+
+            await client.retrieve(**kwargs)
+            await client.retrieve(metrics=("views",), **kwargs)
+            assert mock_acquire.await_count == 2
+            assert client.quota.used == 2
+
+            with pytest.raises(QuotaExceeded):
+                await client.retrieve(metrics=("likes",), **kwargs)
+            assert mock_get.await_count == 2
+
+
+async def test_retrieve_refreshes_once_for_concurrent_callers(
+    client, request_data, tokens
+):
+    client._tokens = tokens
+    tokens.expires_at = time.time() - 1
+
+    async def slow_post(*args, **kwargs):
+        await asyncio.sleep(0.05)
+        return httpx.Response(
+            status_code=200,
+            request=mock.Mock(),
+            json={"access_token": "a", "expires_in": 3599},
+        )
+
+    with mock.patch.object(httpx.AsyncClient, "post") as mock_post:
+        with mock.patch.object(httpx.AsyncClient, "get") as mock_get:
+            with mock.patch.object(Tokens, "awrite") as mock_write:
+                mock_post.side_effect = slow_post
+                mock_get.return_value = httpx.Response(
+                    status_code=200, request=mock.Mock(), json=request_data
+                )
+
+                await asyncio.gather(
+                    *(
+                        client.retrieve(
+                            dimensions=("day",),
+                            max_results=i,
+                            sort_options=("-views",),
+                            skip_update_check=True,
+                        )
+                        for i in range(1, 51)
+                    )
+                )
+
+                mock_post.assert_awaited_once()
+                mock_write.assert_awaited_once()
+                assert mock_get.await_count == 50
+                assert client._tokens.access_token == "a"
+
+
+async def test_refresh_access_token_single_flight(client, tokens):
+    client._tokens = tokens
+
+    async def slow_post(*args, **kwargs):
+        await asyncio.sleep(0.05)
+        return httpx.Response(
+            status_code=200,
+            request=mock.Mock(),
+            json={"access_token": "a", "expires_in": 3599},
+        )
+
+    with mock.patch.object(httpx.AsyncClient, "post") as mock_post:
+        with mock.patch.object(Tokens, "awrite") as mock_write:
+            mock_post.side_effect = slow_post
+
+            await asyncio.gather(*(client.refresh_access_token() for _ in range(10)))
+            mock_post.assert_awaited_once()
+            mock_write.assert_awaited_once()
+
+            await client.refresh_access_token()
+            assert mock_post.await_count == 2
+
+
+async def test_auto_refresh(client, tokens):
+    client.auto_refresh = True
+    client.refresh_margin = 0.5
+    tokens.expires_at = time.time() + 1.05
+
+    with mock.patch.object(httpx.AsyncClient, "post") as mock_post:
+        with mock.patch.object(AsyncAnalytics, "_try_load_tokens") as mock_load:
+            with mock.patch.object(Tokens, "awrite"):
+                mock_load.return_value = tokens
+                mock_post.return_value = httpx.Response(
+                    status_code=200,
+                    request=mock.Mock(),
+                    json={"access_token": "a", "expires_in": 3599},
+                )
+
+                await client.authorise()
+                task = client._refresh_task
+                assert task is not None and not task.done()
+
+                await asyncio.sleep(0.2)
+                mock_post.assert_awaited_once()
+                assert client._tokens.access_token == "a"
+                assert not await client.needs_refresh()
+
+                await client.close_session()
+                assert task.cancelled()
+                assert client._refresh_task is None
+
+
+async def test_auto_refresh_margin_longer_than_lifetime(client, tokens):
+    client.auto_refresh = True
+    client.refresh_margin = 3600
+    tokens.expires_at = time.time() + 3599
+
+    with mock.patch.object(httpx.AsyncClient, "post") as mock_post:
+        with mock.patch.object(AsyncAnalytics, "_try_load_tokens") as mock_load:
+            with mock.patch.object(Tokens, "awrite"):
+                mock_load.return_value = tokens
+                mock_post.return_value = httpx.Response(
+                    status_code=200,
+                    request=mock.Mock(),
+                    json={"access_token": "a", "expires_in": 3599},
+                )
+
+                await client.authorise()
+                await asyncio.sleep(0.2)
+                mock_post.assert_awaited_once()
+                assert not client._refresh_task.done()
+
+                await client.close_session()
+
+
+async def test_auto_refresh_does_not_reauthorise(client, tokens):
+    client.auto_refresh = True
+    client.refresh_margin = 0.5
+    tokens.expires_at = time.time() + 1.05
+
+    with mock.patch.object(httpx.AsyncClient, "post") as mock_post:
+        with mock.patch.object(AsyncAnalytics, "_try_load_tokens") as mock_load:
+            with mock.patch.object(AsyncAnalytics, "_retrieve_tokens") as mock_auth:
+                mock_load.return_value = tokens
+                mock_post.return_value = httpx.Response(
+                    status_code=400,
+                    request=mock.Mock(),
+                    json={"error": "invalid_grant", "error_description": "expired"},
+                )
+
+                await client.authorise()
+                task = client._refresh_task
+                await asyncio.wait_for(task, 1)
+
+                mock_post.assert_awaited_once()
+                mock_auth.assert_not_awaited()
+                assert task.exception() is None
+                await client.close_session()
+
+
+async def test_refresh_joining_background_refresh_reauthorises(client, tokens):
+    client._tokens = tokens
+    new_tokens = Tokens.from_data({**tokens.to_dict(), "access_token": "new"})
+
+    async def slow_post(*args, **kwargs):
+        await asyncio.sleep(0.05)
+        return httpx.Response(
+            status_code=400,
+            request=mock.Mock(),
+            json={"error": "invalid_grant", "error_description": "expired"},
+        )
+
+    with mock.patch.object(httpx.AsyncClient, "post") as mock_post:
+        with mock.patch.object(AsyncAnalytics, "_retrieve_tokens") as mock_auth:
+            with mock.patch.object(Tokens, "awrite"):
+                mock_post.side_effect = slow_post
+                mock_auth.return_value = new_tokens
+
+                background = asyncio.ensure_future(
+                    client._shared_refresh(8080, reauthorise=False)
+                )
+                await asyncio.sleep(0)
+                await client.refresh_access_token()
+
+                with pytest.raises(AuthenticationError):
+                    await background
+                mock_auth.assert_awaited_once()
+                assert client._tokens.access_token == "new"
+
+
+async def test_no_auto_refresh_by_default(client, tokens):
+    with mock.patch.object(AsyncAnalytics, "_try_load_tokens") as mock_load:
+        mock_load.return_value = tokens
+        await client.authorise()
+        assert client._refresh_task is None
+
+
+async def test_update_check_runs_in_background(client, version_cache):
+    with mock.patch.object(httpx.AsyncClient, "get") as mock_get:
+        mock_get.return_value = httpx.Response(
+            status_code=200,
+            request=mock.Mock(),
+            json={"info": {"version": "9999.9.9"}},
+        )
+
+        client._start_update_check()
+        await client._update_task
+        mock_get.assert_called_once()
+        assert updates.read_cached() == "9999.9.9"
+
+        # Further checks on any client are served from the cache.
+        other = AsyncAnalytics(client.secrets)
+        other._start_update_check()
+        await other._update_task
+        mock_get.assert_called_once()
+
+
+async def test_update_check_failure_in_background(client, version_cache):
+    with mock.patch.object(httpx.AsyncClient, "get") as mock_get:
+        mock_get.side_effect = httpx.ConnectError("Connection refused")
+
+        client._start_update_check()
+        await client._update_task
+        assert client._checked_for_update
+        assert not version_cache.exists()
+
+
+async def test_update_check_disabled(client, monkeypatch):
+    monkeypatch.setenv(updates.DISABLE_ENV_VAR, "1")
+
+    with mock.patch.object(AsyncAnalytics, "check_for_updates") as mock_check:
+        client._start_update_check()
+        assert client._checked_for_update
+        assert client._update_task is None
+        mock_check.assert_not_called()
+
+
+async def test_close_session_cancels_update_check(client):
+    async def slow_get(*args, **kwargs):
+        await asyncio.sleep(10)
+
+    with mock.patch.object(httpx.AsyncClient, "get") as mock_get:
+        mock_get.side_effect = slow_get
+
+        client._start_update_check()
+        task = client._update_task
+        await asyncio.sleep(0)
+        await client.close_session()
+        assert task.cancelled()
+
+
+async def test_refresh_uses_tokens_refreshed_elsewhere(client, tokens, tmp_path):
+    path = tmp_path / "tokens.json"
+    tokens.write(path)
+    await client.authorise(token_path=path)
+
+    # Another process refreshes the tokens first.
+    refreshed = Tokens.from_data({**tokens.to_dict(), "access_token": "a"})
+    refreshed.expires_at = time.time() + 3600
+    FileTokenStore(path).save(refreshed)
+
+    with mock.patch.object(httpx.AsyncClient, "post") as mock_post:
+        await client.refresh_access_token()
+        mock_post.assert_not_awaited()
+
+    assert client._tokens.access_token == "a"
+
+
+async def test_refresh_saves_to_token_store(client, tokens, tmp_path):
+    store = FileTokenStore(tmp_path / "tokens.json")
+    store.save(tokens)
+    client.token_store = store
+    await client.authorise()
+
+    with mock.patch.object(httpx.AsyncClient, "post") as mock_post:
+        mock_post.return_value = httpx.Response(
+            status_code=200,
+            request=mock.Mock(),
+            json={"access_token": "a", "expires_in": 3599},
+        )
+
+        await client.refresh_access_token()
+        mock_post.assert_awaited_once()
+
+    assert store.load().access_token == "a"
+
+
+async def test_authorise_loads_tokens_saved_while_waiting(client, tokens, tmp_path):
+    path = tmp_path / "tokens.json"
+    aload = FileTokenStore.aload
+
+    async def load_after_first(store):
+        # Another process authorises while this one waits for the lock.
+        if mock_load.await_count > 1 and not path.exists():
+            tokens.write(path)
+        return await aload(store)
+
+    with mock.patch.object(
+        FileTokenStore, "aload", autospec=True, side_effect=load_after_first
+    ) as mock_load:
+        with mock.patch.object(AsyncAnalytics, "_retrieve_tokens") as mock_retrieve:
+            await client.authorise(token_path=path)
+            mock_retrieve.assert_not_awaited()
+
+    assert client._tokens == tokens
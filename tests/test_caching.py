@@ -0,0 +1,333 @@
+# Copyright (c) 2021-present, Ethan Henderson
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import datetime as dt
+import gzip
+import json
+import math
+import os
+import time
+
+import mock
+import pytest
+
+from analytix.caching import CacheStats, DiskCache, MemoryCache, _estimate_size
+from analytix.queries import Query
+from analytix.report_types import TimeBasedActivity
+from analytix.reports import Report
+from tests.paths import MOCK_DATA_PATH
+
+
+@pytest.fixture()
+def request_data():
+    with open(MOCK_DATA_PATH) as f:
+        return json.load(f)
+
+
+@pytest.fixture()
+def report(request_data):
+    return Report(request_data, TimeBasedActivity())
+
+
+@pytest.fixture()
+def old_query():
+    query = Query(
+        dimensions=["day"],
+        start_date=dt.date(2022, 1, 1),
+        end_date=dt.date(2022, 1, 31),
+    )
+    query.validate()
+    return query
+
+
+@pytest.fixture()
+def recent_query():
+    query = Query(dimensions=["day"])
+    query.validate()
+    return query
+
+
+@pytest.fixture()
+def cache(tmp_path):
+    return DiskCache(tmp_path / "cache", namespace="test")
+
+
+def test_create_directory(tmp_path):
+    cache = DiskCache(str(tmp_path / "a" / "b"), namespace="test")
+    assert cache.path.is_dir()
+
+
+def test_get_missing(cache, old_query):
+    assert cache.get(old_query) is None
+
+
+def test_set_and_get(cache, old_query, report, request_data):
+    cache.set(old_query, report)
+    cached = cache.get(old_query)
+    assert cached.data == request_data
+    assert isinstance(cached.type, TimeBasedActivity)
+
+
+def test_equivalent_queries_share_entries(cache, report):
+    a = Query(filters={"country": "US", "video": "abc"}, metrics=["views"])
+    b = Query(filters={"video": "abc", "country": "US"}, metrics=["views"])
+    cache.set(a, report)
+    assert cache.get(b) is not None
+
+
+def test_entries_are_compressed(cache, old_query, report, request_data):
+    cache.set(old_query, report)
+    (path,) = cache.path.glob("*.json.gz")
+    entry = json.loads(gzip.decompress(path.read_bytes()))
+    assert entry == {"expires_at": None, "data": request_data}
+    assert path.stat().st_size < len(json.dumps(request_data))
+
+
+def test_recent_entries_expire(cache, recent_query, report):
+    cache.set(recent_query, report)
+    assert cache.get(recent_query) is not None
+
+    with mock.patch.object(time, "time", return_value=time.time() + 3601):
+        assert cache.get(recent_query) is None
+
+    assert not list(cache.path.glob("*.json.gz"))
+
+
+def test_corrupt_entry(cache, old_query, report):
+    cache.set(old_query, report)
+    (path,) = cache.path.glob("*.json.gz")
+    path.write_bytes(b"not gzip")
+    assert cache.get(old_query) is None
+    assert not path.exists()
+
+
+def test_evicts_least_recently_used(tmp_path, report):
+    queries = [Query(metrics=["views"], currency=c) for c in ("USD", "GBP", "EUR")]
+    cache = DiskCache(tmp_path, namespace="test")
+    cache.set(queries[0], report)
+    size = next(cache.path.glob("*.json.gz")).stat().st_size
+    # Sizes vary slightly with the expiry time, so leave some headroom.
+    cache.max_size = size * 2 + size // 2
+
+    cache.set(queries[1], report)
+    for i, path in enumerate(sorted(cache.path.glob("*.json.gz"))):
+        os.utime(path, (i, i))
+    assert cache.get(queries[0]) is not None
+
+    cache.set(queries[2], report)
+    assert cache.get(queries[0]) is not None
+    assert cache.get(queries[1]) is None
+    assert cache.get(queries[2]) is not None
+
+
+def test_namespaces_are_isolated(tmp_path, old_query, report):
+    first = DiskCache(tmp_path, namespace="first")
+    second = DiskCache(tmp_path, namespace="second")
+    first.set(old_query, report)
+
+    assert first.get(old_query) is not None
+    assert second.get(old_query) is None
+    assert first.path == tmp_path / "first"
+
+    second.clear()
+    assert first.get(old_query) is not None
+
+
+@pytest.mark.parametrize("namespace", ["", ".", "..", "a/b", "a b"])
+def test_invalid_namespace(tmp_path, namespace):
+    with pytest.raises(ValueError) as exc:
+        DiskCache(tmp_path, namespace=namespace)
+    assert str(exc.value) == f"invalid cache namespace {namespace!r}"
+
+
+def test_entry_evicted_during_read_is_a_miss(cache, old_query, report):
+    cache.set(old_query, report)
+
+    with mock.patch.object(os, "utime", side_effect=FileNotFoundError):
+        assert cache.get(old_query) is None
+
+    assert cache.stats == CacheStats(hits=0, misses=1, evictions=0)
+
+
+def test_only_scans_when_over_limit(cache, report):
+    queries = [Query(metrics=["views"], currency=c) for c in ("USD", "GBP", "EUR")]
+
+    with mock.patch.object(
+        DiskCache, "_scan", autospec=True, side_effect=DiskCache._scan
+    ) as scan:
+        for query in queries:
+            cache.set(query, report)
+
+    # Only the first write needs to find out what is already cached.
+    assert scan.call_count == 1
+    assert cache._size == sum(p.stat().st_size for p in cache.path.iterdir())
+
+    cache.invalidate(queries[0])
+    assert cache._size == sum(p.stat().st_size for p in cache.path.iterdir())
+
+
+def test_disk_stats(cache, old_query, recent_query, report):
+    cache.set(old_query, report)
+    cache.get(old_query)
+    cache.get(recent_query)
+    assert cache.stats == CacheStats(hits=1, misses=1, evictions=0)
+
+
+def test_invalidate(cache, old_query, report):
+    cache.set(old_query, report)
+    cache.invalidate(old_query)
+    cache.invalidate(old_query)
+    assert cache.get(old_query) is None
+
+
+def test_clear(cache, old_query, recent_query, report):
+    cache.set(old_query, report)
+    cache.set(recent_query, report)
+    cache.clear()
+    assert not list(cache.path.iterdir())
+
+
+async def test_async_set_and_get(cache, old_query, report, request_data):
+    assert await cache.aget(old_query) is None
+    await cache.aset(old_query, report)
+    cached = await cache.aget(old_query)
+    assert cached.data == request_data
+
+
+def test_stats_hit_rate_and_reset():
+    stats = CacheStats(3, 1, 2)
+    assert stats.hit_rate == 0.75
+    stats.reset()
+    assert stats == CacheStats(0, 0, 0)
+    assert stats.hit_rate == 0.0
+
+
+@pytest.fixture()
+def memory_cache():
+    return MemoryCache()
+
+
+def test_memory_get_returns_same_report(memory_cache, old_query, report):
+    assert memory_cache.get(old_query) is None
+    memory_cache.set(old_query, report)
+    assert memory_cache.get(old_query) is report
+    assert memory_cache.stats == CacheStats(hits=1, misses=1, evictions=0)
+    assert len(memory_cache) == 1
+    assert memory_cache.size == _estimate_size(report)
+
+
+def test_memory_evicts_by_entries(report):
+    cache = MemoryCache(max_entries=2)
+    queries = [Query(metrics=["views"], currency=c) for c in ("USD", "GBP", "EUR")]
+    cache.set(queries[0], report)
+    cache.set(queries[1], report)
+    assert cache.get(queries[0]) is report
+
+    cache.set(queries[2], report)
+    assert cache.get(queries[1]) is None
+    assert cache.get(queries[0]) is report
+    assert cache.get(queries[2]) is report
+    assert cache.stats.evictions == 1
+
+
+def test_memory_size_estimate(report):
+    actual = len(json.dumps(report.data, separators=(",", ":")))
+    assert _estimate_size(report) == 36 * (72 + 31 * 8)
+    assert actual / 2 < _estimate_size(report) < actual * 2
+
+
+def test_memory_evicts_by_size(report):
+    size = _estimate_size(report)
+    cache = MemoryCache(max_size=size * 2)
+    queries = [Query(metrics=["views"], currency=c) for c in ("USD", "GBP", "EUR")]
+
+    for query in queries:
+        cache.set(query, report)
+
+    assert len(cache) == 2
+    assert cache.size == size * 2
+    assert cache.get(queries[0]) is None
+
+
+def test_memory_skips_oversized_reports(old_query, report):
+    cache = MemoryCache(max_size=10)
+    cache.set(old_query, report)
+    assert len(cache) == 0
+
+
+def test_memory_oversized_report_replaces_stale_entry(old_query, report):
+    small = Report({**report.data, "rows": report.data["rows"][:1]}, report.type)
+    cache = MemoryCache(max_size=_estimate_size(small) + 10)
+    cache.set(old_query, small)
+    assert cache.get(old_query) is small
+
+    cache.set(old_query, report)
+    assert cache.get(old_query) is None
+    assert len(cache) == 0
+    assert cache.size == 0
+
+
+def test_memory_ttl(old_query, recent_query, report):
+    cache = MemoryCache(ttl=10)
+    cache.set(old_query, report)
+    cache.set(recent_query, report, ttl=math.inf)
+
+    with mock.patch.object(time, "monotonic", return_value=time.monotonic() + 11):
+        assert cache.get(old_query) is None
+        assert cache.get(recent_query) is report
+
+    assert len(cache) == 1
+
+
+def test_memory_no_ttl(old_query, report):
+    cache = MemoryCache(ttl=None)
+    cache.set(old_query, report)
+
+    with mock.patch.object(time, "monotonic", return_value=time.monotonic() + 1e9):
+        assert cache.get(old_query) is report
+
+
+def test_memory_invalidate_and_clear(old_query, recent_query, report):
+    cache = MemoryCache()
+    cache.set(old_query, report)
+    cache.set(recent_query, report)
+
+    cache.invalidate(old_query)
+    cache.invalidate(old_query)
+    assert cache.get(old_query) is None
+    assert len(cache) == 1
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.size == 0
+
+
+async def test_memory_async(old_query, report):
+    cache = MemoryCache()
+    await cache.aset(old_query, report)
+    assert await cache.aget(old_query) is report
@@ -0,0 +1,120 @@
+# Copyright (c) 2021-present, Ethan Henderson
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+
+import mock
+import pytest
+
+import analytix
+from analytix import codecs
+
+DATA = {"kind": "test", "rows": [["2022-01-01", 1, 0.5], ["2022-01-02", 2, 1.5]]}
+
+
+@pytest.fixture(autouse=True)
+def reset_codec():
+    yield
+    codecs.set_codec(None)
+
+
+@pytest.fixture(params=list(codecs.CODECS))
+def codec(request):
+    try:
+        return codecs.CODECS[request.param]()
+    except ImportError:
+        pytest.skip(f"{request.param} is not installed")
+
+
+def test_round_trip(codec):
+    assert codec.loads(codec.dumps(DATA)) == DATA
+    assert codec.loads(codec.dumps(DATA).decode("utf-8")) == DATA
+
+
+def test_compact(codec):
+    assert b" " not in codec.dumps(DATA)
+
+
+@pytest.mark.parametrize("indent", [2, 4])
+def test_indent(codec, indent):
+    text = codec.dumps(DATA, indent=indent).decode("utf-8")
+    assert json.loads(text) == DATA
+    assert "\n" + " " * indent + '"kind"' in text
+
+
+def test_invalid_document(codec):
+    with pytest.raises(ValueError):
+        codec.loads(b'{"kind": ')
+
+
+def test_stdlib_matches_json():
+    codec = codecs.StdlibCodec()
+    assert codec.dumps(DATA, indent=4) == json.dumps(DATA, indent=4).encode("utf-8")
+
+
+def test_detect_falls_back_to_stdlib():
+    with mock.patch.object(analytix, "can_use", return_value=False):
+        assert isinstance(codecs.detect(), codecs.StdlibCodec)
+
+
+def test_detect_skips_broken_packages():
+    with mock.patch.object(analytix, "can_use", return_value=True):
+        with mock.patch.object(codecs.OrjsonCodec, "__init__", side_effect=ImportError):
+            assert not isinstance(codecs.detect(), codecs.OrjsonCodec)
+
+
+def test_detect_prefers_orjson():
+    pytest.importorskip("orjson")
+    assert isinstance(codecs.detect(), codecs.OrjsonCodec)
+
+
+def test_get_codec_is_cached():
+    assert codecs.get_codec() is codecs.get_codec()
+
+
+def test_set_codec_by_name():
+    codecs.set_codec("json")
+    assert isinstance(codecs.get_codec(), codecs.StdlibCodec)
+    assert codecs.loads(codecs.dumps(DATA)) == DATA
+
+
+def test_set_codec_instance():
+    codec = codecs.StdlibCodec()
+    codecs.set_codec(codec)
+    assert codecs.get_codec() is codec
+
+
+def test_set_codec_invalid_name():
+    with pytest.raises(ValueError, match="expected codec to be one of"):
+        codecs.set_codec("simplejson")
+
+
+def test_set_codec_none_redetects():
+    codecs.set_codec("json")
+    codecs.set_codec(None)
+    assert codecs.get_codec().name == codecs.detect().name
@@ -49,6 +49,27 @@ def test_dimensions_every(dimensions_required):
     assert dimensions_required.every in ({"day", "month"}, {"month", "day"})
 
 
+def test_dimensions_every_is_precomputed(dimensions_required):
+    assert dimensions_required.every is dimensions_required.every
+    assert isinstance(dimensions_required.every, frozenset)
+
+
+def test_dimensions_hash_by_value(dimensions_required):
+    same = Dimensions(Required("month", "day"))
+    other = Dimensions(ExactlyOne("day", "month"))
+    assert {dimensions_required: 1}[same] == 1
+    assert dimensions_required != other
+    assert hash(Required("day")) != hash(ExactlyOne("day"))
+
+
+def test_set_types_are_immutable():
+    required = Required("day")
+    with pytest.raises(AttributeError) as exc:
+        required.values = frozenset({"month"})
+    assert str(exc.value) == "cannot reassign 'values' on a set type"
+    assert isinstance(required.values, frozenset)
+
+
 def test_dimensions_invalid(dimensions_required):
     with pytest.raises(errors.InvalidDimensions) as exc:
         dimensions_required.validate(["day", "month", "henlo", "testing"])
@@ -110,6 +110,33 @@ def test_filters_locked_locked(filters_required_locked):
     assert filters_required_locked.locked == {"country": "US"}
 
 
+def test_filters_locked_is_read_only(filters_required_locked):
+    with pytest.raises(TypeError):
+        filters_required_locked.locked["country"] = "GB"
+
+
+def test_filters_derived_views_are_precomputed(filters_required_locked):
+    assert filters_required_locked.every is filters_required_locked.every
+    assert filters_required_locked.every_key is filters_required_locked.every_key
+    assert isinstance(filters_required_locked.every_key, frozenset)
+
+
+def test_filters_are_immutable(filters_required):
+    with pytest.raises(AttributeError) as exc:
+        filters_required.values = frozenset()
+    assert str(exc.value) == "cannot reassign 'values' on a feature type"
+
+    with pytest.raises(AttributeError) as exc:
+        del filters_required.locked
+    assert str(exc.value) == "cannot delete 'locked' on a feature type"
+
+
+def test_filters_hash_by_value(filters_required, filters_required_locked):
+    same = Filters(Required("video", "country"))
+    assert hash(filters_required) == hash(same)
+    assert len({filters_required, same, filters_required_locked}) == 2
+
+
 def test_filters_unsupported_value(filters_required_locked):
     with pytest.raises(errors.UnsupportedFilterValue) as exc:
         filters_required_locked.validate({"country": "GB", "video": "nf94bg4b397gb"})
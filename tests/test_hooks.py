@@ -0,0 +1,290 @@
+# Copyright (c) 2021-present, Ethan Henderson
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import asyncio
+import json
+import time
+
+import httpx
+import mock
+import pytest
+
+from analytix import Analytics, AsyncAnalytics
+from analytix.caching import MemoryCache
+from analytix.hooks import HookGroup, Hooks, RequestEvent, Stopwatch
+from analytix.retries import Attempt
+from analytix.tokens import Tokens
+from tests.paths import MOCK_DATA_PATH, TOKENS_PATH
+from tests.test_secrets import secrets  # noqa
+
+
+class Recorder(Hooks):
+    def __init__(self):
+        self.calls = []
+
+    def _record(self, name, event):
+        self.calls.append((name, event))
+
+    def before_request(self, event):
+        self._record("before_request", event)
+
+    def after_response(self, event):
+        self._record("after_response", event)
+
+    def on_retry(self, event):
+        self._record("on_retry", event)
+
+    def on_refresh(self, event):
+        self._record("on_refresh", event)
+
+    def on_report_built(self, event):
+        self._record("on_report_built", event)
+
+    @property
+    def names(self):
+        return [name for name, _ in self.calls]
+
+
+@pytest.fixture()
+def request_data():
+    with open(MOCK_DATA_PATH) as f:
+        return json.load(f)
+
+
+@pytest.fixture()
+def tokens():
+    tokens = Tokens.from_file(TOKENS_PATH)
+    tokens.expires_at = time.time() + 3600
+    return tokens
+
+
+def response(status_code, **kwargs):
+    return httpx.Response(status_code=status_code, request=mock.Mock(), **kwargs)
+
+
+def test_event_for_query_copies_timings():
+    timings = {"validate": 1.0}
+    event = RequestEvent.for_query(None, timings)
+    event.timings["auth"] = 2.0
+
+    assert timings == {"validate": 1.0}
+    assert event.total == 3.0
+    assert event.status_code is None
+    assert not event.from_cache
+
+
+def test_stopwatch_laps():
+    timings = {}
+    watch = Stopwatch(timings)
+    watch.lap("one")
+    watch.skip()
+    watch.lap("two")
+
+    assert list(timings) == ["one", "two"]
+    assert all(v >= 0 for v in timings.values())
+
+
+def test_base_hooks_do_nothing():
+    event = RequestEvent.for_query(None)
+    hooks = Hooks()
+
+    for name in (
+        "before_request",
+        "after_response",
+        "on_retry",
+        "on_refresh",
+        "on_report_built",
+    ):
+        assert getattr(hooks, name)(event) is None
+
+
+def test_combine():
+    first, second = Recorder(), Recorder()
+    group = HookGroup.combine([first, second])
+
+    assert HookGroup.combine(None).hooks == []
+    assert HookGroup.combine(first).hooks == [first]
+    assert HookGroup.combine(group) is group
+    assert group.hooks == [first, second]
+
+
+def test_group_calls_hooks_in_order():
+    order = []
+
+    class Named(Hooks):
+        def __init__(self, name):
+            self.name = name
+
+        def before_request(self, event):
+            order.append(self.name)
+
+    HookGroup([Named("a"), Named("b")]).before_request(RequestEvent.for_query(None))
+    assert order == ["a", "b"]
+
+
+def test_group_isolates_failing_hooks(caplog):
+    class Broken(Hooks):
+        def after_response(self, event):
+            raise RuntimeError("boom")
+
+    recorder = Recorder()
+    HookGroup([Broken(), recorder]).after_response(RequestEvent.for_query(None))
+
+    assert recorder.names == ["after_response"]
+    assert "failed in after_response: RuntimeError('boom')" in caplog.text
+
+
+def test_retry_callback():
+    recorder = Recorder()
+    event = RequestEvent.for_query(None)
+    attempt = Attempt(1, 0.1, 503, None, 0.5)
+
+    HookGroup([recorder]).retry_callback(event)(attempt)
+
+    assert recorder.calls == [("on_retry", event)]
+    assert event.attempt is attempt
+
+
+def test_retrieve_lifecycle(secrets, tokens, request_data):
+    recorder = Recorder()
+    client = Analytics(secrets, hooks=recorder)
+    client._tokens = tokens
+    unavailable = response(503, json={"error": {"code": 503, "message": "Down"}})
+    valid = response(200, json=request_data)
+
+    with mock.patch.object(httpx.Client, "get", side_effect=[unavailable, valid]):
+        with mock.patch("time.sleep"):
+            report = client.retrieve(dimensions=("day",), skip_update_check=True)
+
+    assert recorder.names == [
+        "before_request",
+        "on_retry",
+        "after_response",
+        "on_report_built",
+    ]
+
+    events = {id(event) for _, event in recorder.calls}
+    assert len(events) == 1
+
+    event = recorder.calls[-1][1]
+    assert event.query.dimensions == ("day",)
+    assert event.status_code == 200
+    assert event.size == len(valid.content)
+    assert event.attempt is None
+    assert event.report is report
+    assert list(event.timings) == ["validate", "auth", "http", "decode", "build"]
+    assert recorder.calls[1][1] is event
+
+
+def test_retrieve_from_cache(secrets, tokens, request_data):
+    recorder = Recorder()
+    client = Analytics(secrets, hooks=[recorder], cache=MemoryCache())
+    client._tokens = tokens
+
+    with mock.patch.object(httpx.Client, "get") as mock_get:
+        mock_get.return_value = response(200, json=request_data)
+        client.retrieve(dimensions=("day",), skip_update_check=True)
+        recorder.calls.clear()
+        client.retrieve(dimensions=("day",), skip_update_check=True)
+
+    assert recorder.names == ["on_report_built"]
+    event = recorder.calls[0][1]
+    assert event.from_cache
+    assert "cache" in event.timings
+    assert event.size is None
+
+
+def test_refresh(secrets, tokens, tmp_path):
+    recorder = Recorder()
+    client = Analytics(secrets, hooks=recorder)
+    client._tokens = tokens
+    client._token_path = tmp_path / "tokens.json"
+    refreshed = response(200, json={"access_token": "new", "expires_in": 3599})
+
+    with mock.patch.object(httpx.Client, "post", return_value=refreshed):
+        client.refresh_access_token()
+
+    assert recorder.names == ["on_refresh"]
+    event = recorder.calls[0][1]
+    assert event.query is None
+    assert event.status_code == 200
+    assert event.size == len(refreshed.content)
+    assert list(event.timings) == ["refresh"]
+
+
+async def test_async_retrieve_lifecycle(secrets, tokens, request_data):
+    recorder = Recorder()
+    client = AsyncAnalytics(secrets, hooks=recorder)
+    client._tokens = tokens
+    unavailable = response(503, json={"error": {"code": 503, "message": "Down"}})
+    valid = response(200, json=request_data)
+
+    with mock.patch.object(httpx.AsyncClient, "get", side_effect=[unavailable, valid]):
+        with mock.patch.object(asyncio, "sleep"):
+            report = await client.retrieve(dimensions=("day",), skip_update_check=True)
+
+    assert recorder.names == [
+        "before_request",
+        "on_retry",
+        "after_response",
+        "on_report_built",
+    ]
+
+    event = recorder.calls[-1][1]
+    assert event.status_code == 200
+    assert event.report is report
+    assert list(event.timings) == ["validate", "auth", "http", "decode", "build"]
+
+
+async def test_async_retrieve_from_cache(secrets, tokens, request_data):
+    recorder = Recorder()
+    client = AsyncAnalytics(secrets, hooks=recorder, cache=MemoryCache())
+    client._tokens = tokens
+
+    with mock.patch.object(httpx.AsyncClient, "get") as mock_get:
+        mock_get.return_value = response(200, json=request_data)
+        await client.retrieve(dimensions=("day",), skip_update_check=True)
+        recorder.calls.clear()
+        await client.retrieve(dimensions=("day",), skip_update_check=True)
+
+    assert recorder.names == ["on_report_built"]
+    assert recorder.calls[0][1].from_cache
+
+
+async def test_async_refresh(secrets, tokens, tmp_path):
+    recorder = Recorder()
+    client = AsyncAnalytics(secrets, hooks=recorder)
+    client._tokens = tokens
+    client._token_path = tmp_path / "tokens.json"
+    refreshed = response(200, json={"access_token": "new", "expires_in": 3599})
+
+    with mock.patch.object(httpx.AsyncClient, "post", return_value=refreshed):
+        await client.refresh_access_token()
+
+    assert recorder.names == ["on_refresh"]
+    assert recorder.calls[0][1].timings.keys() == {"refresh"}
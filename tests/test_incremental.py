@@ -0,0 +1,277 @@
+# Copyright (c) 2021-present, Ethan Henderson
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import datetime as dt
+
+import mock
+import pytest
+
+from analytix import Analytics, AsyncAnalytics
+from analytix.errors import ConcatenationError, InvalidRequest
+from analytix.incremental import IncrementalSync, SyncState, SyncStore
+from analytix.report_types import TimeBasedActivity
+from analytix.reports import Report
+
+HEADERS = [
+    {"name": "day", "columnType": "DIMENSION", "dataType": "STRING"},
+    {"name": "views", "columnType": "METRIC", "dataType": "INTEGER"},
+]
+
+
+def make_report(start, end, views=1):
+    rows = []
+    while start <= end:
+        rows.append([start.isoformat(), views])
+        start += dt.timedelta(days=1)
+    return Report(
+        {
+            "kind": "youtubeAnalytics#resultTable",
+            "columnHeaders": HEADERS,
+            "rows": rows,
+        },
+        TimeBasedActivity(),
+    )
+
+
+def fake_retrieve(views):
+    def retrieve(*, start_date, end_date, **kwargs):
+        return make_report(start_date, end_date, views)
+
+    return retrieve
+
+
+@pytest.fixture()
+def sync(tmp_path):
+    return IncrementalSync(tmp_path / "sync", namespace="channel")
+
+
+@pytest.fixture()
+def template():
+    return {
+        "dimensions": ["day"],
+        "metrics": ["views"],
+        "start_date": dt.date(2022, 1, 1),
+        "end_date": dt.date(2022, 1, 10),
+    }
+
+
+def test_store_create_directory(tmp_path):
+    store = SyncStore(str(tmp_path / "a" / "b"))
+    assert store.path.is_dir()
+
+
+def test_store_load_missing(tmp_path):
+    assert SyncStore(tmp_path).load("abc") is None
+
+
+def test_store_save_and_load(tmp_path):
+    store = SyncStore(tmp_path)
+    state = SyncState(
+        dt.date(2022, 1, 10),
+        make_report(dt.date(2022, 1, 1), dt.date(2022, 1, 10)).data,
+    )
+    store.save("abc", state)
+    assert store.load("abc") == state
+    assert [p.name for p in tmp_path.iterdir()] == ["abc.json"]
+
+
+def test_store_remove(tmp_path):
+    store = SyncStore(tmp_path)
+    store.save("abc", SyncState(dt.date(2022, 1, 10), {}))
+    store.remove("abc")
+    assert store.load("abc") is None
+    store.remove("abc")
+
+
+async def test_store_async_save_and_load(tmp_path):
+    store = SyncStore(tmp_path)
+    state = SyncState(
+        dt.date(2022, 1, 10),
+        make_report(dt.date(2022, 1, 1), dt.date(2022, 1, 10)).data,
+    )
+    await store.asave("abc", state)
+    assert await store.aload("abc") == state
+    assert await store.aload("def") is None
+
+
+def test_negative_restatement_days(tmp_path):
+    with pytest.raises(ValueError, match="should be non-negative"):
+        IncrementalSync(tmp_path, namespace="channel", restatement_days=-1)
+
+
+@pytest.mark.parametrize("namespace", ["", ".", "..", "a/b", "../x"])
+def test_invalid_namespace(tmp_path, namespace):
+    with pytest.raises(ValueError, match="invalid sync namespace"):
+        IncrementalSync(tmp_path, namespace=namespace)
+
+
+def test_key_ignores_dates(sync, template):
+    other = {**template, "start_date": dt.date(2021, 1, 1), "end_date": None}
+    assert sync.key(template) == sync.key(other)
+    assert sync.key(template) != sync.key({**template, "metrics": ["likes"]})
+
+
+def test_requires_day_dimension(sync):
+    client = mock.Mock(spec=Analytics)
+    with pytest.raises(InvalidRequest, match="requires the 'day' dimension"):
+        sync.run(client, {"dimensions": ["month"]})
+    client.retrieve.assert_not_called()
+
+
+def test_rejects_sorted_reports(sync, template):
+    client = mock.Mock(spec=Analytics)
+    with pytest.raises(InvalidRequest, match="cannot be sorted, limited, or offset"):
+        sync.run(client, {**template, "sort_options": ["-views"]})
+    client.retrieve.assert_not_called()
+
+
+def test_first_sync_fetches_full_window(sync, template):
+    client = mock.Mock(spec=Analytics)
+    client.retrieve.side_effect = fake_retrieve(1)
+
+    report = sync.run(client, template, skip_validation=True)
+
+    client.retrieve.assert_called_once_with(
+        dimensions=["day"],
+        metrics=["views"],
+        start_date=dt.date(2022, 1, 1),
+        end_date=dt.date(2022, 1, 10),
+        skip_validation=True,
+    )
+    assert report.shape == (10, 2)
+    assert sync.store.load(sync.key(template)).last_date == dt.date(2022, 1, 10)
+
+
+def test_later_sync_fetches_gap_and_restatement_window(sync, template):
+    client = mock.Mock(spec=Analytics)
+    client.retrieve.side_effect = fake_retrieve(1)
+    sync.run(client, template)
+
+    client.retrieve.side_effect = fake_retrieve(2)
+    report = sync.run(client, {**template, "end_date": dt.date(2022, 1, 15)})
+
+    kwargs = client.retrieve.call_args.kwargs
+    assert kwargs["start_date"] == dt.date(2022, 1, 8)
+    assert kwargs["end_date"] == dt.date(2022, 1, 15)
+    assert report.shape == (15, 2)
+    assert [r[0] for r in report.rows] == [
+        (dt.date(2022, 1, 1) + dt.timedelta(days=i)).isoformat() for i in range(15)
+    ]
+    assert [r[1] for r in report.rows] == [1] * 7 + [2] * 8
+    assert sync.store.load(sync.key(template)).last_date == dt.date(2022, 1, 15)
+
+
+def test_no_restatement_window(tmp_path, template):
+    sync = IncrementalSync(tmp_path, namespace="channel", restatement_days=0)
+    client = mock.Mock(spec=Analytics)
+    client.retrieve.side_effect = fake_retrieve(1)
+    sync.run(client, template)
+    sync.run(client, {**template, "end_date": dt.date(2022, 1, 12)})
+
+    assert client.retrieve.call_args.kwargs["start_date"] == dt.date(2022, 1, 11)
+
+
+def test_already_up_to_date(tmp_path, template):
+    sync = IncrementalSync(tmp_path, namespace="channel", restatement_days=0)
+    client = mock.Mock(spec=Analytics)
+    client.retrieve.side_effect = fake_retrieve(1)
+    sync.run(client, template)
+
+    report = sync.run(client, template)
+    client.retrieve.assert_called_once()
+    assert report.shape == (10, 2)
+    assert isinstance(report.type, TimeBasedActivity)
+
+
+def test_earlier_end_date_keeps_later_rows(sync, template):
+    client = mock.Mock(spec=Analytics)
+    client.retrieve.side_effect = fake_retrieve(1)
+    sync.run(client, template)
+
+    client.retrieve.side_effect = fake_retrieve(2)
+    report = sync.run(client, {**template, "end_date": dt.date(2022, 1, 9)})
+
+    assert [r[1] for r in report.rows] == [1] * 7 + [2] * 2 + [1]
+    assert sync.store.load(sync.key(template)).last_date == dt.date(2022, 1, 10)
+
+
+def test_failed_sync_keeps_state(sync, template):
+    client = mock.Mock(spec=Analytics)
+    client.retrieve.side_effect = fake_retrieve(1)
+    sync.run(client, template)
+    before = sync.store.load(sync.key(template))
+
+    client.retrieve.side_effect = RuntimeError("boom")
+    with pytest.raises(RuntimeError):
+        sync.run(client, {**template, "end_date": dt.date(2022, 1, 15)})
+
+    assert sync.store.load(sync.key(template)) == before
+
+
+def test_mismatched_headers(sync, template):
+    client = mock.Mock(spec=Analytics)
+    client.retrieve.side_effect = fake_retrieve(1)
+    sync.run(client, template)
+
+    report = make_report(dt.date(2022, 1, 8), dt.date(2022, 1, 15))
+    report.data["columnHeaders"] = HEADERS[:1]
+    client.retrieve.side_effect = None
+    client.retrieve.return_value = report
+    with pytest.raises(ConcatenationError):
+        sync.run(client, {**template, "end_date": dt.date(2022, 1, 15)})
+
+
+async def test_async_sync(sync, template):
+    client = mock.Mock(spec=AsyncAnalytics)
+    client.retrieve = mock.AsyncMock(side_effect=fake_retrieve(1))
+    await sync.arun(client, template)
+
+    client.retrieve.side_effect = fake_retrieve(2)
+    report = await sync.arun(client, {**template, "end_date": dt.date(2022, 1, 15)})
+
+    assert client.retrieve.call_args.kwargs["start_date"] == dt.date(2022, 1, 8)
+    assert [r[1] for r in report.rows] == [1] * 7 + [2] * 8
+
+
+def test_channels_share_store(tmp_path, template):
+    store = SyncStore(tmp_path)
+    first = IncrementalSync(store, namespace="first", restatement_days=0)
+    second = IncrementalSync(store, namespace="second")
+    assert first.key(template) != second.key(template)
+
+    client = mock.Mock(spec=Analytics)
+    client.retrieve.side_effect = fake_retrieve(1)
+    first.run(client, template)
+    client.retrieve.side_effect = fake_retrieve(2)
+    second.run(client, {**template, "end_date": dt.date(2022, 1, 5)})
+
+    report = first.run(client, template)
+    assert client.retrieve.call_count == 2
+    assert report.shape == (10, 2)
+    assert {r[1] for r in report.rows} == {1}
+    assert second.store.load(second.key(template)).last_date == dt.date(2022, 1, 5)
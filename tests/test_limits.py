@@ -0,0 +1,206 @@
+# Copyright (c) 2021-present, Ethan Henderson
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import asyncio
+import datetime as dt
+
+import mock
+import pytest
+
+from analytix.errors import QuotaExceeded
+from analytix.limits import Quota, RateLimiter
+
+
+def test_rate_limiter_invalid_rate():
+    with pytest.raises(ValueError, match="expected a positive rate, got 0"):
+        RateLimiter(0)
+
+
+def test_rate_limiter_invalid_burst():
+    with pytest.raises(ValueError, match="expected a burst of at least 1, got 0"):
+        RateLimiter(1, burst=0)
+
+
+def test_rate_limiter_repr_output():
+    assert repr(RateLimiter(2.5, burst=3)) == "RateLimiter(rate=2.5, burst=3)"
+
+
+@mock.patch("time.sleep")
+def test_rate_limiter_allows_burst(mock_sleep):
+    limiter = RateLimiter(1, burst=3)
+
+    for _ in range(3):
+        limiter.acquire()
+
+    mock_sleep.assert_not_called()
+    assert limiter.available < 1
+
+
+@mock.patch("time.sleep")
+def test_rate_limiter_waits_when_empty(mock_sleep):
+    limiter = RateLimiter(10, burst=1)
+
+    with mock.patch("time.monotonic", return_value=limiter._updated):
+        limiter.acquire()
+        limiter.acquire()
+        limiter.acquire()
+
+    delays = [c[0][0] for c in mock_sleep.call_args_list]
+    assert delays == pytest.approx([0.1, 0.2])
+
+
+@mock.patch("time.sleep")
+def test_rate_limiter_refills(mock_sleep):
+    limiter = RateLimiter(10, burst=2)
+    now = limiter._updated
+
+    with mock.patch("time.monotonic", return_value=now):
+        limiter.acquire()
+        limiter.acquire()
+
+    with mock.patch("time.monotonic", return_value=now + 1):
+        assert limiter.available == 2
+        limiter.acquire()
+
+    mock_sleep.assert_not_called()
+
+
+async def test_rate_limiter_aacquire_waits_when_empty():
+    limiter = RateLimiter(4, burst=1)
+
+    with mock.patch.object(asyncio, "sleep") as mock_sleep:
+        with mock.patch("time.monotonic", return_value=limiter._updated):
+            await limiter.aacquire()
+            await limiter.aacquire()
+
+    mock_sleep.assert_awaited_once_with(0.25)
+
+
+def test_rate_limiter_shared():
+    limiter = RateLimiter.shared("test-shared-limiter", 5, burst=2)
+
+    assert RateLimiter.shared("test-shared-limiter", 100) is limiter
+    assert limiter.rate == 5
+    assert RateLimiter.shared("test-other-limiter", 5) is not limiter
+
+
+def test_quota_invalid_policy():
+    with pytest.raises(ValueError) as exc:
+        Quota("test", on_exhausted="ignore")
+    assert str(exc.value) == (
+        "expected exhaustion policy to be one of refuse, delay, got 'ignore'"
+    )
+
+
+def test_quota_counts_requests():
+    quota = Quota("test", budget=10)
+
+    quota.consume()
+    quota.consume(3)
+
+    assert quota.used == 4
+    assert quota.remaining == 6
+    assert repr(quota) == "Quota(project_id='test', used=4, budget=10)"
+
+
+def test_quota_unlimited():
+    quota = Quota("test")
+
+    for _ in range(100):
+        quota.consume()
+
+    assert quota.used == 100
+    assert quota.remaining is None
+
+
+def test_quota_refuses_when_exhausted():
+    quota = Quota("test", budget=2)
+    quota.consume(2)
+
+    with pytest.raises(QuotaExceeded) as exc:
+        quota.consume()
+    assert str(exc.value) == (
+        "daily budget of 2 request(s) for project test has been used up"
+    )
+    assert quota.used == 2
+
+
+@mock.patch("time.sleep")
+def test_quota_delays_until_reset(mock_sleep):
+    quota = Quota("test", budget=1, on_exhausted="delay")
+    quota.consume()
+
+    def sleep(delay):
+        assert 0 < delay <= 86400
+        quota._resets_at = dt.datetime.now(dt.timezone.utc)
+
+    mock_sleep.side_effect = sleep
+    quota.consume()
+
+    mock_sleep.assert_called_once()
+    assert quota.used == 1
+
+
+async def test_quota_adelays_until_reset():
+    quota = Quota("test", budget=1, on_exhausted="delay")
+    await quota.aconsume()
+
+    async def sleep(delay):
+        quota._resets_at = dt.datetime.now(dt.timezone.utc)
+
+    with mock.patch.object(asyncio, "sleep", side_effect=sleep) as mock_sleep:
+        await quota.aconsume()
+
+    mock_sleep.assert_awaited_once()
+    assert quota.used == 1
+
+
+def test_quota_resets_daily():
+    quota = Quota("test", budget=5)
+    quota.consume(5)
+
+    assert quota.resets_at.time() == dt.time()
+
+    quota._resets_at = dt.datetime.now(dt.timezone.utc) - dt.timedelta(seconds=1)
+    assert quota.used == 0
+    assert quota.resets_at > dt.datetime.now(dt.timezone.utc)
+
+
+def test_quota_reset():
+    quota = Quota("test")
+    quota.consume(3)
+    quota.reset()
+    assert quota.used == 0
+
+
+def test_quota_for_project():
+    quota = Quota.for_project("test-shared-quota", budget=100)
+
+    assert Quota.for_project("test-shared-quota", budget=5) is quota
+    assert quota.budget == 100
+    assert Quota.for_project("test-other-quota") is not quota
@@ -55,6 +55,21 @@ def test_metrics_hash(metrics):
     assert isinstance(hash(metrics), int)
 
 
+def test_metrics_hash_by_value(metrics):
+    assert hash(metrics) == hash(Metrics("comments", "likes", "views"))
+    assert hash(metrics) != hash(Metrics("views"))
+
+
+def test_metrics_are_immutable(metrics):
+    assert isinstance(metrics.values, frozenset)
+
+    with pytest.raises(AttributeError):
+        metrics.values = frozenset({"views"})
+
+    with pytest.raises(AttributeError):
+        metrics.extra = True
+
+
 def test_metrics_equal(metrics):
     assert metrics == Metrics("views", "likes", "comments")
 
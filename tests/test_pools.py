@@ -0,0 +1,285 @@
+# Copyright (c) 2021-present, Ethan Henderson
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import asyncio
+import json
+import time
+
+import httpx
+import mock
+import pytest
+
+from analytix import Analytics, AsyncAnalytics
+from analytix.caching import MemoryCache
+from analytix.errors import InvalidMetrics
+from analytix.limits import Quota
+from analytix.pools import AsyncChannelPool, ChannelPool, _BasePool
+from analytix.tokens import Tokens
+from tests.paths import MOCK_DATA_PATH, TOKENS_PATH
+from tests.test_secrets import secrets  # noqa
+
+
+@pytest.fixture()
+def request_data():
+    with open(MOCK_DATA_PATH) as f:
+        return json.load(f)
+
+
+def make_tokens(access_token):
+    tokens = Tokens.from_file(TOKENS_PATH)
+    tokens.access_token = access_token
+    tokens.expires_at = time.time() + 3600
+    return tokens
+
+
+@pytest.fixture()
+def pool(secrets, tmp_path):
+    pool = ChannelPool(secrets, token_dir=tmp_path)
+    pool.add_channel("one", tokens=make_tokens("token-one"))
+    pool.add_channel("two", tokens=make_tokens("token-two"))
+    return pool
+
+
+@pytest.fixture()
+def apool(secrets, tmp_path):
+    pool = AsyncChannelPool(secrets, token_dir=tmp_path)
+    pool.add_channel("one", tokens=make_tokens("token-one"))
+    pool.add_channel("two", tokens=make_tokens("token-two"))
+    return pool
+
+
+def bearer(call):
+    return call.kwargs["headers"]["Authorization"]
+
+
+def test_channels(pool):
+    assert pool.channels == ["one", "two"]
+    assert len(pool) == 2
+    assert "one" in pool
+    assert "three" not in pool
+    assert isinstance(pool["one"], Analytics)
+
+
+def test_clients_share_session_and_secrets(pool):
+    one, two = pool["one"], pool["two"]
+    assert one._session is two._session is pool._session
+    assert one.secrets is two.secrets is pool.secrets
+
+
+def test_connection_limits(secrets):
+    with mock.patch.object(httpx, "Client") as mock_client:
+        ChannelPool(secrets, max_connections=5, max_keepalive_connections=2)
+
+    limits = mock_client.call_args.kwargs["limits"]
+    assert limits.max_connections == 5
+    assert limits.max_keepalive_connections == 2
+
+
+def test_token_files_per_channel(pool, tmp_path):
+    assert pool["one"].token_store.path == tmp_path / "one.json"
+    assert pool["two"].token_store.path == tmp_path / "two.json"
+
+
+def test_add_duplicate_channel(pool):
+    with pytest.raises(ValueError) as exc:
+        pool.add_channel("one")
+    assert str(exc.value) == "channel 'one' is already in this pool"
+
+
+@pytest.mark.parametrize("channel", ["", ".", "..", "a/b", "../x"])
+def test_add_invalid_channel(pool, channel):
+    with pytest.raises(ValueError) as exc:
+        pool.add_channel(channel)
+    assert str(exc.value) == f"invalid channel name {channel!r}"
+    assert channel not in pool
+
+
+def test_base_pool_is_abstract(secrets):
+    with pytest.raises(TypeError):
+        _BasePool(secrets)
+
+
+def test_remove_channel(pool):
+    pool.remove_channel("one")
+    assert pool.channels == ["two"]
+
+    with pytest.raises(KeyError) as exc:
+        pool.remove_channel("one")
+    assert str(exc.value) == "\"no channel named 'one' in this pool\""
+
+
+def test_shared_options(secrets):
+    quota = Quota(secrets.project_id)
+    pool = ChannelPool(
+        secrets, quota=quota, cache_factory=lambda channel: MemoryCache()
+    )
+    one = pool.add_channel("one")
+    two = pool.add_channel("two")
+
+    assert one.quota is two.quota is quota
+    assert one.cache is not two.cache
+
+
+def test_retrieve_routes_tokens(pool, request_data):
+    with mock.patch.object(httpx.Client, "get") as mock_get:
+        mock_get.return_value = httpx.Response(
+            status_code=200, request=mock.Mock(), json=request_data
+        )
+
+        pool.retrieve("two", dimensions=("day",), skip_refresh_check=True)
+        assert bearer(mock_get.call_args) == "Bearer token-two"
+
+
+def test_retrieve_many(pool, request_data):
+    with mock.patch.object(httpx.Client, "get") as mock_get:
+        mock_get.return_value = httpx.Response(
+            status_code=200, request=mock.Mock(), json=request_data
+        )
+
+        results = pool.retrieve_many(
+            [
+                ("one", {"dimensions": ("day",)}),
+                ("two", {"dimensions": ("day",)}),
+                ("two", {"metrics": ("nope",)}),
+                ("three", {"dimensions": ("day",)}),
+            ],
+            max_workers=2,
+        )
+
+        assert results[0].data == request_data
+        assert results[1].data == request_data
+        assert isinstance(results[2], InvalidMetrics)
+        assert isinstance(results[3], KeyError)
+        assert sorted(bearer(c) for c in mock_get.call_args_list) == [
+            "Bearer token-one",
+            "Bearer token-two",
+        ]
+
+
+def test_retrieve_many_respects_max_workers(pool, request_data):
+    active = []
+    peak = []
+
+    def slow_get(*args, **kwargs):
+        active.append(1)
+        peak.append(len(active))
+        time.sleep(0.02)
+        active.pop()
+        return httpx.Response(status_code=200, request=mock.Mock(), json=request_data)
+
+    with mock.patch.object(httpx.Client, "get", side_effect=slow_get):
+        results = pool.retrieve_many(
+            [
+                (channel, {"dimensions": ("day",), "max_results": i})
+                for i in range(1, 6)
+                for channel in ("one", "two")
+            ],
+            max_workers=3,
+        )
+
+    assert len(results) == 10
+    assert max(peak) <= 3
+
+
+def test_retrieve_many_invalid_workers(pool):
+    with pytest.raises(ValueError) as exc:
+        pool.retrieve_many([], max_workers=0)
+    assert str(exc.value) == "expected at least 1 worker, got 0"
+
+
+def test_close_session(pool):
+    with mock.patch.object(httpx.Client, "close") as mock_close:
+        pool["one"].close_session()
+        mock_close.assert_not_called()
+
+        pool.close_session()
+        mock_close.assert_called_once()
+
+
+async def test_async_channels(apool):
+    assert apool.channels == ["one", "two"]
+    assert isinstance(apool["one"], AsyncAnalytics)
+    assert apool["one"]._session is apool["two"]._session is apool._session
+
+
+async def test_async_retrieve_routes_tokens(apool, request_data):
+    with mock.patch.object(httpx.AsyncClient, "get") as mock_get:
+        mock_get.return_value = httpx.Response(
+            status_code=200, request=mock.Mock(), json=request_data
+        )
+
+        await apool.retrieve("one", dimensions=("day",), skip_refresh_check=True)
+        assert bearer(mock_get.call_args) == "Bearer token-one"
+
+
+async def test_async_retrieve_many(apool, request_data):
+    active = []
+    peak = []
+
+    async def slow_get(*args, **kwargs):
+        active.append(1)
+        peak.append(len(active))
+        await asyncio.sleep(0.01)
+        active.pop()
+        return httpx.Response(status_code=200, request=mock.Mock(), json=request_data)
+
+    with mock.patch.object(httpx.AsyncClient, "get", side_effect=slow_get) as mock_get:
+        results = await apool.retrieve_many(
+            [
+                ("one", {"dimensions": ("day",)}),
+                ("two", {"dimensions": ("day",)}),
+                ("two", {"metrics": ("nope",)}),
+                ("three", {"dimensions": ("day",)}),
+            ],
+            max_concurrency=1,
+        )
+
+        assert results[0].data == request_data
+        assert results[1].data == request_data
+        assert isinstance(results[2], InvalidMetrics)
+        assert isinstance(results[3], KeyError)
+        assert [bearer(c) for c in mock_get.call_args_list] == [
+            "Bearer token-one",
+            "Bearer token-two",
+        ]
+        assert max(peak) == 1
+
+
+async def test_async_retrieve_many_invalid_concurrency(apool):
+    with pytest.raises(ValueError) as exc:
+        await apool.retrieve_many([], max_concurrency=0)
+    assert str(exc.value) == "expected a concurrency of at least 1, got 0"
+
+
+async def test_async_close_session(apool):
+    with mock.patch.object(httpx.AsyncClient, "aclose") as mock_close:
+        await apool["one"].close_session()
+        mock_close.assert_not_awaited()
+
+        await apool.close_session()
+        mock_close.assert_awaited_once()
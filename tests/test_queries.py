@@ -28,12 +28,14 @@
 
 import datetime as dt
 
+import mock
 import pytest
 
 import analytix
+from analytix import errors, queries
 from analytix import report_types as rt
 from analytix.errors import InvalidRequest
-from analytix.queries import Query
+from analytix.queries import Query, validate_many
 
 
 def test_create_defaults():
@@ -173,6 +175,101 @@ def test_validate_months_are_corrected():
     assert query._end_date == dt.date(2022, 3, 1)
 
 
+def test_validate_reuses_result_for_same_shape():
+    queries._validated.clear()
+    first = Query(dimensions=["day"], metrics=["views"])
+    second = Query(
+        dimensions=["day"],
+        metrics=["views"],
+        start_date=dt.date(2021, 1, 1),
+        end_date=dt.date(2021, 2, 1),
+    )
+    first.validate()
+
+    with mock.patch.object(Query, "_validate_shape") as mock_validate:
+        second.validate()
+
+    mock_validate.assert_not_called()
+    assert second.rtype is first.rtype
+    assert len(queries._validated) == 1
+
+
+def test_validate_checks_dates_and_currency_for_cached_shape():
+    queries._validated.clear()
+    Query(dimensions=["day"]).validate()
+
+    with pytest.raises(InvalidRequest) as exc:
+        Query(dimensions=["day"], currency="LOL").validate()
+    assert str(exc.value) == "expected a valid ISO 4217 currency code"
+
+    with pytest.raises(InvalidRequest) as exc:
+        Query(
+            dimensions=["day"],
+            start_date=dt.date(2021, 2, 1),
+            end_date=dt.date(2021, 1, 1),
+        ).validate()
+    assert str(exc.value) == "the start date should be earlier than the end date"
+
+
+def test_validate_fills_metrics_for_cached_shape():
+    queries._validated.clear()
+    first = Query(dimensions=["day"])
+    second = Query(dimensions=["day"])
+    first.validate()
+    second.validate()
+
+    assert second.metrics == first.metrics
+    assert second.metrics is not first.metrics
+    assert "views" in second.metrics
+
+
+def test_validate_reraises_cached_error():
+    queries._validated.clear()
+    raised = []
+
+    for _ in range(2):
+        with pytest.raises(InvalidRequest) as exc:
+            Query(dimensions=["day"], metrics=["nope"]).validate()
+        assert str(exc.value) == "invalid metric(s) provided: nope"
+        assert type(exc.value) is errors.InvalidMetrics
+        raised.append(exc.value)
+
+    assert raised[0] is not raised[1]
+    assert len(queries._validated) == 1
+    (cached,) = queries._validated.values()
+    assert not isinstance(cached, BaseException)
+
+
+def test_cached_error_keeps_attributes():
+    class CustomError(InvalidRequest):
+        def __init__(self, name):
+            super().__init__(f"bad {name}")
+            self.name = name
+
+    try:
+        raise CustomError("thing") from ValueError()
+    except CustomError as exc:
+        failure = queries._Failure(exc)
+
+    error = failure.error()
+    assert type(error) is CustomError
+    assert error is not failure.exc
+    assert str(error) == "bad thing"
+    assert error.name == "thing"
+    assert error.__traceback__ is None
+    assert error.__cause__ is None
+
+
+def test_validate_cache_is_bounded():
+    queries._validated.clear()
+
+    with mock.patch.object(queries, "_VALIDATION_CACHE_SIZE", 2):
+        for metric in ("views", "likes", "dislikes"):
+            Query(dimensions=["day"], metrics=[metric]).validate()
+
+    assert [key[2] for key in queries._validated] == [("likes",), ("dislikes",)]
+
+
 def test_determine_ad_performance():
     query = Query(dimensions=["adType"])
     assert isinstance(query.determine_report_type(), rt.AdPerformance)
@@ -508,3 +605,185 @@ def test_determine_basic_user_activity_us():
 def test_determine_basic_user_activity():
     query = Query()
     assert isinstance(query.determine_report_type(), rt.BasicUserActivity)
+
+
+def test_determine_report_type_is_shared():
+    first = Query(dimensions=["day"]).determine_report_type()
+    second = Query(dimensions=["month"], metrics=["views"]).determine_report_type()
+    assert first is second
+
+
+def test_determine_report_type_ignores_other_names():
+    query = Query(dimensions=["country", "day"], filters={"video": "abc"})
+    rtype = query.determine_report_type()
+    assert isinstance(rtype, rt.GeographyBasedActivity)
+    assert Query(dimensions=["day", "country"]).determine_report_type() is rtype
+
+
+def test_determine_report_type_uses_filter_values():
+    query = Query(dimensions=["day"], filters={"isCurated": "0"})
+    assert isinstance(query.determine_report_type(), rt.TimeBasedActivity)
+
+
+def test_report_types_cannot_be_reassigned():
+    rtype = Query().determine_report_type()
+
+    with pytest.raises(AttributeError) as exc:
+        rtype.name = "Something else"
+
+    assert str(exc.value) == "cannot reassign 'name' on a report type"
+
+    with pytest.raises(AttributeError):
+        rtype.extra = True
+
+
+def test_shard_by_day():
+    query = Query(
+        dimensions=["day"],
+        start_date=dt.date(2022, 1, 30),
+        end_date=dt.date(2022, 2, 2),
+    )
+    shards = query.shard("day")
+    assert [(s._start_date, s._end_date) for s in shards] == [
+        (dt.date(2022, 1, 30), dt.date(2022, 1, 30)),
+        (dt.date(2022, 1, 31), dt.date(2022, 1, 31)),
+        (dt.date(2022, 2, 1), dt.date(2022, 2, 1)),
+        (dt.date(2022, 2, 2), dt.date(2022, 2, 2)),
+    ]
+
+
+def test_shard_by_week():
+    query = Query(
+        dimensions=["day"],
+        start_date=dt.date(2022, 1, 1),
+        end_date=dt.date(2022, 1, 20),
+    )
+    query.validate()
+    shards = query.shard("week")
+    assert [(s._start_date, s._end_date) for s in shards] == [
+        (dt.date(2022, 1, 1), dt.date(2022, 1, 7)),
+        (dt.date(2022, 1, 8), dt.date(2022, 1, 14)),
+        (dt.date(2022, 1, 15), dt.date(2022, 1, 20)),
+    ]
+    assert all(s.rtype is query.rtype for s in shards)
+    assert all(s.metrics == query.metrics for s in shards)
+
+
+def test_shard_by_month_daily():
+    query = Query(
+        dimensions=["day"],
+        start_date=dt.date(2020, 1, 15),
+        end_date=dt.date(2020, 3, 10),
+    )
+    shards = query.shard("month")
+    assert [(s._start_date, s._end_date) for s in shards] == [
+        (dt.date(2020, 1, 15), dt.date(2020, 1, 31)),
+        (dt.date(2020, 2, 1), dt.date(2020, 2, 29)),
+        (dt.date(2020, 3, 1), dt.date(2020, 3, 10)),
+    ]
+
+
+def test_shard_by_month_monthly():
+    query = Query(
+        dimensions=["month"],
+        start_date=dt.date(2021, 11, 15),
+        end_date=dt.date(2022, 2, 10),
+    )
+    query.validate()
+    shards = query.shard("month")
+    assert [(s._start_date, s._end_date) for s in shards] == [
+        (dt.date(2021, 11, 1), dt.date(2021, 11, 1)),
+        (dt.date(2021, 12, 1), dt.date(2021, 12, 1)),
+        (dt.date(2022, 1, 1), dt.date(2022, 1, 1)),
+        (dt.date(2022, 2, 1), dt.date(2022, 2, 1)),
+    ]
+
+
+def test_shard_invalid_unit():
+    with pytest.raises(InvalidRequest) as exc:
+        Query(dimensions=["day"]).shard("year")
+    assert (
+        str(exc.value)
+        == "expected shard unit to be one of day, week, month, got 'year'"
+    )
+
+
+def test_shard_no_time_dimension():
+    with pytest.raises(InvalidRequest) as exc:
+        Query(dimensions=["country"]).shard("day")
+    assert str(exc.value) == "sharding requires either the 'day' or 'month' dimension"
+
+
+def test_shard_monthly_by_week():
+    with pytest.raises(InvalidRequest) as exc:
+        Query(dimensions=["month"]).shard("week")
+    assert (
+        str(exc.value)
+        == "reports with the 'month' dimension can only be sharded by month"
+    )
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [{"sort_options": ["-views"]}, {"max_results": 10}, {"start_index": 5}],
+)
+def test_shard_not_additive(kwargs):
+    with pytest.raises(InvalidRequest) as exc:
+        Query(dimensions=["day"], **kwargs).shard("day")
+    assert str(exc.value) == "sharded reports cannot be sorted, limited, or offset"
+
+
+def test_validate_many():
+    queries._validated.clear()
+    results = validate_many(
+        [
+            {"dimensions": ["day"]},
+            {"dimensions": ["day"], "currency": "LOL"},
+            {"dimensions": ["day"], "metrics": ["nope"]},
+            {"dimensions": ["day"], "nope": True},
+            {"dimensions": ["month"], "start_date": dt.date(2022, 1, 15)},
+        ]
+    )
+
+    assert isinstance(results[0], Query)
+    assert isinstance(results[0].rtype, rt.TimeBasedActivity)
+    assert "views" in results[0].metrics
+    assert str(results[1]) == "expected a valid ISO 4217 currency code"
+    assert str(results[2]) == "invalid metric(s) provided: nope"
+    assert isinstance(results[3], TypeError)
+    assert results[4]._start_date == dt.date(2022, 1, 1)
+
+
+def test_validate_many_validates_each_shape_once():
+    queries._validated.clear()
+    specs = [
+        {
+            "dimensions": ["day"],
+            "metrics": ["views"],
+            "start_date": dt.date(2022, 1, 1) + dt.timedelta(days=i),
+            "end_date": dt.date(2022, 2, 1),
+        }
+        for i in range(20)
+    ]
+    specs.append({"dimensions": ["country"], "metrics": ["views"]})
+
+    with mock.patch.object(
+        Query, "_validate_shape", autospec=True, side_effect=Query._validate_shape
+    ) as mock_validate:
+        results = validate_many(specs)
+
+    assert mock_validate.call_count == 2
+    assert all(isinstance(r, Query) for r in results)
+    assert results[0].rtype is results[19].rtype
+    assert results[19]._start_date == dt.date(2022, 1, 20)
+
+
+def test_validate_many_matches_validate():
+    queries._validated.clear()
+    specs = [{"dimensions": ["video"]}, {"dimensions": ["day", "month"]}]
+    results = validate_many(specs)
+
+    for spec, result in zip(specs, results):
+        with pytest.raises(InvalidRequest) as exc:
+            Query(**spec).validate()
+        assert str(result) == str(exc.value)
@@ -131,6 +131,31 @@ def report():
     return Report(data, TimeBasedActivity())
 
 
+def test_concat(report, request_data):
+    concat = Report.concat([report, report])
+    assert concat.type == report.type
+    assert concat.column_headers == report.column_headers
+    assert concat.shape == (62, 36)
+    assert concat.rows == request_data["rows"] * 2
+    assert concat.data["kind"] == request_data["kind"]
+
+
+def test_concat_no_reports():
+    with pytest.raises(errors.ConcatenationError) as exc:
+        Report.concat([])
+    assert str(exc.value) == "expected at least 1 report, got 0"
+
+
+def test_concat_different_headers(report, request_data):
+    request_data["columnHeaders"] = request_data["columnHeaders"][:2]
+    request_data["rows"] = [row[:2] for row in request_data["rows"]]
+    other = Report(request_data, TimeBasedActivity())
+
+    with pytest.raises(errors.ConcatenationError) as exc:
+        Report.concat([report, other])
+    assert str(exc.value) == "cannot concatenate reports with different column headers"
+
+
 def test_shape_property(report):
     assert report.shape == (31, 36)
 
@@ -227,6 +252,17 @@ async def test_await_to_json(report, request_data):
     os.remove(JSON_OUTPUT_PATH)
 
 
+def test_to_json_compact(report, request_data):
+    report.to_json(str(JSON_OUTPUT_PATH), indent=None)
+
+    with open(JSON_OUTPUT_PATH) as f:
+        text = f.read()
+
+    assert "\n" not in text
+    assert json.loads(text) == request_data
+    os.remove(JSON_OUTPUT_PATH)
+
+
 async def test_deprecated_ato_json(report, request_data):
     await report.ato_json(str(JSON_OUTPUT_PATH))
     assert JSON_OUTPUT_PATH.is_file()
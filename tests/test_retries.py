@@ -0,0 +1,247 @@
+# Copyright (c) 2021-present, Ethan Henderson
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import asyncio
+import datetime as dt
+import email.utils
+
+import httpx
+import mock
+import pytest
+
+from analytix.retries import Attempt, RetryPolicy
+
+
+def response(status_code, **kwargs):
+    return httpx.Response(status_code=status_code, request=mock.Mock(), **kwargs)
+
+
+def rate_limited(reason):
+    return response(
+        403,
+        json={
+            "error": {
+                "code": 403,
+                "message": "Nope",
+                "errors": [{"reason": reason}],
+            }
+        },
+    )
+
+
+def test_invalid_max_attempts():
+    with pytest.raises(ValueError, match="expected at least 1 attempt, got 0"):
+        RetryPolicy(max_attempts=0)
+
+
+def test_cannot_retry_bad_requests():
+    with pytest.raises(ValueError, match="status code 400 cannot be retried"):
+        RetryPolicy(retry_statuses=(400, 500))
+
+
+def test_repr_output():
+    assert repr(RetryPolicy()) == (
+        "RetryPolicy(max_attempts=5, base_delay=0.5, max_delay=30.0, max_time=120.0)"
+    )
+
+
+@pytest.mark.parametrize("status_code", [408, 429, 500, 502, 503, 504])
+def test_is_retryable_statuses(status_code):
+    assert RetryPolicy().is_retryable(response(status_code))
+
+
+@pytest.mark.parametrize("status_code", [200, 400, 401, 404])
+def test_is_not_retryable_statuses(status_code):
+    assert not RetryPolicy().is_retryable(response(status_code))
+
+
+def test_is_retryable_rate_limit_reason():
+    policy = RetryPolicy()
+    assert policy.is_retryable(rate_limited("userRateLimitExceeded"))
+    assert not policy.is_retryable(rate_limited("forbidden"))
+    assert not policy.is_retryable(response(403, content=b"not json"))
+
+
+def test_backoff_full_jitter():
+    policy = RetryPolicy(base_delay=1.0, max_delay=5.0)
+
+    with mock.patch("random.uniform", side_effect=lambda a, b: b) as mock_uniform:
+        assert [policy.backoff(n) for n in range(1, 6)] == [1, 2, 4, 5, 5]
+        assert all(c.args[0] == 0 for c in mock_uniform.call_args_list)
+
+
+@mock.patch("time.sleep")
+def test_send_retries_until_success(mock_sleep):
+    attempts = []
+    policy = RetryPolicy(on_attempt=attempts.append)
+    request = mock.Mock(side_effect=[response(503), response(429), response(200)])
+
+    resp = policy.send(request)
+
+    assert resp.status_code == 200
+    assert request.call_count == 3
+    assert mock_sleep.call_count == 2
+    assert [a.status_code for a in attempts] == [503, 429, 200]
+    assert [a.will_retry for a in attempts] == [True, True, False]
+    assert all(isinstance(a, Attempt) and a.elapsed >= 0 for a in attempts)
+
+
+@mock.patch("time.sleep")
+def test_send_calls_on_retry(mock_sleep):
+    retried = []
+    policy = RetryPolicy()
+    request = mock.Mock(side_effect=[response(503), response(200)])
+
+    policy.send(request, on_retry=retried.append)
+
+    assert [a.status_code for a in retried] == [503]
+    assert retried[0].will_retry
+
+
+@mock.patch("time.sleep")
+def test_send_never_retries_bad_request(mock_sleep):
+    request = mock.Mock(return_value=response(400))
+
+    assert RetryPolicy().send(request).status_code == 400
+    request.assert_called_once()
+    mock_sleep.assert_not_called()
+
+
+@mock.patch("time.sleep")
+def test_send_gives_up_after_max_attempts(mock_sleep):
+    request = mock.Mock(return_value=response(500))
+
+    assert RetryPolicy(max_attempts=3).send(request).status_code == 500
+    assert request.call_count == 3
+    assert mock_sleep.call_count == 2
+
+
+@mock.patch("time.sleep")
+def test_send_respects_max_time(mock_sleep):
+    request = mock.Mock(return_value=response(500, headers={"Retry-After": "10"}))
+
+    RetryPolicy(max_time=5.0).send(request)
+    request.assert_called_once()
+    mock_sleep.assert_not_called()
+
+
+@mock.patch("time.sleep")
+def test_send_honours_retry_after_seconds(mock_sleep):
+    request = mock.Mock(
+        side_effect=[response(429, headers={"Retry-After": "7"}), response(200)]
+    )
+
+    RetryPolicy().send(request)
+    mock_sleep.assert_called_once_with(7.0)
+
+
+@mock.patch("time.sleep")
+def test_send_honours_retry_after_date(mock_sleep):
+    when = dt.datetime.now(dt.timezone.utc) + dt.timedelta(seconds=20)
+    header = email.utils.format_datetime(when, usegmt=True)
+    request = mock.Mock(
+        side_effect=[response(503, headers={"Retry-After": header}), response(200)]
+    )
+
+    RetryPolicy().send(request)
+    delay = mock_sleep.call_args.args[0]
+    assert 15 < delay <= 20
+
+
+@mock.patch("time.sleep")
+def test_send_does_not_cap_retry_after(mock_sleep):
+    request = mock.Mock(
+        side_effect=[response(503, headers={"Retry-After": "60"}), response(200)]
+    )
+
+    RetryPolicy(max_delay=30.0, max_time=1000.0).send(request)
+    mock_sleep.assert_called_once_with(60.0)
+
+
+@mock.patch("time.sleep")
+def test_send_gives_up_if_retry_after_exceeds_max_time(mock_sleep):
+    request = mock.Mock(return_value=response(503, headers={"Retry-After": "60"}))
+
+    resp = RetryPolicy(max_delay=30.0, max_time=45.0).send(request)
+    assert resp.status_code == 503
+    request.assert_called_once()
+    mock_sleep.assert_not_called()
+
+
+@mock.patch("time.sleep")
+def test_send_retries_transport_errors(mock_sleep):
+    error = httpx.ConnectError("Connection refused")
+    request = mock.Mock(side_effect=[error, response(200)])
+
+    assert RetryPolicy().send(request).status_code == 200
+    assert request.call_count == 2
+
+
+@mock.patch("time.sleep")
+def test_send_raises_last_transport_error(mock_sleep):
+    attempts = []
+    error = httpx.ConnectError("Connection refused")
+    request = mock.Mock(side_effect=error)
+
+    with pytest.raises(httpx.ConnectError):
+        RetryPolicy(max_attempts=2, on_attempt=attempts.append).send(request)
+
+    assert [a.error for a in attempts] == [error, error]
+    assert [a.status_code for a in attempts] == [None, None]
+
+
+async def test_asend_retries_until_success():
+    request = mock.AsyncMock(side_effect=[response(502), response(200)])
+
+    with mock.patch.object(asyncio, "sleep") as mock_sleep:
+        resp = await RetryPolicy().asend(request)
+
+    assert resp.status_code == 200
+    assert request.await_count == 2
+    mock_sleep.assert_awaited_once()
+
+
+async def test_asend_calls_on_retry():
+    retried = []
+    request = mock.AsyncMock(side_effect=[response(502), response(200)])
+
+    with mock.patch.object(asyncio, "sleep"):
+        await RetryPolicy().asend(request, on_retry=retried.append)
+
+    assert [a.status_code for a in retried] == [502]
+
+
+async def test_asend_never_retries_bad_request():
+    request = mock.AsyncMock(return_value=response(400))
+
+    with mock.patch.object(asyncio, "sleep") as mock_sleep:
+        resp = await RetryPolicy().asend(request)
+
+    assert resp.status_code == 400
+    request.assert_awaited_once()
+    mock_sleep.assert_not_awaited()
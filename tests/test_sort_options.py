@@ -70,6 +70,14 @@ def sort_options_descending() -> SortOptions:
     return SortOptions("views", "likes", "comments", descending_only=True)
 
 
+def test_sort_options_descending_not_equal(sort_options, sort_options_descending):
+    assert sort_options != sort_options_descending
+    assert hash(sort_options) != hash(sort_options_descending)
+    assert sort_options_descending == SortOptions(
+        "views", "likes", "comments", descending_only=True
+    )
+
+
 def test_sort_options(sort_options):
     sort_options.validate(["views", "likes", "comments"])
     sort_options.validate(["views", "-likes", "comments"])
@@ -0,0 +1,236 @@
+# Copyright (c) 2021-present, Ethan Henderson
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import time
+
+import httpx
+import pytest
+
+from analytix import Analytics, AsyncAnalytics
+from analytix.errors import APIError
+from analytix.report_types import TimeBasedActivity
+from analytix.reports import ColumnHeader, ColumnType, DataType
+from analytix.streaming import AsyncReportStream, ReportStream, RowParser
+from analytix.tokens import Tokens
+from tests.paths import MOCK_DATA_PATH, TOKENS_PATH
+from tests.test_secrets import secrets  # noqa
+
+ERROR_BODY = '{"error": {"code": 400, "message": "Invalid dimensions"}}'
+
+
+@pytest.fixture()
+def body():
+    with open(MOCK_DATA_PATH) as f:
+        return f.read()
+
+
+@pytest.fixture()
+def request_data(body):
+    return json.loads(body)
+
+
+def chunked(text, size):
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+async def achunked(text, size):
+    for chunk in chunked(text, size):
+        yield chunk
+
+
+def make_client(cls, secrets, handler, transport_cls):
+    session_cls = httpx.Client if cls is Analytics else httpx.AsyncClient
+    client = cls(secrets, session=session_cls(transport=transport_cls(handler)))
+    client._tokens = Tokens.from_file(TOKENS_PATH)
+    client._tokens.expires_at = time.time() + 3600
+    return client
+
+
+@pytest.mark.parametrize("size", [1, 3, 64, 10**6])
+def test_parser_any_chunk_size(body, request_data, size):
+    parser = RowParser()
+    rows = []
+
+    for chunk in chunked(body, size):
+        parser.feed(chunk)
+        rows.extend(parser.rows)
+        parser.rows.clear()
+
+    parser.close()
+    assert parser.done
+    assert rows == request_data["rows"]
+    assert parser.data == {k: v for k, v in request_data.items() if k != "rows"}
+
+
+def test_parser_headers_before_rows(body):
+    parser = RowParser()
+    parser.feed(body[: body.index('"rows"')])
+    assert parser.has_headers
+    assert not parser.rows
+
+
+def test_parser_empty_rows():
+    parser = RowParser()
+    parser.feed('{"columnHeaders": [], "rows": [ ] }')
+    parser.close()
+    assert parser.done
+    assert not parser.rows
+
+
+def test_parser_number_split_across_chunks():
+    parser = RowParser()
+    parser.feed('{"rows": [["2022-01-01", 12')
+    parser.feed("34]]}")
+    parser.close()
+    assert list(parser.rows) == [["2022-01-01", 1234]]
+
+
+def test_parser_error_body():
+    parser = RowParser()
+    with pytest.raises(APIError, match="Invalid dimensions"):
+        parser.feed(ERROR_BODY)
+
+
+def test_parser_truncated_body(body):
+    parser = RowParser()
+    parser.feed(body[:-20])
+    with pytest.raises(json.JSONDecodeError):
+        parser.close()
+
+
+def test_parser_missing_end(body):
+    parser = RowParser()
+    parser.feed(body.rstrip()[:-1])
+    with pytest.raises(json.JSONDecodeError, match="Unexpected end of data"):
+        parser.close()
+
+
+def test_parser_invalid_body():
+    parser = RowParser()
+    with pytest.raises(json.JSONDecodeError, match="Expecting '{'"):
+        parser.feed("[1, 2]")
+
+
+def test_stream_headers_and_rows(body, request_data):
+    stream = ReportStream(iter(chunked(body, 16)), TimeBasedActivity())
+    assert stream.column_headers[0] == ColumnHeader(
+        "day", ColumnType.DIMENSION, DataType.STRING
+    )
+    assert stream.columns[0] == "day"
+    assert stream.data["kind"] == "youtubeAnalytics#resultTable"
+    assert stream.rows_read == 0
+
+    assert list(stream) == request_data["rows"]
+    assert stream.rows_read == len(request_data["rows"])
+    assert list(stream) == []
+
+
+def test_stream_rows_are_lazy(body):
+    chunks = iter(chunked(body, 16))
+    stream = ReportStream(chunks, TimeBasedActivity())
+    next(iter(stream))
+    assert next(chunks, None) is not None
+
+
+def test_stream_to_csv(body, request_data, tmp_path):
+    stream = ReportStream(iter(chunked(body, 64)), TimeBasedActivity())
+    stream.to_csv(str(tmp_path / "report"))
+
+    lines = (tmp_path / "report.csv").read_text().splitlines()
+    assert lines[0] == ",".join(stream.columns)
+    assert len(lines) == len(request_data["rows"]) + 1
+    assert lines[1] == ",".join(f"{v}" for v in request_data["rows"][0])
+
+
+async def test_async_stream_headers_and_rows(body, request_data):
+    stream = AsyncReportStream(achunked(body, 16), TimeBasedActivity())
+    await stream._start()
+    assert stream.columns[0] == "day"
+    assert [row async for row in stream] == request_data["rows"]
+    assert stream.rows_read == len(request_data["rows"])
+
+
+async def test_async_stream_to_csv(body, request_data, tmp_path):
+    stream = AsyncReportStream(achunked(body, 64), TimeBasedActivity())
+    await stream._start()
+    await stream.ato_csv(str(tmp_path / "report"), delimiter="\t")
+
+    lines = (tmp_path / "report.tsv").read_text().splitlines()
+    assert lines[0] == "\t".join(stream.columns)
+    assert len(lines) == len(request_data["rows"]) + 1
+
+
+def test_retrieve_stream(secrets, body, request_data):
+    def handler(request):
+        assert request.headers["Authorization"].startswith("Bearer fuie43")
+        return httpx.Response(200, content=iter(c.encode() for c in chunked(body, 32)))
+
+    client = make_client(Analytics, secrets, handler, httpx.MockTransport)
+
+    with client.retrieve_stream(dimensions=["day"], skip_update_check=True) as stream:
+        assert isinstance(stream.type, TimeBasedActivity)
+        assert list(stream) == request_data["rows"]
+
+
+def test_retrieve_stream_error(secrets):
+    def handler(request):
+        return httpx.Response(400, text=ERROR_BODY)
+
+    client = make_client(Analytics, secrets, handler, httpx.MockTransport)
+
+    with pytest.raises(APIError, match="Invalid dimensions"):
+        with client.retrieve_stream(dimensions=["day"], skip_update_check=True):
+            ...
+
+
+async def test_async_retrieve_stream(secrets, body, request_data):
+    async def content():
+        for chunk in chunked(body, 32):
+            yield chunk.encode()
+
+    async def handler(request):
+        return httpx.Response(200, content=content())
+
+    client = make_client(AsyncAnalytics, secrets, handler, httpx.MockTransport)
+
+    async with client.retrieve_stream(
+        dimensions=["day"], skip_update_check=True
+    ) as stream:
+        assert [row async for row in stream] == request_data["rows"]
+
+
+async def test_async_retrieve_stream_error(secrets):
+    async def handler(request):
+        return httpx.Response(400, text=ERROR_BODY)
+
+    client = make_client(AsyncAnalytics, secrets, handler, httpx.MockTransport)
+
+    with pytest.raises(APIError, match="Invalid dimensions"):
+        async with client.retrieve_stream(dimensions=["day"], skip_update_check=True):
+            ...
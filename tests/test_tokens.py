@@ -31,11 +31,15 @@ from __future__ import annotations
 import asyncio
 import json
 import os
+import threading
+import time
 import typing as t
 
+import mock
 import pytest
 
-from analytix.tokens import Tokens
+from analytix import codecs
+from analytix.tokens import FileTokenStore, Tokens
 from tests.paths import SECRETS_PATH, TOKENS_PATH
 
 
@@ -104,7 +108,8 @@ def test_repr_output(tokens):
         "expires_in=3599, "
         "refresh_token='gnu54ngp943bpg984npgbn480gb9483bg84b9g8b498pb', "
         "scope='https://www.googleapis.com/auth/yt-analytics-monetary.readonly https://www.googleapis.com/auth/yt-analytics.readonly', "
-        "token_type='Bearer'"
+        "token_type='Bearer', "
+        "expires_at=None"
         ")"
     )
 
@@ -121,7 +126,45 @@ def test_getattr(tokens):
 
 
 def test_to_dict(tokens, tokens_dict):
-    assert tokens.to_dict() == tokens_dict
+    assert tokens.to_dict() == {**tokens_dict, "expires_at": None}
+
+
+def test_from_data_sets_expiry(tokens_dict):
+    with mock.patch.object(time, "time", return_value=1000.0):
+        tokens = Tokens.from_data(tokens_dict)
+    assert tokens.expires_at == 1000.0 + tokens_dict["expires_in"]
+
+
+def test_from_data_keeps_expiry(tokens_dict):
+    tokens = Tokens.from_data({**tokens_dict, "expires_at": 1234.5})
+    assert tokens.expires_at == 1234.5
+
+
+def test_update_sets_expiry(tokens):
+    with mock.patch.object(time, "time", return_value=1000.0):
+        tokens.update({"access_token": "a", "expires_in": 3599})
+    assert tokens.expires_at == 4599.0
+
+
+def test_is_expired(tokens):
+    assert not tokens.is_expired()
+
+    with mock.patch.object(time, "time", return_value=1000.0):
+        tokens.expires_at = 1100.0
+        assert not tokens.is_expired()
+        assert not tokens.is_expired(margin=99)
+        assert tokens.is_expired(margin=100)
+
+        tokens.expires_at = 900.0
+        assert tokens.is_expired()
+
+
+def test_write_persists_expiry(tokens):
+    path = SECRETS_PATH.parent / "test_write.json"
+    tokens.expires_at = 1234.5
+    tokens.write(path)
+    assert Tokens.from_file(path).expires_at == 1234.5
+    os.remove(path)
 
 
 def test_update(tokens, tokens_dict):
@@ -157,3 +200,173 @@ def test_write_path_str_async(tokens):
     asyncio.run(tokens.awrite(str(SECRETS_PATH.parent / "test_write.json")))
     assert (SECRETS_PATH.parent / "test_write.json").is_file()
     os.remove(SECRETS_PATH.parent / "test_write.json")
+
+
+def test_write_is_atomic(tokens, tmp_path):
+    path = tmp_path / "tokens.json"
+    path.write_text("old")
+
+    with mock.patch.object(codecs, "dumps", side_effect=RuntimeError("boom")):
+        with pytest.raises(RuntimeError):
+            tokens.write(path)
+
+    assert path.read_text() == "old"
+    assert os.listdir(tmp_path) == ["tokens.json"]
+
+    tokens.write(path)
+    assert Tokens.from_file(path) == tokens
+    assert os.listdir(tmp_path) == ["tokens.json"]
+
+
+async def test_awrite_is_atomic(tokens, tmp_path):
+    path = tmp_path / "tokens.json"
+    await tokens.awrite(path)
+    assert Tokens.from_file(path) == tokens
+    assert os.listdir(tmp_path) == ["tokens.json"]
+
+
+@pytest.fixture()
+def store(tmp_path) -> FileTokenStore:
+    return FileTokenStore(tmp_path / "tokens.json")
+
+
+def test_store_repr_output(tmp_path):
+    store = FileTokenStore(str(tmp_path / "tokens.json"))
+    assert repr(store) == f"FileTokenStore(path='{tmp_path / 'tokens.json'}')"
+
+
+def test_store_load_missing(store):
+    assert store.load() is None
+
+
+def test_store_load_corrupt(store):
+    store.path.write_text('{"access_token": "a", "expi')
+    assert store.load() is None
+
+
+def test_store_save_and_load(store, tokens):
+    store.save(tokens)
+    loaded = store.load()
+
+    assert loaded == tokens
+    assert loaded is not tokens
+
+
+def test_store_load_is_cached(store, tokens):
+    tokens.write(store.path)
+
+    with mock.patch.object(Tokens, "from_file", wraps=Tokens.from_file) as mock_load:
+        first = store.load()
+        second = store.load()
+        mock_load.assert_called_once()
+
+    assert first == second
+    assert first is not second
+
+
+def test_store_load_reads_changes(store, tokens):
+    store.save(tokens)
+    store.load()
+
+    # Simulate another process writing new tokens.
+    other = Tokens.from_data({**tokens.to_dict(), "access_token": "a"})
+    other.write(store.path)
+    os.utime(store.path, ns=(0, 0))
+
+    assert store.load().access_token == "a"
+
+
+def test_store_cached_copy_unaffected_by_caller(store, tokens):
+    store.save(tokens)
+    tokens.access_token = "changed"
+    assert store.load().access_token != "changed"
+
+
+async def test_store_asave_and_aload(store, tokens):
+    assert await store.aload() is None
+
+    await store.asave(tokens)
+    assert await store.aload() == tokens
+
+
+def test_store_lock_path(store):
+    assert store.lock_path.name.startswith("analytix-")
+    assert store.lock_path.suffix == ".lock"
+    assert store.lock_path == FileTokenStore(store.path).lock_path
+    assert store.lock_path != FileTokenStore(store.path.parent / "x").lock_path
+
+
+def test_store_lock_is_exclusive(store):
+    order = []
+
+    def worker(name):
+        with store.lock():
+            order.append(f"{name} start")
+            time.sleep(0.05)
+            order.append(f"{name} end")
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for i in range(0, 6, 2):
+        assert order[i].split()[0] == order[i + 1].split()[0]
+
+
+async def test_store_alock_waits_for_lock(store):
+    acquired = asyncio.Event()
+
+    async def acquire():
+        async with store.alock():
+            acquired.set()
+
+    with store.lock():
+        task = asyncio.ensure_future(acquire())
+        # The event loop keeps running while the task waits.
+        await asyncio.sleep(0.05)
+        assert not acquired.is_set()
+
+    await asyncio.wait_for(task, 1)
+    assert acquired.is_set()
+
+
+async def test_store_alock_cancelled_while_waiting(store):
+    release = threading.Event()
+    calls = []
+
+    def lock_fd(fd):
+        release.wait(1)
+        # The descriptor must still be open once the lock is acquired.
+        os.fstat(fd)
+        calls.append(("lock", fd))
+
+    def unlock_fd(fd):
+        calls.append(("unlock", fd))
+
+    async def acquire():
+        async with store.alock():
+            ...
+
+    with mock.patch("analytix.tokens._lock_fd", lock_fd):
+        with mock.patch("analytix.tokens._unlock_fd", unlock_fd):
+            task = asyncio.ensure_future(acquire())
+            await asyncio.sleep(0.05)
+            task.cancel()
+
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+            assert calls == []
+            release.set()
+
+            for _ in range(100):
+                if len(calls) == 2:
+                    break
+                await asyncio.sleep(0.01)
+
+    fd = calls[0][1]
+    assert calls == [("lock", fd), ("unlock", fd)]
+    with pytest.raises(OSError):
+        os.fstat(fd)
@@ -0,0 +1,98 @@
+# Copyright (c) 2021-present, Ethan Henderson
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import logging
+import time
+
+import pytest
+
+import analytix
+from analytix import updates
+
+
+@pytest.fixture(autouse=True)
+def version_cache(tmp_path, monkeypatch):
+    path = tmp_path / "analytix" / "latest_version.json"
+    monkeypatch.setattr(updates, "VERSION_CACHE_PATH", path)
+    return path
+
+
+def test_enabled_by_default(monkeypatch):
+    monkeypatch.delenv(updates.DISABLE_ENV_VAR, raising=False)
+    assert updates.enabled()
+
+
+def test_disabled_with_env_var(monkeypatch):
+    monkeypatch.setenv(updates.DISABLE_ENV_VAR, "1")
+    assert not updates.enabled()
+
+
+def test_disabled_globally(monkeypatch):
+    monkeypatch.delenv(updates.DISABLE_ENV_VAR, raising=False)
+    monkeypatch.setattr(updates, "CHECK_FOR_UPDATES", False)
+    assert not updates.enabled()
+
+
+def test_read_write_cached(version_cache):
+    assert updates.read_cached() is None
+
+    updates.write_cached("9999.9.9")
+    assert version_cache.is_file()
+    assert updates.read_cached() == "9999.9.9"
+
+
+def test_read_cached_expired(version_cache):
+    version_cache.parent.mkdir()
+    with open(version_cache, "w") as f:
+        json.dump({"checked_at": time.time() - 90000, "latest": "9999.9.9"}, f)
+
+    assert updates.read_cached() is None
+
+
+def test_read_cached_corrupt(version_cache):
+    version_cache.parent.mkdir()
+    version_cache.write_text("{")
+
+    assert updates.read_cached() is None
+
+
+def test_write_cached_ignores_errors(version_cache):
+    version_cache.parent.write_text("not a directory")
+
+    updates.write_cached("9999.9.9")
+    assert updates.read_cached() is None
+
+
+def test_warn_if_outdated(caplog):
+    with caplog.at_level(logging.WARNING):
+        updates.warn_if_outdated(analytix.__version__)
+        assert not caplog.records
+
+        updates.warn_if_outdated("9999.9.9")
+        assert "latest stable version of analytix (v9999.9.9)" in caplog.text
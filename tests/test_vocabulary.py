@@ -0,0 +1,85 @@
+# Copyright (c) 2021-present, Ethan Henderson
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import pytest
+
+from analytix import data, vocabulary
+from analytix.features import Dimensions, Filters, Metrics, Required, ZeroOrOne
+from analytix.vocabulary import VOCABULARY, Vocabulary, popcount
+
+
+@pytest.fixture()
+def vocab() -> Vocabulary:
+    return Vocabulary(("views", "likes", "day", "likes"))
+
+
+def test_vocabulary_names(vocab):
+    assert vocab.names == ("views", "likes", "day")
+    assert len(vocab) == 3
+    assert "likes" in vocab
+    assert "comments" not in vocab
+    assert repr(vocab) == "Vocabulary(names=3)"
+
+
+def test_vocabulary_mask(vocab):
+    assert vocab.mask(()) == 0
+    assert vocab.mask(("views",)) == 0b001
+    assert vocab.mask(("day", "views")) == 0b101
+    assert vocab.mask(("likes", "comments")) == 0b010
+
+
+def test_vocabulary_encode(vocab):
+    assert vocab.encode(("day", "comments", "views")) == (0b101, {"comments"})
+    assert vocab.encode({"likes": "1"}) == (0b010, set())
+
+
+def test_vocabulary_decode(vocab):
+    assert vocab.decode(0) == set()
+    assert vocab.decode(0b110) == {"likes", "day"}
+
+
+def test_popcount():
+    assert popcount(0) == 0
+    assert popcount(0b1011) == 3
+    assert popcount(VOCABULARY.mask(data.ALL_METRICS)) == len(data.ALL_METRICS)
+
+
+def test_domain_masks_round_trip():
+    assert VOCABULARY.decode(vocabulary.ALL_METRICS) == data.ALL_METRICS
+    assert VOCABULARY.decode(vocabulary.ALL_DIMENSIONS) == data.ALL_DIMENSIONS
+    assert VOCABULARY.decode(vocabulary.ALL_FILTERS) == data.ALL_FILTERS
+
+
+def test_feature_masks():
+    metrics = Metrics("views", "likes")
+    dimensions = Dimensions(Required("day"), ZeroOrOne("country", "video"))
+    filters = Filters(Required("country==US"), ZeroOrOne("video", "group"))
+
+    assert VOCABULARY.decode(metrics.mask) == {"views", "likes"}
+    assert VOCABULARY.decode(dimensions.mask) == {"day", "country", "video"}
+    assert VOCABULARY.decode(filters.mask) == {"country", "video", "group"}
@@ -0,0 +1,231 @@
+# Copyright (c) 2021-present, Ethan Henderson
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import asyncio
+import socket
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from analytix.errors import AuthenticationError
+from analytix.webserver import AsyncServer, RequestHandler, Server
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+
+async def get(port, path):
+    reader, writer = await asyncio.open_connection("localhost", port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    await writer.drain()
+    status = (await reader.readline()).split()[1]
+    await reader.read()
+    writer.close()
+    return int(status)
+
+
+async def serve(port, *paths, timeout=5):
+    server = AsyncServer("localhost", port)
+    task = asyncio.ensure_future(server.wait_for_code(timeout=timeout))
+
+    statuses = []
+    for _ in range(100):
+        try:
+            for path in paths:
+                statuses.append(await get(port, path))
+            break
+        except ConnectionError:
+            await asyncio.sleep(0.01)
+
+    return await task, statuses
+
+
+async def test_async_server_receives_code():
+    port = free_port()
+    code, statuses = await serve(port, "/?state=abc&code=4/xyz&scope=a+b")
+    assert code == "4/xyz"
+    assert statuses == [200]
+
+
+async def test_async_server_ignores_stray_requests():
+    port = free_port()
+    code, statuses = await serve(
+        port, "/favicon.ico", "/?state=abc", "/?state=abc&code=secret"
+    )
+    assert code == "secret"
+    assert statuses == [404, 404, 200]
+
+
+async def test_async_server_denied():
+    port = free_port()
+
+    with pytest.raises(AuthenticationError) as exc:
+        await serve(port, "/?error=access_denied&state=abc")
+    assert str(exc.value) == (
+        "Authorisation error (access_denied): authorisation failed"
+    )
+
+
+async def test_async_server_drops_oversized_requests():
+    port = free_port()
+    unhandled = []
+    asyncio.get_running_loop().set_exception_handler(
+        lambda loop, context: unhandled.append(context)
+    )
+    server = AsyncServer("localhost", port)
+    task = asyncio.ensure_future(server.wait_for_code(timeout=5))
+
+    for _ in range(100):
+        try:
+            reader, writer = await asyncio.open_connection("localhost", port)
+            break
+        except ConnectionError:
+            await asyncio.sleep(0.01)
+
+    writer.write(f"GET /{'a' * 100_000} HTTP/1.1\r\n\r\n".encode())
+    try:
+        await writer.drain()
+        assert await reader.read() == b""
+    except ConnectionError:
+        ...
+    writer.close()
+
+    assert await get(port, "/?code=4/xyz") == 200
+    assert await task == "4/xyz"
+    assert not unhandled
+
+
+async def test_async_server_timeout():
+    server = AsyncServer("localhost", free_port())
+
+    with pytest.raises(AuthenticationError) as exc:
+        await server.wait_for_code(timeout=0.05)
+    assert str(exc.value) == (
+        "Authorisation error (timeout): "
+        "no authorisation code was received within 0.05 seconds"
+    )
+
+
+async def test_async_server_does_not_block_event_loop():
+    server = AsyncServer("localhost", free_port())
+    task = asyncio.ensure_future(server.wait_for_code(timeout=1))
+
+    # Other tasks keep running while the server waits.
+    await asyncio.wait_for(asyncio.sleep(0.05), 0.5)
+    assert not task.done()
+    task.cancel()
+
+
+def test_request_handler_ignores_stray_requests():
+    port = free_port()
+    ws = Server(("localhost", port), RequestHandler)
+    thread = threading.Thread(target=ws.handle_request)
+    thread.start()
+
+    with pytest.raises(urllib.error.HTTPError) as exc:
+        urllib.request.urlopen(f"http://localhost:{port}/favicon.ico")
+    assert exc.value.code == 404
+
+    thread.join()
+    ws.server_close()
+    assert ws.code == ""
+
+
+def test_request_handler_receives_code():
+    port = free_port()
+    ws = Server(("localhost", port), RequestHandler)
+    thread = threading.Thread(target=ws.handle_request)
+    thread.start()
+
+    with urllib.request.urlopen(
+        f"http://localhost:{port}/?state=abc&code=4/xyz"
+    ) as resp:
+        assert resp.status == 200
+
+    thread.join()
+    ws.server_close()
+    assert ws.code == "4/xyz"
+
+
+def wait_for_code(port, *paths, timeout=5):
+    ws = Server(("localhost", port), RequestHandler)
+    result = {}
+
+    def target():
+        try:
+            result["code"] = ws.wait_for_code(timeout=timeout)
+        except AuthenticationError as exc:
+            result["error"] = exc
+
+    thread = threading.Thread(target=target)
+    thread.start()
+
+    statuses = []
+    for path in paths:
+        try:
+            with urllib.request.urlopen(f"http://localhost:{port}{path}") as resp:
+                statuses.append(resp.status)
+        except urllib.error.HTTPError as exc:
+            statuses.append(exc.code)
+
+    thread.join(timeout + 5)
+    ws.server_close()
+    assert not thread.is_alive()
+    return result, statuses
+
+
+def test_server_waits_past_stray_requests():
+    result, statuses = wait_for_code(
+        free_port(), "/favicon.ico", "/?state=abc", "/?state=abc&code=4/xyz"
+    )
+    assert result == {"code": "4/xyz"}
+    assert statuses == [404, 404, 200]
+
+
+def test_server_denied():
+    result, statuses = wait_for_code(
+        free_port(), "/favicon.ico", "/?error=access_denied&state=abc"
+    )
+    assert str(result["error"]) == (
+        "Authorisation error (access_denied): authorisation failed"
+    )
+    assert statuses == [404, 200]
+
+
+def test_server_timeout():
+    result, statuses = wait_for_code(free_port(), "/favicon.ico", timeout=0.2)
+    assert str(result["error"]) == (
+        "Authorisation error (timeout): "
+        "no authorisation code was received within 0.2 seconds"
+    )
+    assert statuses == [404]